@@ -1,54 +1,48 @@
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, jsonify, request, render_template, stream_with_context
 from supabase import create_client
 import os
 
+from config import INGEST_RUNS_TABLE, FACETS_TABLE, META_MAX_AGE, SEARCH_CACHE_ESTIMATED_TTL, TEXT_SEARCH_TABLE
+from query_cache import QueryCache, search_params, cache_key
+from keyset import CursorError, order_spec, encode_cursor, decode_cursor, after_filter
+from count_strategy import CountStrategy
+from payload import Payload, PayloadStats, select_columns, shape_row, etag_matches
+from facets import FacetCache
+from db.replica import Replica
+from export import FORMATS, iter_batches, export_chunks, pa
+
 app = Flask(__name__)
 
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
 SUPABASE_ANON_KEY = os.environ.get("SUPABASE_ANON_KEY", "")
 LEADS_TABLE = os.environ.get("LEADS_TABLE") or os.environ.get("SUPABASE_TABLE") or "production_maps"
+READ_REPLICA_PATH = os.environ.get("READ_REPLICA_PATH", "")
 
 sb = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+# optional local SQLite copy (db/replica.py); when set, dashboard reads never leave the process
+REPLICA = Replica(READ_REPLICA_PATH) if READ_REPLICA_PATH else None
+# search_leads() and search_leads_count() read public.places, whatever LEADS_TABLE says
+TEXT_SEARCH = REPLICA is not None or LEADS_TABLE == TEXT_SEARCH_TABLE
+if not TEXT_SEARCH:
+    app.logger.error("Free-text search disabled: db/migrations/ target %s but LEADS_TABLE is %s", TEXT_SEARCH_TABLE, LEADS_TABLE)
+
+SEARCH_CACHE = QueryCache()
+COUNTS = CountStrategy()
+PAYLOADS = PayloadStats()
 
 with open("categories.txt") as f:
     HARDCODED_CATEGORIES = sorted({line.strip() for line in f if line.strip()})
 
 
-def _distinct(col: str, batch: int = 2000, max_batches: int = 250):
-    seen = set()
-    values = []
-    offset = 0
-
-    for _ in range(max_batches):
-        res = (
-            sb
-            .table(LEADS_TABLE)
-            .select(col)
-            .order(col)
-            .range(offset, offset + batch - 1)
-            .execute()
-        )
-        rows = res.data or []
-        if not rows:
-            break
-
-        for r in rows:
-            v = (r.get(col) or "").strip()
-            if not v or v in seen:
-                continue
-            seen.add(v)
-            values.append(v)
-
-        if len(rows) < batch:
-            break
-
-        offset += batch
-
-    return values
-
-
-def unique_categories():
-    return HARDCODED_CATEGORIES
+def load_facets():
+    if REPLICA is not None:
+        return {"locations": REPLICA.locations()}
+    res = sb.table(FACETS_TABLE).select("name,items").execute()
+    facets = {r["name"]: r["items"] or [] for r in res.data or []}
+    if "locations" not in facets:
+        # tables that predate search_facets: fall back to the distinct view, once per data version
+        facets["locations"] = unique_locations()
+    return facets
 
 
 def unique_locations():
@@ -69,126 +63,241 @@ def unique_locations():
     return values
 
 
+FACETS = FacetCache(load_facets, static={"categories": HARDCODED_CATEGORIES})
+
 
 @app.route("/", methods=["GET", "HEAD"])
 def index():
     if request.method == "HEAD":
         return "", 200
 
+    # served from the facet cache (loaded here on a cold process); the page itself fetches /meta
+    check_data_version()
     return render_template(
         "index.html",
-        categories=unique_categories(),
-        locations=unique_locations(),
+        categories=FACETS.get("categories"),
+        locations=FACETS.get("locations"),
     )
 
 
 @app.get("/meta")
 def meta():
-    return jsonify(
-        {
-            "categories": unique_categories(),
-            "locations": unique_locations(),
-        }
-    )
+    check_data_version()
+    resp = send_payload(FACETS.payload)
+    # facet lists only change with an ingest run; let browsers reuse them briefly, then revalidate
+    resp.headers["Cache-Control"] = f"public, max-age={META_MAX_AGE}"
+    return resp
 
 
-@app.get("/search")
-def search():
-    category = request.args.get("category", type=str)
-    location = request.args.get("location", type=str)
-    page = request.args.get("page", default=1, type=int)
-    if page < 1:
-        page = 1
-    per_page = 100
-    offset = (page - 1) * per_page
+def latest_ingest_run():
+    if REPLICA is not None:
+        return REPLICA.version()
+    res = (
+        sb.table(INGEST_RUNS_TABLE)
+        .select("id")
+        .order("id", desc=True)
+        .limit(1)
+        .execute()
+    )
+    rows = res.data or []
+    return rows[0]["id"] if rows else 0
+
 
-    # new filter params
-    min_rating = request.args.get("min_rating", type=float)
-    has_phone = request.args.get("has_phone") == "1"
-    has_website = request.args.get("has_website") == "1"
-    address_contains = request.args.get("address_contains", type=str)
-    sort = (request.args.get("sort", type=str) or "").strip()
+def check_data_version():
+    # a finished supabase_push run bumps the data version: empty both caches and reload facets
+    SEARCH_CACHE.check_version(latest_ingest_run)
+    if FACETS.due(SEARCH_CACHE.version):
+        FACETS.refresh(SEARCH_CACHE.version)
+    COUNTS.cache.check_version(lambda: SEARCH_CACHE.version)
 
-    q = sb.table(LEADS_TABLE).select("*", count="exact")
 
+def apply_filters(q, params):
     # category (exact, frontend handles "All categories")
-    if category:
-        q = q.eq("category", category)
+    if params["category"]:
+        q = q.eq("category", params["category"])
 
     # location prefix match
-    if location:
-        loc = location.strip()
-        if loc:
-            q = q.ilike("query_location", f"{loc}%")
+    if params["location"]:
+        q = q.ilike("query_location", f"{params['location']}%")
 
     # rating filter
-    if min_rating is not None:
-        q = q.gte("rating", min_rating)
+    if params["min_rating"] is not None:
+        q = q.gte("rating", params["min_rating"])
 
     # has phone: prefer normalized phone_e164
-    if has_phone:
+    if params["has_phone"]:
         q = (
             q.not_.is_("phone", None)
              .neq("phone", "")
         )
 
     # has website: raw website column only (fallback handled on frontend)
-    if has_website:
+    if params["has_website"]:
         q = (
             q.not_.is_("website", None)
              .neq("website", "")
         )
 
     # address contains (substring match on normalized address_line)
-    if address_contains:
-        addr = address_contains.strip()
-        if addr:
-            q = q.ilike("address_line", f"%{addr}%")
-
-    # sorting (no reviews_count column involved)
-    if sort == "rating_desc":
-        q = q.order("rating", desc=True)
-    elif sort == "name_asc":
-        q = q.order("name")
+    if params["address_contains"]:
+        q = q.ilike("address_line", f"%{params['address_contains']}%")
+
+    return q
+
+
+def exact_count(params):
+    if REPLICA is not None:
+        return REPLICA.count(params)
+    if params["q"]:
+        return sb.rpc("search_leads_count", text_search_args(params)).execute().data or 0
+    res = apply_filters(sb.table(LEADS_TABLE).select("id", count="exact"), params).limit(1).execute()
+    return res.count or 0
+
+
+def text_search_args(params):
+    # same filters as apply_filters(), as arguments of the search_leads SQL function
+    return {
+        "q": params["q"],
+        "p_category": params["category"] or None,
+        "p_location": params["location"] or None,
+        "p_min_rating": params["min_rating"],
+        "p_has_phone": params["has_phone"],
+        "p_has_website": params["has_website"],
+        "p_address": params["address_contains"] or None,
+    }
+
+
+def fetch_page(params, after, limit):
+    if REPLICA is not None:
+        return REPLICA.search(params, after, limit), None
+
+    # free text goes through search_leads (tsvector + trigram indexes), ranked by relevance
+    if params["q"]:
+        args = dict(text_search_args(params), p_limit=limit)
+        if after is not None:
+            args["p_after_rank"], args["p_after_id"] = after
+        return sb.rpc("search_leads", args).execute().data or [], None
+
+    # Only the first page carries a total; COUNT(*) over a wide filter costs more than the page itself.
+    # The planner's estimate is free with the query and the exact count is taken when it is cheap.
+    columns = select_columns(params["view"])
+    if after is None:
+        q = sb.table(LEADS_TABLE).select(columns, count="planned")
     else:
-        # default "best match": highest rating first
-        q = q.order("rating", desc=True)
+        q = sb.table(LEADS_TABLE).select(columns)
+    q = apply_filters(q, params)
 
-    q = q.range(offset, offset + per_page - 1)
-
-    res = q.execute()
-    rows = res.data or []
-    total = res.count or len(rows)
+    # keyset pagination: (rating desc, id) or (name, id), continuing after the cursor row,
+    # so deep pages cost the same as the first and ties cannot repeat or skip rows
+    if after is not None:
+        q = q.or_(after_filter(params["sort"], *after))
+    # one order param with both keys; calling order() twice would send two
+    q = q.order(order_spec(params["sort"]))
 
-    items = []
-    for row in rows:
-        row = {k: ("" if v is None else v) for k, v in row.items()}
+    res = q.limit(limit).execute()
+    return res.data or [], res.count
 
-        raw = (row.get("photo_urls") or "").strip()
-        photos = [
-            u.strip()
-            for u in raw.split(",")
-            if u.strip().startswith("http")
-        ]
 
-        if not row.get("main_photo_url") and photos:
-            row["main_photo_url"] = photos[0]
-
-        row["photos"] = photos
-
-        if row.get("correct_name"):
-            row["name"] = row["correct_name"]
+def run_search(params):
+    per_page = 100
+    sort = params["sort"]
+    after = decode_cursor(sort, params["cursor"]) if params["cursor"] else None
+
+    # one extra row tells us whether there is a next page
+    rows, planned = fetch_page(params, after, per_page + 1)
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(sort, rows[-1])
+    total, total_kind = None, None
+    if after is None:
+        total, total_kind = COUNTS.total(params, len(rows), next_cursor is not None, planned, lambda: exact_count(params))
+
+    return {
+        "items": [shape_row(row, params["view"]) for row in rows],
+        "per_page": per_page,
+        "total": total,
+        "total_kind": total_kind,
+        "next_cursor": next_cursor,
+    }
 
-        items.append(row)
 
-    return jsonify(
-        {
-            "items": items,
-            "page": page,
-            "per_page": per_page,
-            "total": total,
-        }
-    )
+@app.get("/search")
+def search():
+    params = search_params(request.args)
+    if params["q"] and not TEXT_SEARCH:
+        return text_search_unavailable()
+    check_data_version()
+    key = cache_key(params)
+
+    payload = SEARCH_CACHE.get(key)
+    status = "HIT"
+    if payload is None:
+        try:
+            result = run_search(params)
+        except CursorError as e:
+            return jsonify({"error": str(e)}), 400
+        payload = Payload(result)
+        # an estimated total is replaced once the background count lands, so don't hold it for long
+        ttl = SEARCH_CACHE_ESTIMATED_TTL if result["total_kind"] == "estimated" else None
+        SEARCH_CACHE.put(key, payload, size=payload.size, ttl=ttl)
+        status = "MISS"
+
+    resp = send_payload(payload)
+    resp.headers["X-Cache"] = status
+    return resp
+
+
+@app.get("/export")
+def export():
+    # Same filters as /search, every matching row, streamed batch by batch with chunked encoding.
+    params = search_params(request.args)
+    if params["q"] and not TEXT_SEARCH:
+        return text_search_unavailable()
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(FORMATS)}"}), 400
+    if fmt == "parquet" and pa is None:
+        return jsonify({"error": "parquet export needs pyarrow installed"}), 400
+    view = params["view"] if request.args.get("view") else "full"
+    mimetype, ext = FORMATS[fmt]
+
+    def rows(params, after, limit):
+        return fetch_page(params, after, limit)[0]
+
+    chunks = export_chunks(fmt, iter_batches(dict(params, view=view), rows), view)
+    resp = app.response_class(stream_with_context(chunks), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = f'attachment; filename="leads.{ext}"'
+    resp.headers["Cache-Control"] = "no-store"
+    # keeps nginx-style proxies from buffering the whole export before sending it on
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+def text_search_unavailable():
+    return jsonify({"error": f"free-text search needs LEADS_TABLE={TEXT_SEARCH_TABLE} (see db/migrations/)"}), 501
+
+
+def send_payload(payload):
+    encoding, body, etag = payload.variant(request.headers.get("Accept-Encoding"))
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        PAYLOADS.record(len(payload.identity), 0, encoding, not_modified=True)
+        resp = app.response_class(status=304)
+    else:
+        PAYLOADS.record(len(payload.identity), len(body), encoding)
+        resp = app.response_class(body, mimetype="application/json")
+        if encoding != "identity":
+            resp.headers["Content-Encoding"] = encoding
+    resp.headers["ETag"] = etag
+    resp.headers["Vary"] = "Accept-Encoding"
+    # results change with ingest runs, so let browsers keep them but always revalidate
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+@app.get("/stats")
+def stats():
+    return jsonify({"search_cache": SEARCH_CACHE.snapshot(), "counts": COUNTS.snapshot(), "payloads": PAYLOADS.snapshot(), "facets": FACETS.snapshot()})
 
 
 if __name__ == "__main__":
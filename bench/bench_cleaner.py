@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, csv, json, logging, multiprocessing, os, platform, sys, tempfile, time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import LOG_FORMAT, LOG_LEVEL
+from bench.gen_raw import generate
+
+NORMALIZER_COLUMNS = {
+    "nfc": "query_location",
+    "normalize_website": "website",
+    "normalize_social_links": "social_links",
+    "normalize_gmaps": "profile_url",
+    "normalize_phone": "phone",
+    "fix_address_and_price": None,
+}
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return rss if platform.system() == "Darwin" else rss * 1024
+
+
+def _run_process(in_path, out_path, incremental, queue):
+    logging.disable(logging.INFO)
+    from cleaner import csv_cleaner
+    from normalizers import cache_stats
+
+    t0 = time.perf_counter()
+    if incremental:
+        csv_cleaner.process_incremental(in_path, out_path)
+    else:
+        csv_cleaner.process(in_path, out_path)
+    queue.put(
+        {
+            "seconds": time.perf_counter() - t0,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "caches": cache_stats(),
+        }
+    )
+
+
+def bench_process(in_path, rows, incremental=False):
+    # A fresh interpreter per run so peak RSS belongs to this run alone.
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "cleaned.csv")
+        p = ctx.Process(target=_run_process, args=(in_path, out_path, incremental, queue))
+        p.start()
+        res = queue.get()
+        p.join()
+    res["rows"] = rows
+    res["rows_per_sec"] = round(rows / res["seconds"], 1) if res["seconds"] else None
+    return res
+
+
+def load_columns(in_path, limit):
+    cols = {}
+    with open(in_path, "r", encoding="utf-8-sig", newline="") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            if i >= limit:
+                break
+            for k, v in row.items():
+                cols.setdefault(k, []).append(v)
+    return cols
+
+
+def bench_normalizers(in_path, limit):
+    from cleaner import csv_cleaner
+    from normalizers import cache_stats, clear_caches
+
+    cols = load_columns(in_path, limit)
+    n = len(cols.get("name", []))
+    rows = [dict(zip(cols, vals)) for vals in zip(*cols.values())]
+    out = {}
+    for name, column in NORMALIZER_COLUMNS.items():
+        fn = getattr(csv_cleaner, name)
+        clear_caches()
+        t0 = time.perf_counter()
+        if column is None:
+            for row in rows:
+                fn(row)
+        else:
+            for v in cols.get(column, []):
+                fn(v)
+        dt = time.perf_counter() - t0
+        out[name] = {
+            "calls": n,
+            "seconds": dt,
+            "rows_per_sec": round(n / dt, 1) if dt else None,
+            "caches": {k: v for k, v in cache_stats().items() if v["hits"] or v["misses"]},
+        }
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark csv_cleaner on synthetic raw CSVs")
+    ap.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--dup-rate", type=float, default=0.1)
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--normalizer-rows", type=int, default=100000)
+    ap.add_argument("--incremental", action="store_true", help="Also time process_incremental on a cold checkpoint")
+    ap.add_argument("--workdir", default="", help="Keep generated inputs here instead of a temp dir")
+    ap.add_argument("--json", dest="json_out", default="bench_results.json")
+    ap.add_argument("--log", default=LOG_LEVEL)
+    args = ap.parse_args()
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+
+    tmp = None
+    workdir = args.workdir
+    if not workdir:
+        tmp = tempfile.TemporaryDirectory()
+        workdir = tmp.name
+    os.makedirs(workdir, exist_ok=True)
+
+    results = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "dup_rate": args.dup_rate,
+        "seed": args.seed,
+        "process": [],
+        "normalizers": {},
+    }
+    try:
+        for rows in args.rows:
+            in_path = os.path.join(workdir, f"raw_{rows}_{args.seed}.csv")
+            if not os.path.exists(in_path):
+                generate(in_path, rows, dup_rate=args.dup_rate, seed=args.seed)
+            res = bench_process(in_path, rows)
+            res["mode"] = "full"
+            results["process"].append(res)
+            logging.info(
+                "process rows=%d: %.2fs | %.0f rows/s | peak_rss=%s",
+                rows,
+                res["seconds"],
+                res["rows_per_sec"] or 0,
+                res["peak_rss_bytes"],
+            )
+            if args.incremental:
+                res = bench_process(in_path, rows, incremental=True)
+                res["mode"] = "incremental"
+                results["process"].append(res)
+                logging.info("process_incremental rows=%d: %.2fs | %.0f rows/s", rows, res["seconds"], res["rows_per_sec"] or 0)
+        in_path = os.path.join(workdir, f"raw_{args.normalizer_rows}_{args.seed}.csv")
+        if not os.path.exists(in_path):
+            generate(in_path, args.normalizer_rows, dup_rate=args.dup_rate, seed=args.seed)
+        results["normalizers"] = bench_normalizers(in_path, args.normalizer_rows)
+        for name, res in results["normalizers"].items():
+            logging.info("%s: %.0f calls/s", name, res["rows_per_sec"] or 0)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    with open(args.json_out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    logging.info("Wrote benchmark results to %s", args.json_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, asyncio, json, logging, platform, statistics, sys, time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import LOG_FORMAT, LOG_LEVEL
+from bench import mock_site
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+    return {
+        "n": len(samples),
+        "median_ms": round(1000 * statistics.median(samples), 3),
+        "p95_ms": round(1000 * samples[int(0.95 * (len(samples) - 1))], 3),
+    }
+
+
+def bench_selenium(base, pages, tabs, commands, headless):
+    from scraper import phone_enricher
+    from scraper.tab_pool import TabPool
+    from browser_utils import quit_chrome
+    from selenium.webdriver.common.by import By
+
+    urls = [f"{base}/place/{i}" for i in range(1, pages + 1)]
+    t0 = time.perf_counter()
+    driver = phone_enricher.new_driver(headless=headless)
+    launch = time.perf_counter() - t0
+    try:
+        t0 = time.perf_counter()
+        if tabs > 1:
+            pool = TabPool(driver, tabs)
+            found = sum(1 for _, phone, _ in pool.map(((u, u) for u in urls), phone_enricher.read_phone) if phone)
+            pool.close()
+        else:
+            found = sum(1 for u in urls if phone_enricher.get_phone_from_page(driver, u))
+        visits = time.perf_counter() - t0
+        phone_enricher.get_phone_from_page(driver, urls[0])
+        lat = []
+        for _ in range(commands):
+            t = time.perf_counter()
+            for el in driver.find_elements(By.XPATH, "//button[@data-item-id]"):
+                el.get_attribute("data-item-id")
+            lat.append(time.perf_counter() - t)
+    finally:
+        quit_chrome(driver)
+    return {"launch_s": launch, "visits_s": visits, "pages_per_s": pages / visits, "found": found, "find_and_read": summarize(lat)}
+
+
+async def _bench_cdp(base, pages, tabs, commands, headless):
+    from scraper import phone_enricher
+    from scraper.cdp_driver import CDPBrowser, map_pages
+
+    urls = [f"{base}/place/{i}" for i in range(1, pages + 1)]
+    t0 = time.perf_counter()
+    browser = await CDPBrowser.launch(headless=headless)
+    launch = time.perf_counter() - t0
+    try:
+        t0 = time.perf_counter()
+        found = 0
+        async for _, phone, _ in map_pages(browser, urls, phone_enricher.read_phone_cdp, tabs):
+            found += bool(phone)
+        visits = time.perf_counter() - t0
+        page = await browser.new_page()
+        await phone_enricher.read_phone_cdp(page, urls[0])
+        per_element, batched = [], []
+        for _ in range(commands):
+            t = time.perf_counter()
+            for el in await page.find_elements("//button[@data-item-id]"):
+                await el.get_attribute("data-item-id")
+            per_element.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            await page.query_values("//button[@data-item-id]", ["data-item-id"])
+            batched.append(time.perf_counter() - t)
+        sent = browser.conn.commands
+    finally:
+        await browser.close()
+    return {
+        "launch_s": launch,
+        "visits_s": visits,
+        "pages_per_s": pages / visits,
+        "found": found,
+        "find_and_read": summarize(per_element),
+        "query_values": summarize(batched),
+        "commands": sent,
+    }
+
+
+def bench_cdp(base, pages, tabs, commands, headless):
+    return asyncio.run(_bench_cdp(base, pages, tabs, commands, headless))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare the Selenium and CDP driver backends on the local mock site")
+    ap.add_argument("--pages", type=int, default=100)
+    ap.add_argument("--tabs", type=int, nargs="+", default=[1, 4])
+    ap.add_argument("--backends", nargs="+", choices=["selenium", "cdp"], default=["selenium", "cdp"])
+    ap.add_argument("--commands", type=int, default=200, help="Repetitions for the per-command latency probe")
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--render-ms", type=int, default=150)
+    ap.add_argument("--no-headless", action="store_true")
+    ap.add_argument("--json", dest="json_out", default="bench_driver_results.json")
+    ap.add_argument("--log", default=LOG_LEVEL)
+    args = ap.parse_args()
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+
+    srv, base = mock_site.start(latency=args.latency, render_ms=args.render_ms)
+    results = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pages": args.pages,
+        "latency": args.latency,
+        "render_ms": args.render_ms,
+        "runs": [],
+    }
+    runners = {"selenium": bench_selenium, "cdp": bench_cdp}
+    try:
+        for backend in args.backends:
+            for tabs in args.tabs:
+                res = runners[backend](base, args.pages, tabs, args.commands, not args.no_headless)
+                res.update({"backend": backend, "tabs": tabs})
+                results["runs"].append(res)
+                logging.info(
+                    "%s tabs=%d: %.1f pages/s | launch %.2fs | find+read median %.2fms",
+                    backend,
+                    tabs,
+                    res["pages_per_s"],
+                    res["launch_s"],
+                    res["find_and_read"].get("median_ms", 0),
+                )
+    finally:
+        srv.shutdown()
+
+    with open(args.json_out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    logging.info("Wrote benchmark results to %s", args.json_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, json, logging, random, sys, time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import LOG_FORMAT, LOG_LEVEL
+from bench.gen_raw import PHOTO_HOST, load_categories, make_row
+from payload import VIEWS, Payload, shape_row, brotli
+
+
+def sample_rows(n, seed=1234):
+    # Rows as the table returns them for select("*"): every scraped column plus id and correct_name.
+    rnd = random.Random(seed)
+    categories = load_categories()
+    shared = [PHOTO_HOST.format(f"stock{i:04d}") for i in range(200)]
+    rows = []
+    for i in range(n):
+        row = make_row(rnd, i, categories, shared)
+        row["id"] = i + 1
+        row["correct_name"] = row["name"] if rnd.random() < 0.3 else ""
+        row["rating"] = float(row["rating"]) if row["rating"] else None
+        rows.append(row)
+    return rows
+
+
+def project(row, view):
+    cols = VIEWS[view]
+    return dict(row) if cols == ("*",) else {c: row.get(c) for c in cols}
+
+
+def measure(rows, view):
+    t0 = time.perf_counter()
+    payload = Payload({"items": [shape_row(project(r, view), view) for r in rows], "per_page": len(rows)})
+    build_ms = 1000 * (time.perf_counter() - t0)
+    return {"view": view, "build_ms": round(build_ms, 3), **{enc: len(body) for enc, body in payload.bodies.items()}}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure /search payload sizes per view and encoding")
+    ap.add_argument("--rows", type=int, default=100, help="Rows per page")
+    ap.add_argument("--json", dest="json_out", default="")
+    ap.add_argument("--log", default=LOG_LEVEL)
+    args = ap.parse_args()
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+
+    rows = sample_rows(args.rows)
+    # What the endpoint sent before: every column, the split photo list, ASCII-escaped and uncompressed.
+    before = len(json.dumps({"items": [shape_row(r, "full") for r in rows]}, separators=(",", ":")).encode("utf-8"))
+    results = {"rows": args.rows, "before_bytes": before, "brotli": brotli is not None, "views": []}
+    logging.info("before (select *, uncompressed): %d bytes", before)
+    for view in VIEWS:
+        res = measure(rows, view)
+        results["views"].append(res)
+        logging.info(
+            "%s: identity %d | gzip %s | br %s bytes | build %.2f ms",
+            view,
+            res["identity"],
+            res.get("gzip", "-"),
+            res.get("br", "-"),
+            res["build_ms"],
+        )
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logging.info("Wrote payload results to %s", args.json_out)
+
+
+if __name__ == "__main__":
+    main()
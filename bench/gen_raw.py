@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, csv, logging, random, sys, time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import CSV_FIELDS, LOG_FORMAT, LOG_LEVEL
+
+LOCATIONS = [
+    "Cairo, Egypt",
+    "Giza, Egypt",
+    "Alexandria, Egypt",
+    "New Cairo, Egypt",
+    "6th of October, Egypt",
+    "Sheikh Zayed, Egypt",
+    "القاهرة، مصر",
+    "الجيزة، مصر",
+]
+EN_NAMES = ["Nile", "Pyramids", "Delta", "Horus", "Lotus", "Cleopatra", "Sphinx", "Oasis", "Golden", "Royal"]
+AR_NAMES = ["النيل", "الأهرام", "الدلتا", "حورس", "اللوتس", "كليوباترا", "الواحة", "الذهبي", "الملكي"]
+STREETS = [
+    "{n} Tahrir Street",
+    "{n} El Nasr Road",
+    "{n} Gamal Abdel Nasser St.",
+    "Mohandessin, Giza",
+    "{n} شارع التحرير",
+    "ميدان {n} المعادي",
+    "{n} Maadi Sq.",
+    "Dokki, Cairo",
+]
+PRICES = ["EGP 100–200", "EGP 200+", "ج.م ١٠٠–٢٠٠", "150 LE", "E P 1,000–2,000", "Delivery: 25", "جنيه 300"]
+HOURS = ["Open · Closes 11 PM", "Closed · Opens 9 AM", "Open 24 hours", "مفتوح · يغلق ١١ م", ""]
+BIDI = ["\u200e", "\u200f", "\u202a", "\u202c", "\u200d"]
+SOCIAL = [
+    "https://www.facebook.com/{s}",
+    "facebook.com/{s}?fbclid=IwAR{n}",
+    "https://instagram.com/{s}/",
+    "https://x.com/{s}",
+    "https://www.tiktok.com/@{s}",
+]
+PHOTO_HOST = "https://lh5.googleusercontent.com/p/AF1Qip{0}=w408-h306-k-no"
+
+
+def load_categories():
+    path = ROOT_DIR / "categories.txt"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cats = [ln.strip() for ln in f if ln.strip()]
+    except OSError:
+        cats = []
+    return cats or ["restaurants", "dentists", "cafes"]
+
+
+def place_id(n):
+    return "ChIJ" + format(n * 2654435761 % (1 << 64), "016x")
+
+
+def profile_url(rnd, n, slug):
+    pid = place_id(n)
+    shape = rnd.randrange(5)
+    if shape == 0:
+        return f"https://www.google.com/maps/place/{slug}/data=!4m7!3m6!1s0x0:0x{n:x}!8m2!3d30.0!4d31.2!16s%2Fg%2F11!19s{pid}?authuser=0&hl=en&rclk=1"
+    if shape == 1:
+        return f"https://www.google.com/maps/place/{slug}/@30.0{n % 97},31.2{n % 89},17z/data=!3m1!4b1!4m6!3m5!1s0x0:0x{n:x}!19s{pid}?entry=ttu"
+    if shape == 2:
+        return f"https://www.google.com/maps/search/?api=1&query={slug}&query_place_id={pid}"
+    if shape == 3:
+        return f"https://www.google.com/maps/place/?q=place_id:{pid}"
+    return f"www.google.com/maps/place/{slug}/data=!4m2!3m1!1s0x0:0x{n:x}?hl=ar&g_ep=Eg"
+
+
+def make_row(rnd, n, categories, shared_photos):
+    arabic = rnd.random() < 0.35
+    base = " ".join(rnd.sample(AR_NAMES if arabic else EN_NAMES, 2))
+    kind = rnd.choice(categories)
+    name = f"{base} {kind.title()}" if not arabic else base
+    slug = name.replace(" ", "+")
+    if rnd.random() < 0.15:
+        name = rnd.choice(BIDI) + name + rnd.choice(BIDI)
+    street = rnd.choice(STREETS).format(n=rnd.randint(1, 250))
+    roll = rnd.random()
+    if roll < 0.5:
+        category_line = f"{kind.title()} · {street}"
+        address_line = street
+    elif roll < 0.7:
+        category_line = f"{kind.title()} · {rnd.choice(PRICES)}"
+        address_line = rnd.choice(PRICES)
+    elif roll < 0.85:
+        category_line = kind.title()
+        address_line = ""
+    else:
+        category_line = f"{kind.title()} · {street}"
+        address_line = street
+    phone = ""
+    if rnd.random() < 0.6:
+        phone = rnd.choice(["010 {0} {1}", "+20 11 {0} {1}", "02 {0} {1}", "٠١٢ {0} {1}"]).format(
+            rnd.randint(1000, 9999), rnd.randint(1000, 9999)
+        )
+    website = ""
+    if rnd.random() < 0.4:
+        website = rnd.choice(["{s}.com", "https://www.{s}.com.eg/?utm_source=gmb&utm_medium=organic", "http://{s}.eg/menu?fbclid=IwAR{n}"])
+        website = website.format(s=slug.lower().replace("+", ""), n=n)
+    socials = []
+    for _ in range(rnd.randint(0, 3)):
+        socials.append(rnd.choice(SOCIAL).format(s=slug.lower().replace("+", ""), n=n))
+    photos = []
+    for i in range(rnd.randint(0, 6)):
+        if rnd.random() < 0.3:
+            photos.append(rnd.choice(shared_photos))
+        else:
+            photos.append(PHOTO_HOST.format(f"{n:x}{i}"))
+    reviews = rnd.randint(0, 25000)
+    return {
+        "category": kind,
+        "query_location": rnd.choice(LOCATIONS),
+        "name": name,
+        "category_line": category_line,
+        "address_line": address_line,
+        "plus_code": f"{rnd.randint(2000, 9999)}+{rnd.randint(10, 99)}X Cairo" if rnd.random() < 0.3 else "",
+        "phone": phone,
+        "website": website,
+        "profile_url": profile_url(rnd, n, slug),
+        "rating": f"{rnd.uniform(2.5, 5.0):.1f}" if reviews else "",
+        "reviews_count": f"({reviews:,})" if reviews else "",
+        "opening_hours": rnd.choice(HOURS),
+        "social_links": ", ".join(socials),
+        "photo_urls": ", ".join(photos),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1700000000 + n)),
+    }
+
+
+def generate(path, rows, dup_rate=0.1, seed=1234, shared_photo_pool=200):
+    rnd = random.Random(seed)
+    categories = load_categories()
+    shared_photos = [PHOTO_HOST.format(f"stock{i:04d}") for i in range(shared_photo_pool)]
+    unique = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        w.writeheader()
+        for i in range(rows):
+            if unique and rnd.random() < dup_rate:
+                n = rnd.randrange(unique)
+            else:
+                n = unique
+                unique += 1
+            w.writerow(make_row(rnd, n, categories, shared_photos))
+            if rows >= 1000000 and (i + 1) % 1000000 == 0:
+                logging.info("Generated %d/%d rows", i + 1, rows)
+    logging.info("Wrote %d rows (%d unique places) to %s", rows, unique, path)
+    return unique
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a synthetic raw scraper CSV")
+    ap.add_argument("--rows", type=int, default=10000)
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--dup-rate", type=float, default=0.1, help="Share of rows that repeat an earlier place")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--log", default=LOG_LEVEL)
+    args = ap.parse_args()
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+    generate(args.out, args.rows, dup_rate=args.dup_rate, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
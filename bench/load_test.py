@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, gzip, http.client, json, logging, math, os, platform, random, shlex, signal, subprocess, sys, threading, time
+from urllib.parse import urlencode
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import LOG_FORMAT, LOG_LEVEL, TEXT_SEARCH_TABLE
+from bench import postgrest_stub
+from bench.gen_raw import EN_NAMES, STREETS, load_categories
+from payload import brotli
+
+# Share of requests per endpoint; /search dominates once the page is open.
+MIX = {"search": 0.75, "meta": 0.15, "index": 0.10}
+NEXT_PAGE_P = 0.25
+MAX_PAGES = 4
+
+
+def server_command(mode, port):
+    # The deploy files are the source of truth: Procfile for gunicorn, the Dockerfile CMD for flask run.
+    if mode == "gunicorn":
+        with open(ROOT_DIR / "deploy" / "Procfile", encoding="utf-8") as f:
+            line = next(ln for ln in f if ln.startswith("web:"))
+        argv = shlex.split(line.split(":", 1)[1]) + ["--bind", f"127.0.0.1:{port}"]
+    else:
+        with open(ROOT_DIR / "deploy" / "Dockerfile", encoding="utf-8") as f:
+            line = [ln for ln in f if ln.startswith("CMD")][-1]
+        argv = json.loads(line[3:])
+        argv = [a for a in argv if not a.startswith(("--host", "--port"))] + ["--host=127.0.0.1", f"--port={port}"]
+    # run the entry point with this interpreter instead of the image's venv path
+    return [sys.executable, "-m", os.path.basename(argv[0])] + argv[1:]
+
+
+def search_query(rnd, categories, locations):
+    # Same keys and value sets buildQuery() in templates/index.html produces.
+    q = {}
+    if rnd.random() < 0.15:
+        q["q"] = rnd.choice(EN_NAMES).lower()
+    if rnd.random() < 0.6:
+        q["category"] = rnd.choice(categories)
+    if locations and rnd.random() < 0.5:
+        loc = rnd.choice(locations)
+        q["location"] = loc[: rnd.randint(3, len(loc))]
+    rating = rnd.choice(["", "", "", "4.5", "4.0", "3.5", "3.0"])
+    if rating:
+        q["min_rating"] = rating
+    if rnd.random() < 0.3:
+        q["has_phone"] = "1"
+    if rnd.random() < 0.2:
+        q["has_website"] = "1"
+    sort = rnd.choice(["", "", "rating_desc", "reviews_desc", "name_asc"])
+    if sort:
+        q["sort"] = sort
+    if rnd.random() < 0.1:
+        q["address_contains"] = rnd.choice(STREETS).replace("{n}", "").strip().split()[0].lower()
+    return q
+
+
+def percentile(samples, p):
+    # nearest-rank on a sorted list
+    if not samples:
+        return None
+    return samples[max(0, min(len(samples) - 1, math.ceil(p * len(samples)) - 1))]
+
+
+def summarize(samples, errors, elapsed):
+    samples = sorted(samples)
+    res = {"n": len(samples), "errors": errors, "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0}
+    if samples:
+        res.update(
+            {
+                "mean_ms": round(1000 * sum(samples) / len(samples), 2),
+                "p50_ms": round(1000 * percentile(samples, 0.50), 2),
+                "p95_ms": round(1000 * percentile(samples, 0.95), 2),
+                "p99_ms": round(1000 * percentile(samples, 0.99), 2),
+                "max_ms": round(1000 * samples[-1], 2),
+            }
+        )
+    return res
+
+
+def decode(resp, body):
+    enc = resp.getheader("Content-Encoding", "")
+    if enc == "gzip":
+        return gzip.decompress(body)
+    if enc == "br":
+        return brotli.decompress(body)
+    return body
+
+
+class Client:
+    # One keep-alive connection per simulated user, like a browser tab.
+    def __init__(self, port, seed, categories, locations):
+        self.port = port
+        self.rnd = random.Random(seed)
+        self.categories = categories
+        self.locations = locations
+        self.conn = None
+        self.accept = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+    def get(self, path):
+        for attempt in (0, 1):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+            try:
+                self.conn.request("GET", path, headers={"Accept-Encoding": self.accept})
+                resp = self.conn.getresponse()
+                return resp, resp.read()
+            except (http.client.HTTPException, OSError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+    def run(self, deadline, record):
+        pages = []
+        while time.perf_counter() < deadline:
+            if pages:
+                name, path = "search_next", pages.pop()
+            else:
+                name = self.rnd.choices(list(MIX), weights=list(MIX.values()))[0]
+                path = {"index": "/", "meta": "/meta"}.get(name) or "/search?" + urlencode(search_query(self.rnd, self.categories, self.locations))
+            t0 = time.perf_counter()
+            try:
+                resp, body = self.get(path)
+                ok = resp.status < 400
+            except (http.client.HTTPException, OSError):
+                resp, body, ok = None, b"", False
+            record(name, time.perf_counter() - t0, ok)
+            if ok and name.startswith("search") and self.rnd.random() < NEXT_PAGE_P:
+                cursor = json.loads(decode(resp, body)).get("next_cursor")
+                if cursor and len(pages) < MAX_PAGES:
+                    base = path.split("&cursor=")[0]
+                    pages.append(f"{base}&cursor={cursor}")
+
+
+def process_rss_mb(pid):
+    # Resident memory of the server and its workers, from /proc (Linux only).
+    total, found = 0, False
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            if int(entry) != pid and ppid != pid:
+                continue
+            with open(f"/proc/{entry}/status") as f:
+                for ln in f:
+                    if ln.startswith("VmRSS:"):
+                        total += int(ln.split()[1])
+                        found = True
+        except (OSError, ValueError, IndexError):
+            continue
+    return round(total / 1024, 1) if found else None
+
+
+def wait_ready(port, proc, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("HEAD", "/")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not come up")
+
+
+def run_mode(mode, port, stub_url, args, categories):
+    cmd = server_command(mode, port)
+    env = dict(os.environ, SUPABASE_URL=stub_url, SUPABASE_ANON_KEY=postgrest_stub.STUB_KEY, LEADS_TABLE=TEXT_SEARCH_TABLE, FLASK_APP="app")
+    env.pop("READ_REPLICA_PATH", None)
+    preexec = None
+    if args.cpus and hasattr(os, "sched_setaffinity"):
+        cpus = set(range(args.cpus))
+        preexec = lambda: os.sched_setaffinity(0, cpus)
+    logging.info("Starting %s: %s", mode, " ".join(cmd))
+    proc = subprocess.Popen(cmd, cwd=ROOT_DIR, env=env, preexec_fn=preexec, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port, proc)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        conn.request("GET", "/meta")
+        locations = json.loads(conn.getresponse().read()).get("locations") or []
+        conn.close()
+
+        lock = threading.Lock()
+        samples, errors = {}, {}
+        measuring = threading.Event()
+        peak_rss = [process_rss_mb(proc.pid)]
+
+        def record(name, seconds, ok):
+            if not measuring.is_set():
+                return
+            with lock:
+                if ok:
+                    samples.setdefault(name, []).append(seconds)
+                else:
+                    errors[name] = errors.get(name, 0) + 1
+
+        start = time.perf_counter()
+        deadline = start + args.warmup + args.duration
+        clients = [Client(port, args.seed + i, categories, locations) for i in range(args.concurrency)]
+        threads = [threading.Thread(target=c.run, args=(deadline, record), daemon=True) for c in clients]
+        for t in threads:
+            t.start()
+        time.sleep(args.warmup)
+        measuring.set()
+        t0 = time.perf_counter()
+        while time.perf_counter() < deadline:
+            time.sleep(0.5)
+            rss = process_rss_mb(proc.pid)
+            if rss is not None:
+                peak_rss.append(rss)
+        for t in threads:
+            t.join(timeout=35)
+        elapsed = time.perf_counter() - t0
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    everything = [s for v in samples.values() for s in v]
+    rss = [r for r in peak_rss if r is not None]
+    return {
+        "mode": mode,
+        "command": cmd,
+        "overall": summarize(everything, sum(errors.values()), elapsed),
+        "endpoints": {name: summarize(samples.get(name, []), errors.get(name, 0), elapsed) for name in sorted(set(samples) | set(errors))},
+        "peak_rss_mb": max(rss) if rss else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test app.py under gunicorn (Procfile) and flask run (Dockerfile) against a stub Supabase API")
+    ap.add_argument("--modes", nargs="+", choices=["gunicorn", "flask"], default=["gunicorn", "flask"])
+    ap.add_argument("--concurrency", type=int, default=16, help="Simulated users, one keep-alive connection each")
+    ap.add_argument("--duration", type=float, default=30, help="Measured seconds per mode")
+    ap.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before that")
+    ap.add_argument("--rows", type=int, default=50000, help="Seeded places in the stub")
+    ap.add_argument("--db", default="stub_places.sqlite")
+    ap.add_argument("--latency", type=float, default=0.02, help="Stub delay per request in seconds (Fly to Supabase round trip)")
+    ap.add_argument("--jitter", type=float, default=0.01)
+    ap.add_argument("--cpus", type=int, default=1, help="Pin the server to this many CPUs like the Fly VM (0 = no pinning)")
+    ap.add_argument("--port", type=int, default=8090)
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--json", dest="json_out", default="load_test_results.json")
+    ap.add_argument("--log", default=LOG_LEVEL)
+    args = ap.parse_args()
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+
+    postgrest_stub.seed(args.db, args.rows)
+    srv, stub_url = postgrest_stub.start(args.db, latency=args.latency, jitter=args.jitter)
+    categories = load_categories()
+    results = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": args.cpus,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "rows": args.rows,
+        "latency": args.latency,
+        "runs": [],
+    }
+    try:
+        for mode in args.modes:
+            res = run_mode(mode, args.port, stub_url, args, categories)
+            results["runs"].append(res)
+            o = res["overall"]
+            logging.info(
+                "%s: %.1f req/s | p50 %s ms | p95 %s ms | p99 %s ms | errors %d | peak RSS %s MB",
+                mode,
+                o["rps"],
+                o.get("p50_ms", "-"),
+                o.get("p95_ms", "-"),
+                o.get("p99_ms", "-"),
+                o["errors"],
+                res["peak_rss_mb"],
+            )
+            for name, e in res["endpoints"].items():
+                logging.info("  %-12s n=%d p50 %s | p95 %s | p99 %s ms", name, e["n"], e.get("p50_ms", "-"), e.get("p95_ms", "-"), e.get("p99_ms", "-"))
+    finally:
+        srv.shutdown()
+
+    with open(args.json_out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    logging.info("Wrote load test results to %s", args.json_out)
+    failed = [r for r in results["runs"] if r["overall"]["errors"]]
+    for res in failed:
+        bad = {name: e["errors"] for name, e in res["endpoints"].items() if e["errors"]}
+        logging.error("%s: %d failed requests %s; the numbers above are not valid", res["mode"], res["overall"]["errors"], bad)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Mirrors the parts of a Maps place panel the scraper's XPaths look for. The panel is
+# filled in by script after `render_ms`, like the real single-page app.
+PAGE = """<!doctype html><html><head><meta charset="utf-8"><title>Place {n}</title></head>
+<body><div role="main" id="panel"></div>
+<script>
+setTimeout(function() {{
+  var p = document.getElementById("panel");
+  p.innerHTML = '<h1 class="DUwDvf fontHeadline">Mock Place {n}</h1>'
+    + '<span class="F7nice" aria-label="4.{r} stars">4.{r}</span>'
+    + '<button data-item-id="address"><div>Address</div><div>{n} Tahrir St, Cairo</div></button>'
+    + {phone}
+    + '<div class="m6QErb WNBkOb"><a href="https://example.com/{n}" aria-label="Website">Website</a></div>';
+}}, {render_ms});
+</script></body></html>"""
+PHONE_ROW = """'<button data-item-id="phone:tel:02{n:08d}"><div>Phone</div><div>02 {n:08d}</div></button>'"""
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.05
+    render_ms = 150
+    no_phone_every = 4
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "place" or not parts[1].isdigit():
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        n = int(parts[1])
+        time.sleep(self.latency)
+        phone = "''" if self.no_phone_every and n % self.no_phone_every == 0 else PHONE_ROW.format(n=n)
+        body = PAGE.format(n=n, r=n % 10, phone=phone, render_ms=self.render_ms).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port: int = 0, latency: float = 0.05, render_ms: int = 150):
+    handler = type("Handler", (MockHandler,), {"latency": latency, "render_ms": render_ms})
+    srv = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve mock place pages at /place/<n>")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.05, help="Server delay per page in seconds")
+    ap.add_argument("--render-ms", type=int, default=150, help="Delay before the panel is filled in")
+    args = ap.parse_args()
+    srv, base = start(args.port, args.latency, args.render_ms)
+    print(f"Serving mock places at {base}/place/<n>")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, json, logging, os, random, re, sys, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import FACETS_TABLE, INGEST_RUNS_TABLE, LOG_FORMAT, LOG_LEVEL
+from bench.gen_raw import generate
+from db.replica import Replica, build_from_csv
+from keyset import SORT_KEYS
+from query_cache import search_params
+
+# Stand-in for the Supabase REST API (PostgREST) covering the requests app.py makes. Rows live in a
+# db/replica.py SQLite file seeded from bench/gen_raw.py, so filters, keyset order and text search
+# behave like the real endpoints; every response is delayed by the configured network latency.
+STUB_KEY = "stub.stub.stub"
+
+
+def after_value(expr, sort):
+    # Inverse of keyset.after_filter(): recovers (value, last_id) from the `or` filter.
+    col, _ = SORT_KEYS[sort]
+    last_id = int(re.search(r"id\.gt\.(\d+)", expr).group(1))
+    m = re.search(re.escape(col) + r'\.eq\."((?:[^"\\]|\\.)*)"', expr)
+    if m is None:
+        return None, last_id
+    value = re.sub(r"\\(.)", r"\1", m.group(1))
+    return (float(value) if col == "rating" else value), last_id
+
+
+def table_params(query):
+    # Translates the PostgREST query string apply_filters()/fetch_page() build into search params.
+    params = search_params({})
+    params["view"] = "list"
+    limit, or_expr = None, None
+    for key, val in parse_qsl(query, keep_blank_values=True):
+        op, _, arg = val.partition(".")
+        if key == "select":
+            params["view"] = "full" if val == "*" else "list"
+        elif key == "limit":
+            limit = int(val)
+        elif key == "order":
+            params["sort"] = "name_asc" if val.startswith("name.") else "rating_desc"
+        elif key == "or":
+            or_expr = val
+        elif key == "category" and op == "eq":
+            params["category"] = arg
+        elif key == "query_location" and op == "ilike":
+            params["location"] = arg.rstrip("%*").lower()
+        elif key == "rating" and op == "gte":
+            params["min_rating"] = float(arg)
+        elif key in ("phone", "website") and op == "neq":
+            params["has_" + key] = True
+        elif key == "address_line" and op == "ilike":
+            params["address_contains"] = arg.strip("%*").lower()
+    after = after_value(or_expr, params["sort"]) if or_expr else None
+    return params, after, limit
+
+
+def rpc_params(body):
+    params = search_params({})
+    params.update(
+        {
+            "q": body.get("q") or "",
+            "category": body.get("p_category") or "",
+            "location": (body.get("p_location") or "").lower(),
+            "min_rating": body.get("p_min_rating"),
+            "has_phone": bool(body.get("p_has_phone")),
+            "has_website": bool(body.get("p_has_website")),
+            "address_contains": (body.get("p_address") or "").lower(),
+            "sort": "relevance",
+            "view": "list",
+        }
+    )
+    after = None
+    if body.get("p_after_id") is not None:
+        after = (body.get("p_after_rank"), body["p_after_id"])
+    return params, after, body.get("p_limit") or 100
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    replica = None
+    latency = 0.02
+    jitter = 0.01
+
+    def send_json(self, obj, headers=None):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def delay(self):
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def do_GET(self):
+        # supabase-py sends "{}" with its GETs; left unread it would be parsed as the next request
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        url = urlsplit(self.path)
+        table = url.path.rsplit("/", 1)[-1]
+        self.delay()
+        if table == INGEST_RUNS_TABLE:
+            return self.send_json([{"id": 1}])
+        if table == FACETS_TABLE:
+            return self.send_json([{"name": "locations", "items": self.replica.locations()}])
+        if table == "distinct_query_locations":
+            return self.send_json([{"query_location": v} for v in self.replica.locations()])
+        params, after, limit = table_params(url.query)
+        rows = self.replica.search(params, after, limit or 1000)
+        headers = {}
+        prefer = self.headers.get("Prefer", "")
+        if "count=" in prefer:
+            total = self.replica.count(params)
+            headers["Content-Range"] = f"0-{len(rows) - 1}/{total}" if rows else f"*/{total}"
+        self.send_json(rows, headers)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        self.delay()
+        params, after, limit = rpc_params(body)
+        if url.path.endswith("/rpc/search_leads_count"):
+            return self.send_json(self.replica.count(params))
+        if url.path.endswith("/rpc/search_leads"):
+            return self.send_json(self.replica.search(params, after, limit))
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def seed(path, rows, seed_value=1234):
+    if os.path.exists(path):
+        return path
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = os.path.join(tmp, "raw.csv")
+        generate(raw, rows, dup_rate=0.0, seed=seed_value)
+        build_from_csv(raw, path)
+    return path
+
+
+def start(db_path, port=0, latency=0.02, jitter=0.01):
+    handler = type("Handler", (StubHandler,), {"replica": Replica(db_path), "latency": latency, "jitter": jitter})
+    srv = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve a local stand-in for the Supabase REST API")
+    ap.add_argument("--port", type=int, default=54321)
+    ap.add_argument("--rows", type=int, default=50000, help="Seeded places (when --db does not exist yet)")
+    ap.add_argument("--db", default="stub_places.sqlite")
+    ap.add_argument("--latency", type=float, default=0.02, help="Delay per request in seconds")
+    ap.add_argument("--jitter", type=float, default=0.01, help="Extra random delay, up to this many seconds")
+    ap.add_argument("--log", default=LOG_LEVEL)
+    args = ap.parse_args()
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+
+    seed(args.db, args.rows)
+    srv, base = start(args.db, args.port, args.latency, args.jitter)
+    logging.info("Serving stub PostgREST at %s (SUPABASE_URL=%s SUPABASE_ANON_KEY=%s)", base, base, STUB_KEY)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
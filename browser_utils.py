@@ -1,10 +1,55 @@
-import platform, subprocess, re
+import logging, os, platform, random, re, shutil, subprocess, threading, time
+from functools import lru_cache
+
 try:
     import winreg
 except ImportError:
     winreg = None
 
-def get_installed_chrome_major():
+try:
+    import undetected_chromedriver as uc
+    from undetected_chromedriver.patcher import Patcher
+except ImportError:
+    uc = Patcher = None
+
+from config import (
+    USER_AGENTS,
+    CHROME_VERSION_FALLBACK,
+    CHROMEDRIVER_CACHE_DIR,
+    PAGELOAD_TIMEOUT,
+    SCRIPT_TIMEOUT,
+)
+from profile_pool import CACHE_SAVINGS_FN, RESOURCE_BUFFER_JS
+
+CHROME_NAMES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+MAC_CHROME = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+
+PATCH_LOCK = threading.Lock()
+STATS_LOCK = threading.Lock()
+LAUNCH_STATS = {"launches": 0, "failures": 0, "total_s": 0.0, "max_s": 0.0, "patch_s": 0.0, "probe_s": 0.0}
+PROFILE_POOL = None
+LEASES = {}
+
+
+def set_profile_pool(pool):
+    global PROFILE_POOL
+    PROFILE_POOL = pool
+
+
+def find_chrome_binary():
+    env = os.environ.get("CHROME_BINARY")
+    if env:
+        return env
+    for name in CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    if platform.system() == "Darwin" and os.path.exists(MAC_CHROME):
+        return MAC_CHROME
+    return None
+
+
+def _probe_chrome_major():
     # Windows detection
     if platform.system().lower() == "windows" and winreg:
         for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
@@ -15,12 +60,151 @@ def get_installed_chrome_major():
             except Exception:
                 continue
     # Linux/macOS detection
-    for cmd in ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"]:
+    binary = find_chrome_binary()
+    if binary:
         try:
-            output = subprocess.check_output([cmd, "--version"], stderr=subprocess.STDOUT, text=True)
+            output = subprocess.check_output([binary, "--version"], stderr=subprocess.STDOUT, text=True, timeout=10)
             match = re.search(r"(\d+)\.", output)
             if match:
                 return int(match.group(1))
         except Exception:
-            continue
+            pass
     return None
+
+
+@lru_cache(maxsize=None)
+def get_installed_chrome_major():
+    t0 = time.perf_counter()
+    major = _probe_chrome_major()
+    LAUNCH_STATS["probe_s"] += time.perf_counter() - t0
+    logging.info("Detected Chrome major version: %s", major or f"unknown (fallback {CHROME_VERSION_FALLBACK})")
+    return major
+
+
+def patched_driver_path(major):
+    # undetected-chromedriver downloads and patches chromedriver on every launch unless it is
+    # handed an already patched binary, so keep one per Chrome major version.
+    if Patcher is None:
+        return None
+    name = f"chromedriver_{major}" + (".exe" if platform.system().lower() == "windows" else "")
+    path = os.path.join(CHROMEDRIVER_CACHE_DIR, name)
+    with PATCH_LOCK:
+        if os.path.exists(path):
+            return path
+        t0 = time.perf_counter()
+        try:
+            os.makedirs(CHROMEDRIVER_CACHE_DIR, exist_ok=True)
+            patcher = Patcher(version_main=major)
+            patcher.auto()
+            tmp = path + ".tmp"
+            shutil.copy2(patcher.executable_path, tmp)
+            os.replace(tmp, path)
+        except Exception as e:
+            logging.warning("Could not cache a patched chromedriver for Chrome %s: %s", major, e)
+            return None
+        finally:
+            LAUNCH_STATS["patch_s"] += time.perf_counter() - t0
+        logging.info("Cached patched chromedriver for Chrome %s at %s", major, path)
+        return path
+
+
+def new_chrome(headless, window_size="1280,900", extra_args=None, label="browser"):
+    ua = random.choice(USER_AGENTS)
+    logging.info("Launching %s: UA=%s | headless=%s", label, ua, headless)
+    opts = uc.ChromeOptions()
+    if headless:
+        opts.add_argument("--headless=new")
+    opts.add_argument("--disable-blink-features=AutomationControlled")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--user-agent=" + ua)
+    opts.add_argument("--window-size=" + window_size)
+    opts.add_argument("--blink-settings=imagesEnabled=true")
+    for arg in extra_args or []:
+        opts.add_argument(arg)
+    major = get_installed_chrome_major() or CHROME_VERSION_FALLBACK
+    kwargs = {"options": opts, "version_main": major}
+    exe = patched_driver_path(major)
+    if exe:
+        kwargs["driver_executable_path"] = exe
+    profile = lease_profile()
+    if profile:
+        kwargs["user_data_dir"] = profile
+        for arg in PROFILE_POOL.chrome_args():
+            opts.add_argument(arg)
+    t0 = time.perf_counter()
+    try:
+        driver = uc.Chrome(**kwargs)
+    except Exception:
+        with STATS_LOCK:
+            LAUNCH_STATS["failures"] += 1
+        release_profile(profile)
+        raise
+    if profile:
+        LEASES[id(driver)] = profile
+    dt = time.perf_counter() - t0
+    with STATS_LOCK:
+        LAUNCH_STATS["launches"] += 1
+        LAUNCH_STATS["total_s"] += dt
+        LAUNCH_STATS["max_s"] = max(LAUNCH_STATS["max_s"], dt)
+    logging.debug("%s launched in %.2fs", label, dt)
+    try:
+        driver.set_page_load_timeout(PAGELOAD_TIMEOUT)
+        driver.set_script_timeout(SCRIPT_TIMEOUT)
+    except Exception:
+        pass
+    if profile:
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": RESOURCE_BUFFER_JS})
+        except Exception:
+            pass
+    return driver
+
+
+def lease_profile():
+    return PROFILE_POOL.lease() if PROFILE_POOL is not None else None
+
+
+def release_profile(profile):
+    if profile and PROFILE_POOL is not None:
+        PROFILE_POOL.release(profile)
+
+
+def quit_chrome(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    release_profile(LEASES.pop(id(driver), None))
+
+
+def sample_page(driver):
+    # Records how much of the current document came from the disk cache; no-op without a pool.
+    if PROFILE_POOL is not None:
+        PROFILE_POOL.sample(driver)
+
+
+async def sample_page_cdp(page):
+    if PROFILE_POOL is not None:
+        try:
+            PROFILE_POOL.record(await page.execute_script(CACHE_SAVINGS_FN))
+        except Exception:
+            pass
+
+
+def log_launch_stats():
+    s = LAUNCH_STATS
+    if not s["launches"] and not s["failures"]:
+        return
+    logging.info(
+        "Browser launches: %d (failed %d) | avg %.2fs | max %.2fs | version probe %.2fs | driver patch %.2fs",
+        s["launches"],
+        s["failures"],
+        s["total_s"] / s["launches"] if s["launches"] else 0.0,
+        s["max_s"],
+        s["probe_s"],
+        s["patch_s"],
+    )
+    if PROFILE_POOL is not None:
+        PROFILE_POOL.log()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import argparse, csv, re, unicodedata, json, logging, sys
+import argparse, csv, os, re, json, logging, sys
 from urllib.parse import unquote, urlparse, parse_qs
 from pathlib import Path
 
@@ -8,21 +8,16 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from config import LOG_FORMAT, LOG_LEVEL
+from config import LOG_FORMAT, LOG_LEVEL, CLEAN_STATE_EXPECTED_KEYS
+from info_lines import classify, parse_price
+from normalizers import cached, nfc, nfc_field, nfc_uncached, log_cache_stats
+from cleaner.photo_index import PhotoIndex, key_id
 
-CURRENCY_PATTERNS = [
-    r"(?:EGP|ج(?:\.\s*)م|LE|L\.E\.|E\s*P|جنيه)\s*\d+[\d\s,\.]*\+?",
-    r"\d+[\d\s,\.]*\s*(?:EGP|ج(?:\.\s*)م|LE|L\.E\.|E\s*P)\+?",
-    r"(?:min(?:imum)?|delivery|charge|service)\s*[:=]?\s*\d+[\d\s,\.]*",
-]
-PRICE_RE = re.compile("|".join(CURRENCY_PATTERNS), re.IGNORECASE)
-NUM_RE = re.compile(r"\d+(?:[\.,]\d+)?")
-EGP_NUM_RE = re.compile(r"(?:(?:EGP|LE|L\.E\.|E\s*P|ج(?:\.\s*)م)\s*)?(\d+[\d,\.]*)\s*(\+?)", re.IGNORECASE)
 ADDR_SPLIT_RE = re.compile(r"\s*[•·]\s*|")
-NBSP_REPL = {"\u00A0": " ", "\u202F": " "}
 
 PHONE_RE = re.compile(r"(?:\+?20)?0?1[0-2,5]\d{8}|(?:\+?20)?0?2\d{7,8}|(?:\+?20)?0?\d{8,11}")
 HTTP_RE = re.compile(r"^(?:https?:)?//", re.IGNORECASE)
+STATE_VERSION = 3
 
 SOCIAL_HOSTS = [
     "facebook.com",
@@ -76,6 +71,7 @@ def find_place_id(u):
     return None
 
 
+@cached("gmaps")
 def normalize_gmaps(u):
     if not u:
         return ""
@@ -103,114 +99,26 @@ def normalize_gmaps(u):
         return s
 
 
-def nfc(s):
-    if s is None:
-        return ""
-    s = unicodedata.normalize("NFKC", str(s))
-    for k, v in NBSP_REPL.items():
-        s = s.replace(k, v)
-    return s.strip()
-
-
 def looks_like_price(s):
-    if not s:
-        return False
-    return bool(PRICE_RE.search(s))
+    return classify(s).is_price
 
 
 def extract_price_fields(s):
-    if not s:
-        return "", "", "", False
-    m = EGPNormalizer(s)
-    return m["price_text"], m["price_min_egp"], m["price_max_egp"], m["price_is_plus"]
-
-
-def EGPNormalizer(s):
-    txt = " ".join(s.split())
-    nums = [x.group(0) for x in NUM_RE.finditer(txt)]
-    price_text = ""
-    plus = False
-    a = EGPNormalizeOnce(txt)
-    if a:
-        price_text = a["text"]
-        plus = a["plus"]
-        vals = a["values"]
-        if len(vals) == 1:
-            mn = mx = vals[0]
-        else:
-            mn, mx = min(vals), max(vals)
-        return {
-            "price_text": price_text,
-            "price_min_egp": str(mn),
-            "price_max_egp": str(mx),
-            "price_is_plus": plus,
-        }
-    if nums:
-        vals = []
-        for z in nums:
-            try:
-                vals.append(int(re.sub(r"[\.,]", "", z)))
-            except Exception:
-                pass
-        if vals:
-            mn = min(vals)
-            mx = max(vals)
-            return {
-                "price_text": txt,
-                "price_min_egp": str(mn),
-                "price_max_egp": str(mx),
-                "price_is_plus": "+" in txt,
-            }
-    return {
-        "price_text": "",
-        "price_min_egp": "",
-        "price_max_egp": "",
-        "price_is_plus": False,
-    }
-
-
-def EGPNormalizeOnce(txt):
-    vals = []
-    plus = False
-    for m in EGP_NUM_RE.finditer(txt):
-        raw = m.group(1)
-        if raw:
-            try:
-                vals.append(int(re.sub(r"[\.,]", "", raw)))
-            except Exception:
-                pass
-        if m.group(2):
-            plus = True
-    if not vals:
-        return None
-    return {"text": txt, "values": vals, "plus": plus}
+    c = classify(s)
+    if c.is_price:
+        return c.price_text, c.price_min_egp, c.price_max_egp, c.price_is_plus
+    return parse_price(s)
 
 
 def looks_like_address(s):
-    if not s:
-        return False
-    if looks_like_price(s):
-        return False
-    if re.search(
-        r"\b(?:Street|St\.|Road|Rd\.|Square|Sq\.|Mohand(?:seen)?|Nasr|Heliopolis|Giza|Cairo|Alex|Maadi|Dokki|Zamalek|New Cairo|6th of October|Sheikh Zayed|العنوان|شارع|ميدان|طريق|القاهرة|الجيزة|المعادي|الدقي|مدينة نصر|مصر الجديدة)\b",
-        s,
-        re.IGNORECASE,
-    ):
-        return True
-    if re.search(r"\d", s) and re.search(r"\b[A-Za-z\u0600-\u06FF]{3,}\b", s):
-        return True
-    return False
+    return classify(s).is_address
 
 
 def split_category_line_for_address(cat_line):
     if not cat_line:
         return "", ""
-    parts = re.split(r"\s*[·•]\s*", cat_line)
-    if len(parts) >= 2:
-        left = parts[0].strip()
-        right = parts[-1].strip()
-        return left, right
-    return cat_line.strip(), ""
+    c = classify(cat_line)
+    return c.left, c.right
 
 
 def normalize_phone(s):
@@ -232,6 +140,7 @@ def normalize_phone(s):
     return "+20" + digits
 
 
+@cached("website")
 def normalize_website(u):
     if not u:
         return ""
@@ -243,6 +152,7 @@ def normalize_website(u):
     return u
 
 
+@cached("social_links")
 def normalize_social_links(s):
     if not s:
         return ""
@@ -270,22 +180,19 @@ def normalize_social_links(s):
 def fix_address_and_price(row):
     addr = nfc(row.get("address_line", ""))
     catline = nfc(row.get("category_line", ""))
-    addr_is_price = looks_like_price(addr)
+    addr_info = classify(addr)
+    cat_info = classify(catline)
+    addr_is_price = addr_info.is_price
     recovered_addr = addr
-    left, right = split_category_line_for_address(catline)
-    if (not recovered_addr or addr_is_price) and right and looks_like_address(right):
+    left, right = cat_info.left, cat_info.right
+    if (not recovered_addr or addr_is_price) and right and classify(right).is_address:
         recovered_addr = right
-    if (not recovered_addr or addr_is_price) and left and looks_like_address(left):
+    if (not recovered_addr or addr_is_price) and left and classify(left).is_address:
         recovered_addr = left
-    price_source = ""
-    mtxt, mn, mx, plus = "", "", "", False
-    if addr_is_price:
-        price_source = addr
-        mtxt, mn, mx, plus = extract_price_fields(addr)
-    elif looks_like_price(catline):
-        price_source = catline
-        mtxt, mn, mx, plus = extract_price_fields(catline)
-    return recovered_addr, mtxt, mn, mx, plus
+    info = addr_info if addr_is_price else cat_info
+    if not info.is_price:
+        return recovered_addr, "", "", "", False
+    return recovered_addr, info.price_text, info.price_min_egp, info.price_max_egp, info.price_is_plus
 
 
 def fix_rating(x):
@@ -301,10 +208,10 @@ def fix_reviews(x):
 
 
 def dedupe_key(row):
-    u = nfc(row.get("profile_url", "")).lower()
+    u = nfc_uncached(row.get("profile_url", "")).lower()
     if u:
         return ("u", u)
-    n = nfc(row.get("name", "")).lower()
+    n = nfc_uncached(row.get("name", "")).lower()
     a = nfc(row.get("address_line", "")).lower()
     if n and a:
         return ("na", n + "|" + a)
@@ -316,7 +223,7 @@ def dedupe_key(row):
 def normalize_photo_identity(u):
     if not u:
         return "", ""
-    u = nfc(u).strip().strip(",")
+    u = nfc_uncached(u).strip().strip(",")
     if not u:
         return "", ""
     if u.startswith("//"):
@@ -329,7 +236,12 @@ def normalize_photo_identity(u):
     return base, low
 
 
-def choose_single_unique_photo(raw, global_seen):
+def photo_owner(k):
+    # 64-bit id of a dedupe key; a photo stays "unique" for the place that claimed it first
+    return key_id("\x1f".join(k))
+
+
+def choose_single_unique_photo(raw, global_seen, owner=0):
     if not raw:
         return ""
     parts = [p.strip() for p in raw.split(",") if p.strip()]
@@ -341,8 +253,11 @@ def choose_single_unique_photo(raw, global_seen):
         if key in local_seen:
             continue
         local_seen.add(key)
-        if key not in global_seen:
-            global_seen.add(key)
+        holder = global_seen.get(key)
+        if holder is None:
+            global_seen[key] = owner
+            return base
+        if owner and holder == owner:
             return base
     if parts:
         base, key = normalize_photo_identity(parts[0])
@@ -387,70 +302,116 @@ def write_rows(path, fieldnames, rows):
             w.writerow(row)
 
 
-def process(in_path, out_path, drop_empty_name=False):
-    logging.info("Loading rows from %s", in_path)
-    orig_fields, rows = load_rows(in_path)
-    logging.info("Loaded %d rows with %d fields", len(rows), len(orig_fields))
-    extra_fields = [
-        "price_text",
-        "price_min_egp",
-        "price_max_egp",
-        "price_is_plus",
-        "phone_e164",
-        "address_clean_source",
-        "correct_name",
-    ]
+EXTRA_FIELDS = [
+    "price_text",
+    "price_min_egp",
+    "price_max_egp",
+    "price_is_plus",
+    "phone_e164",
+    "address_clean_source",
+    "correct_name",
+]
+
+
+def output_fields(orig_fields):
     fieldset = list(orig_fields)
-    for f in extra_fields:
+    for f in EXTRA_FIELDS:
         if f not in fieldset:
             fieldset.append(f)
+    return fieldset
+
+
+def clean_row(row, seen, global_photos_seen, drop_empty_name=False):
+    for k in list(row.keys()):
+        row[k] = nfc_field(k, row[k])
+    row["rating"] = fix_rating(row.get("rating"))
+    row["reviews_count"] = fix_reviews(row.get("reviews_count"))
+    row["website"] = normalize_website(row.get("website", "")) if row.get("website") else ""
+    row["social_links"] = normalize_social_links(row.get("social_links", ""))
+    phone_e164 = normalize_phone(row.get("phone", ""))
+    addr_rec, ptxt, pmin, pmax, pplus = fix_address_and_price(row)
+    addr_src = "original"
+    if addr_rec and addr_rec != row.get("address_line", ""):
+        addr_src = "recovered"
+    if not addr_rec:
+        addr_src = "empty"
+    row["address_line"] = addr_rec
+    row["price_text"] = ptxt
+    row["price_min_egp"] = pmin
+    row["price_max_egp"] = pmax
+    row["price_is_plus"] = str(bool(pplus)).upper()
+    row["phone_e164"] = phone_e164
+    row["address_clean_source"] = addr_src
+    existing_cn = row.get("correct_name", "")
+    parsed_cn = extract_name_from_profile_url(row.get("profile_url", ""))
+    if parsed_cn:
+        row["correct_name"] = parsed_cn
+    else:
+        row["correct_name"] = existing_cn
+    if row.get("profile_url"):
+        row["profile_url"] = normalize_gmaps(row["profile_url"])
+    k = dedupe_key(row)
+    if "photo_urls" in row:
+        row["photo_urls"] = choose_single_unique_photo(
+            row.get("photo_urls", ""), global_photos_seen, photo_owner(k)
+        )
+    if k in seen:
+        return None, "duplicate"
+    seen.add(k)
+    if drop_empty_name and not row.get("name"):
+        return None, "empty_name"
+    return row, "ok"
+
+
+def open_photos_seen(photo_index):
+    if photo_index:
+        logging.info("Using persistent photo index %s", photo_index)
+        return PhotoIndex(photo_index)
+    return {}
+
+
+def close_photos_seen(photos_seen):
+    if isinstance(photos_seen, PhotoIndex):
+        photos_seen.close()
+
+
+class SeenKeys:
+    # Dedupe keys of every earlier incremental run, in the same append-only SQLite + bloom store
+    # as the photo index, so a run writes only its own new keys instead of re-serialising them all.
+    def __init__(self, path):
+        self.index = PhotoIndex(path, expected_keys=CLEAN_STATE_EXPECTED_KEYS)
+
+    def __contains__(self, k):
+        return "\x1f".join(k) in self.index
+
+    def add(self, k):
+        self.index.add("\x1f".join(k))
+
+    def close(self):
+        self.index.close()
+
+
+def process(in_path, out_path, drop_empty_name=False, photo_index=None):
+    logging.info("Loading rows from %s", in_path)
+    orig_fields, rows = load_rows(in_path)
+    logging.info("Loaded %d rows with %d fields", len(rows), len(orig_fields))
+    fieldset = output_fields(orig_fields)
     cleaned = []
     seen = set()
-    global_photos_seen = set()
+    global_photos_seen = open_photos_seen(photo_index)
     dup_skipped = 0
     empty_name_skipped = 0
-    for row in rows:
-        for k in list(row.keys()):
-            row[k] = nfc(row[k])
-        row["rating"] = fix_rating(row.get("rating"))
-        row["reviews_count"] = fix_reviews(row.get("reviews_count"))
-        row["website"] = normalize_website(row.get("website", "")) if row.get("website") else ""
-        row["social_links"] = normalize_social_links(row.get("social_links", ""))
-        phone_e164 = normalize_phone(row.get("phone", ""))
-        addr_rec, ptxt, pmin, pmax, pplus = fix_address_and_price(row)
-        addr_src = "original"
-        if addr_rec and addr_rec != row.get("address_line", ""):
-            addr_src = "recovered"
-        if not addr_rec:
-            addr_src = "empty"
-        row["address_line"] = addr_rec
-        row["price_text"] = ptxt
-        row["price_min_egp"] = pmin
-        row["price_max_egp"] = pmax
-        row["price_is_plus"] = str(bool(pplus)).upper()
-        row["phone_e164"] = phone_e164
-        row["address_clean_source"] = addr_src
-        if "photo_urls" in row:
-            row["photo_urls"] = choose_single_unique_photo(
-                row.get("photo_urls", ""), global_photos_seen
-            )
-        existing_cn = row.get("correct_name", "")
-        parsed_cn = extract_name_from_profile_url(row.get("profile_url", ""))
-        if parsed_cn:
-            row["correct_name"] = parsed_cn
-        else:
-            row["correct_name"] = existing_cn
-        if row.get("profile_url"):
-            row["profile_url"] = normalize_gmaps(row["profile_url"])
-        k = dedupe_key(row)
-        if k in seen:
-            dup_skipped += 1
-            continue
-        seen.add(k)
-        if drop_empty_name and not row.get("name"):
-            empty_name_skipped += 1
-            continue
-        cleaned.append(row)
+    try:
+        for row in rows:
+            row, status = clean_row(row, seen, global_photos_seen, drop_empty_name)
+            if status == "duplicate":
+                dup_skipped += 1
+            elif status == "empty_name":
+                empty_name_skipped += 1
+            else:
+                cleaned.append(row)
+    finally:
+        close_photos_seen(global_photos_seen)
     logging.info(
         "Cleaning done: input_rows=%d output_rows=%d duplicates_skipped=%d empty_name_skipped=%d",
         len(rows),
@@ -460,6 +421,152 @@ def process(in_path, out_path, drop_empty_name=False):
     )
     write_rows(out_path, fieldset, cleaned)
     logging.info("Wrote cleaned CSV to %s", out_path)
+    log_cache_stats()
+
+
+def state_path_for(out_path):
+    return str(out_path) + ".state.json"
+
+
+def state_db_paths(state_path):
+    # Sidecar stores for the checkpoint: dedupe keys, and the photos seen when no shared --photo-index is given.
+    return state_path + ".seen.sqlite", state_path + ".photos.sqlite"
+
+
+def remove_state_dbs(state_path):
+    for db in state_db_paths(state_path):
+        for p in (db, db + "-wal", db + "-shm", db + ".bloom"):
+            if os.path.exists(p):
+                os.remove(p)
+
+
+def load_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            st = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning("Incremental: ignoring unreadable state %s: %s", path, e)
+        return None
+    if st.get("version") != STATE_VERSION:
+        logging.info("Incremental: state version mismatch in %s, rebuilding", path)
+        return None
+    return st
+
+
+def save_state(path, st):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(st, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def read_new_rows(in_path, offset, fieldnames):
+    with open(in_path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    # Only consume whole records, so a row still being appended is picked up next run. A quoted
+    # field (address, opening hours) can span lines, so the cut is where the reader finished a
+    # record, not the last newline.
+    consumed = [0, False]
+
+    def lines():
+        for i, line in enumerate(data.splitlines(keepends=True)):
+            if not line.endswith(b"\n"):
+                break
+            consumed[0] += len(line)
+            yield line.decode("utf-8-sig" if offset == 0 and i == 0 else "utf-8")
+        consumed[1] = True
+
+    rdr = csv.reader(lines())
+    cut = 0
+    rows = []
+    for rec in rdr:
+        if consumed[1]:
+            # ran out of input inside a quoted field: the record is not complete yet
+            break
+        cut = consumed[0]
+        if fieldnames is None:
+            fieldnames = rec
+            continue
+        if not rec:
+            continue
+        row = dict(zip(fieldnames, rec))
+        for fn in fieldnames[len(rec):]:
+            row[fn] = ""
+        rows.append(row)
+    return fieldnames or [], rows, offset + cut
+
+
+def process_incremental(in_path, out_path, drop_empty_name=False, state_path=None, photo_index=None):
+    state_path = state_path or state_path_for(out_path)
+    st = load_state(state_path)
+    size = os.path.getsize(in_path)
+    if st is not None and (st.get("in_path") != os.path.abspath(in_path) or size < st.get("offset", 0)):
+        logging.info("Incremental: input changed since last checkpoint, rebuilding")
+        st = None
+    if st is not None and not os.path.exists(out_path):
+        logging.info("Incremental: %s missing, rebuilding", out_path)
+        st = None
+    if st is None:
+        remove_state_dbs(state_path)
+        st = {
+            "version": STATE_VERSION,
+            "in_path": os.path.abspath(in_path),
+            "offset": 0,
+            "rows_in": 0,
+            "rows_out": 0,
+            "fieldnames": None,
+        }
+    fieldnames, rows, new_offset = read_new_rows(in_path, st["offset"], st["fieldnames"])
+    logging.info(
+        "Incremental: checkpoint offset=%d rows_in=%d | new_rows=%d",
+        st["offset"],
+        st["rows_in"],
+        len(rows),
+    )
+    fieldset = output_fields(fieldnames)
+    seen_path, photos_path = state_db_paths(state_path)
+    seen = SeenKeys(seen_path)
+    # A shared --photo-index also spans other outputs; otherwise this checkpoint keeps its own.
+    global_photos_seen = PhotoIndex(photo_index or photos_path, expected_keys=CLEAN_STATE_EXPECTED_KEYS)
+    cleaned = []
+    dup_skipped = 0
+    empty_name_skipped = 0
+    try:
+        for row in rows:
+            row, status = clean_row(row, seen, global_photos_seen, drop_empty_name)
+            if status == "duplicate":
+                dup_skipped += 1
+            elif status == "empty_name":
+                empty_name_skipped += 1
+            else:
+                cleaned.append(row)
+    finally:
+        seen.close()
+        global_photos_seen.close()
+    if st["offset"] == 0:
+        write_rows(out_path, fieldset, cleaned)
+    else:
+        with open(out_path, "a", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=fieldset)
+            for row in cleaned:
+                w.writerow(row)
+    st["offset"] = new_offset
+    st["rows_in"] += len(rows)
+    st["rows_out"] += len(cleaned)
+    st["fieldnames"] = fieldnames
+    save_state(state_path, st)
+    logging.info(
+        "Incremental cleaning done: new_rows=%d appended=%d duplicates_skipped=%d empty_name_skipped=%d total_out=%d",
+        len(rows),
+        len(cleaned),
+        dup_skipped,
+        empty_name_skipped,
+        st["rows_out"],
+    )
+    log_cache_stats()
 
 
 def main():
@@ -467,6 +574,9 @@ def main():
     ap.add_argument("--in", dest="inp", required=True)
     ap.add_argument("--out", dest="out", required=True)
     ap.add_argument("--drop-empty-name", action="store_true")
+    ap.add_argument("--incremental", action="store_true", help="Only clean rows appended since the last checkpoint")
+    ap.add_argument("--state", dest="state", default="", help="Checkpoint file (default: <out>.state.json)")
+    ap.add_argument("--photo-index", dest="photo_index", default="", help="Persistent photo identity index shared across runs")
     ap.add_argument("--log", dest="log", default=LOG_LEVEL)
     args = ap.parse_args()
     level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
@@ -479,12 +589,27 @@ def main():
         ],
     )
     logging.info(
-        "Starting CSV cleaning: in=%s out=%s drop_empty_name=%s",
+        "Starting CSV cleaning: in=%s out=%s drop_empty_name=%s incremental=%s",
         args.inp,
         args.out,
         args.drop_empty_name,
+        args.incremental,
     )
-    process(args.inp, args.out, drop_empty_name=args.drop_empty_name)
+    if args.incremental:
+        process_incremental(
+            args.inp,
+            args.out,
+            drop_empty_name=args.drop_empty_name,
+            state_path=args.state or None,
+            photo_index=args.photo_index or None,
+        )
+    else:
+        process(
+            args.inp,
+            args.out,
+            drop_empty_name=args.drop_empty_name,
+            photo_index=args.photo_index or None,
+        )
 
 
 if __name__ == "__main__":
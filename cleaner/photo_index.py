@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+import hashlib, logging, math, os, sqlite3, struct, sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import PHOTO_INDEX_EXPECTED_KEYS, PHOTO_INDEX_FP_RATE, PHOTO_INDEX_FLUSH_EVERY
+
+BLOOM_MAGIC = b"PHBF"
+BLOOM_HEADER = struct.Struct("<4sQIQ")
+
+
+def key_id(key):
+    # 64-bit fingerprint stored as a signed sqlite INTEGER PRIMARY KEY (the rowid),
+    # so each key costs one b-tree entry and no separate text column.
+    h = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return struct.unpack("<q", h)[0]
+
+
+class BloomFilter:
+    def __init__(self, num_bits, num_hashes, data=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = data if data is not None else bytearray((num_bits + 7) // 8)
+        # keys it was sized for at fp_rate; past this the false-positive rate climbs
+        self.capacity = max(1, int(num_bits / num_hashes * math.log(2)))
+
+    @classmethod
+    def for_capacity(cls, n, fp_rate):
+        n = max(1, n)
+        m = int(math.ceil(-n * math.log(fp_rate) / (math.log(2) ** 2)))
+        k = max(1, int(round(m / n * math.log(2))))
+        return cls(m, k)
+
+    def _positions(self, kid):
+        h = kid & 0xFFFFFFFFFFFFFFFF
+        a = h & 0xFFFFFFFF
+        b = (h >> 32) | 1
+        m = self.num_bits
+        return [(a + i * b) % m for i in range(self.num_hashes)]
+
+    def add(self, kid):
+        bits = self.bits
+        for p in self._positions(kid):
+            bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, kid):
+        bits = self.bits
+        for p in self._positions(kid):
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+
+class PhotoIndex:
+    def __init__(self, path, expected_keys=PHOTO_INDEX_EXPECTED_KEYS, fp_rate=PHOTO_INDEX_FP_RATE):
+        self.path = str(path)
+        self.bloom_path = self.path + ".bloom"
+        self.fp_rate = fp_rate
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        # owner is the key_id of the place that first used the photo, so re-cleaning that place keeps it
+        self.db.execute("CREATE TABLE IF NOT EXISTS photos (id INTEGER PRIMARY KEY, owner INTEGER)")
+        if "owner" not in {r[1] for r in self.db.execute("PRAGMA table_info(photos)")}:
+            self.db.execute("ALTER TABLE photos ADD COLUMN owner INTEGER")
+        self.count = self.db.execute("SELECT COUNT(*) FROM photos").fetchone()[0]
+        self.pending = {}
+        self.lookups = 0
+        self.bloom_rejects = 0
+        self.disk_lookups = 0
+        self.disk_hits = 0
+        self.bloom = self._load_bloom(max(expected_keys, self.count * 2))
+
+    def _load_bloom(self, capacity):
+        try:
+            with open(self.bloom_path, "rb") as f:
+                magic, m, k, count = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+                data = bytearray(f.read())
+            if magic == BLOOM_MAGIC and count == self.count and len(data) == (m + 7) // 8:
+                bloom = BloomFilter(m, k, data)
+                if self.count <= bloom.capacity:
+                    return bloom
+                logging.info("Photo index: %d keys outgrew the bloom filter (%d), resizing", self.count, bloom.capacity)
+            else:
+                logging.info("Photo index: bloom filter out of date (%d vs %d keys), rebuilding", count, self.count)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning("Photo index: unreadable bloom file %s: %s", self.bloom_path, e)
+        return self._rebuild_bloom(capacity)
+
+    def _rebuild_bloom(self, capacity):
+        bloom = BloomFilter.for_capacity(capacity, self.fp_rate)
+        for (kid,) in self.db.execute("SELECT id FROM photos"):
+            bloom.add(kid)
+        for kid in self.pending:
+            bloom.add(kid)
+        return bloom
+
+    def _lookup(self, key):
+        # (found, owner); owner is None for keys stored before owners were tracked
+        self.lookups += 1
+        kid = key_id(key)
+        if kid not in self.bloom:
+            self.bloom_rejects += 1
+            return False, None
+        if kid in self.pending:
+            return True, self.pending[kid]
+        self.disk_lookups += 1
+        row = self.db.execute("SELECT owner FROM photos WHERE id = ?", (kid,)).fetchone()
+        if row is None:
+            return False, None
+        self.disk_hits += 1
+        return True, row[0]
+
+    def __contains__(self, key):
+        return self._lookup(key)[0]
+
+    def get(self, key, default=None):
+        # owner of a known photo; keys stored before owners were tracked report 0 (nobody)
+        found, owner = self._lookup(key)
+        if not found:
+            return default
+        return 0 if owner is None else owner
+
+    def add(self, key, owner=None):
+        kid = key_id(key)
+        if kid in self.pending:
+            return
+        self.pending[kid] = owner
+        self.bloom.add(kid)
+        if len(self.pending) >= PHOTO_INDEX_FLUSH_EVERY:
+            self.flush()
+
+    def __setitem__(self, key, owner):
+        self.add(key, owner)
+
+    def flush(self):
+        if not self.pending:
+            return
+        before = self.db.total_changes
+        self.db.executemany("INSERT OR IGNORE INTO photos (id, owner) VALUES (?, ?)", self.pending.items())
+        self.db.commit()
+        self.count += self.db.total_changes - before
+        self.pending.clear()
+        if self.count > self.bloom.capacity:
+            logging.info("Photo index: %d keys outgrew the bloom filter (%d), resizing", self.count, self.bloom.capacity)
+            self.bloom = self._rebuild_bloom(self.count * 2)
+
+    def save_bloom(self):
+        tmp = self.bloom_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, self.bloom.num_bits, self.bloom.num_hashes, self.count))
+            f.write(self.bloom.bits)
+        os.replace(tmp, self.bloom_path)
+
+    def stats(self):
+        return {
+            "keys": self.count + len(self.pending),
+            "lookups": self.lookups,
+            "bloom_rejects": self.bloom_rejects,
+            "disk_lookups": self.disk_lookups,
+            "disk_hits": self.disk_hits,
+            "bloom_false_positives": self.disk_lookups - self.disk_hits,
+            "bloom_bytes": len(self.bloom.bits),
+        }
+
+    def close(self):
+        self.flush()
+        self.save_bloom()
+        self.db.close()
+        st = self.stats()
+        logging.info(
+            "Photo index %s: keys=%d lookups=%d bloom_rejects=%d disk_lookups=%d false_positives=%d",
+            self.path,
+            st["keys"],
+            st["lookups"],
+            st["bloom_rejects"],
+            st["disk_lookups"],
+            st["bloom_false_positives"],
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
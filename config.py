@@ -7,6 +7,12 @@ SCROLL_DELAY_MIN = 0.25
 SCROLL_DELAY_MAX = 0.70
 HEADLESS_DEFAULT = True
 CHROME_VERSION_FALLBACK = 142
+CHROMEDRIVER_CACHE_DIR = ".chromedriver_cache"
+CDP_LAUNCH_TIMEOUT = 20
+PROFILE_POOL_DIR = ".chrome_profiles"
+PROFILE_POOL_SIZE = 4
+PROFILE_CACHE_MAX_MB = 200
+PROFILE_SCRUB_EVERY = 1
 
 CSV_FIELDS = [
     "category",
@@ -28,12 +34,67 @@ CSV_FIELDS = [
 
 DEFAULT_MAX_PLACES = 30
 BROWSER_RESTART_EVERY = 1
+DETAIL_TABS = 1
 PHONE_ENRICH_LIMIT = 100000
 PHONE_RESTART_EVERY = 200
+PHONE_WORKERS = 1
+PHONE_TABS = 1
+PHONE_DRIVER = "selenium"
+PHONE_CACHE_FILE = "phone_cache.sqlite"
+PHONE_CACHE_POSITIVE_TTL_DAYS = 90
+PHONE_CACHE_NEGATIVE_TTL_DAYS = 14
+PHONE_RENDER_SETTLE = 0.5
+PHONE_SETTLE_TRIES = 4
+PHONE_HTTP_FAST_PATH = True
+PHONE_HTTP_TIMEOUT = 10
+PHONE_HTTP_MAX_BYTES = 4 * 1024 * 1024
+SITE_CONCURRENCY = 200
+SITE_PER_HOST = 2
+SITE_TIMEOUT = 10
+SITE_MAX_BYTES = 1024 * 1024
+SITE_RESPECT_ROBOTS = True
 
 SUPABASE_TABLE_NAME = "production_maps"
 SUPABASE_BATCH_SIZE = 500
 
+INFO_LINE_CACHE_SIZE = 65536
+NORMALIZE_CACHE_DEFAULT = 16384
+NORMALIZE_CACHE_SIZES = {
+    "nfc": 131072,
+    "website": 16384,
+    "social_links": 16384,
+    "gmaps": 65536,
+}
+
+PHOTO_INDEX_EXPECTED_KEYS = 10000000
+PHOTO_INDEX_FP_RATE = 0.01
+PHOTO_INDEX_FLUSH_EVERY = 5000
+# bloom sizing for the incremental cleaner's own key stores (dedupe keys, per-output photos)
+CLEAN_STATE_EXPECTED_KEYS = 1000000
+
+SEARCH_CACHE_TTL = 300
+SEARCH_CACHE_ESTIMATED_TTL = 15
+# the only table db/migrations/ (search_leads, indexes) are written for
+TEXT_SEARCH_TABLE = "places"
+SEARCH_CACHE_MAX_ENTRIES = 2000
+SEARCH_CACHE_MAX_MB = 64
+SEARCH_CACHE_VERSION_CHECK = 15
+INGEST_RUNS_TABLE = "ingest_runs"
+FACETS_TABLE = "search_facets"
+META_MAX_AGE = 60
+COUNT_EXACT_THRESHOLD = 5000
+COUNT_CACHE_TTL = 1800
+COUNT_CACHE_MAX_ENTRIES = 5000
+PAYLOAD_COMPRESS_MIN_BYTES = 1024
+PAYLOAD_GZIP_LEVEL = 6
+PAYLOAD_BROTLI_QUALITY = 5
+
+REPLICA_SYNC_BATCH = 1000
+REPLICA_SYNC_OVERLAP = 300
+
+# rows per /export round trip; keep at or under the PostgREST max-rows setting (1000 on Supabase)
+EXPORT_BATCH = 1000
+
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 LOG_LEVEL = "INFO"
 
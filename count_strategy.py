@@ -0,0 +1,78 @@
+import logging, threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import COUNT_EXACT_THRESHOLD, COUNT_CACHE_TTL, COUNT_CACHE_MAX_ENTRIES
+from query_cache import QueryCache, cache_key
+
+
+def count_key(params):
+    # The total depends on the filters only, not on the sort, view or page being shown.
+    return cache_key({k: v for k, v in params.items() if k not in ("sort", "cursor", "view")})
+
+
+class CountStrategy:
+    def __init__(self, exact_threshold=COUNT_EXACT_THRESHOLD, ttl=COUNT_CACHE_TTL, max_entries=COUNT_CACHE_MAX_ENTRIES, background=True):
+        self.exact_threshold = exact_threshold
+        self.cache = QueryCache(ttl=ttl, max_entries=max_entries, max_mb=1, version_check=0)
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="exact-count") if background else None
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.stats = {"last_page": 0, "cached": 0, "small": 0, "estimated": 0, "refreshes": 0}
+
+    def _bump(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def total(self, params, seen, has_next, planned, exact):
+        # seen/has_next describe the first page; planned is the planner's row estimate, or None when the
+        # backend gives none (search_leads, the replica), in which case the count is taken right away.
+        # exact() runs COUNT(*) for the same filters. Returns (total, "exact" | "estimated").
+        key = count_key(params)
+        if not has_next:
+            self.cache.put(key, seen, size=1)
+            self._bump("last_page")
+            return seen, "exact"
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._bump("cached")
+            return cached, "exact"
+        if planned is None or planned <= self.exact_threshold:
+            try:
+                n = exact()
+            except Exception as e:
+                logging.warning("Exact count failed, using the estimate: %s", e)
+            else:
+                self.cache.put(key, n, size=1)
+                self._bump("small")
+                return n, "exact"
+        self._bump("estimated")
+        self.refresh(key, exact)
+        return max(planned or 0, seen + 1), "estimated"
+
+    def refresh(self, key, exact):
+        # Wide filters get their exact count off the request path; later requests read it from the cache.
+        with self.lock:
+            if key in self.pending:
+                return
+            self.pending.add(key)
+        if self.pool is None:
+            self._refresh(key, exact)
+        else:
+            self.pool.submit(self._refresh, key, exact)
+
+    def _refresh(self, key, exact):
+        try:
+            self.cache.put(key, exact(), size=1)
+            self._bump("refreshes")
+        except Exception as e:
+            logging.warning("Exact count failed: %s", e)
+        finally:
+            with self.lock:
+                self.pending.discard(key)
+
+    def snapshot(self):
+        with self.lock:
+            s = dict(self.stats)
+            s["pending"] = len(self.pending)
+        s["cache"] = self.cache.snapshot()
+        return s
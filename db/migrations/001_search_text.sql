@@ -0,0 +1,109 @@
+-- Indexed free-text search for /search (?q=) and indexed ilike filters.
+-- Idempotent: safe to re-run, and to run after schema.sql on a fresh database.
+-- Written for public.places: app.py answers ?q= only when LEADS_TABLE is places (or a replica is set).
+
+create extension if not exists pg_trgm;
+
+alter table public.places add column if not exists correct_name text;
+
+-- 'simple' config: names and addresses mix Arabic and English, so no stemming or stop words.
+alter table public.places add column if not exists search_tsv tsvector
+generated always as (
+  setweight(to_tsvector('simple', coalesce(correct_name, '') || ' ' || coalesce(name, '')), 'A') ||
+  setweight(to_tsvector('simple', coalesce(address_line, '')), 'B')
+) stored;
+
+create index if not exists places_search_tsv_idx on public.places using gin (search_tsv);
+
+-- fuzzy name matches (typos, partial words) that the tsvector misses
+create index if not exists places_name_trgm_idx on public.places
+using gin ((coalesce(correct_name, '') || ' ' || coalesce(name, '')) gin_trgm_ops);
+
+-- address_contains: address_line ilike '%x%'; location: query_location ilike 'x%'
+create index if not exists places_address_trgm_idx on public.places using gin (address_line gin_trgm_ops);
+create index if not exists places_query_location_trgm_idx on public.places using gin (query_location gin_trgm_ops);
+
+-- Rows matching q and the /search filters, best first, continuing after (p_after_rank, p_after_id).
+create or replace function public.search_leads(
+  q text,
+  p_category text default null,
+  p_location text default null,
+  p_min_rating numeric default null,
+  p_has_phone boolean default false,
+  p_has_website boolean default false,
+  p_address text default null,
+  p_after_rank real default null,
+  p_after_id bigint default null,
+  p_limit integer default 101
+)
+returns table (
+  id bigint,
+  name text,
+  correct_name text,
+  category text,
+  query_location text,
+  address_line text,
+  phone text,
+  website text,
+  profile_url text,
+  rating numeric,
+  photo_urls text,
+  rank real
+)
+language sql stable
+as $$
+  with query as (
+    select websearch_to_tsquery('simple', q) as tsq
+  ),
+  hits as (
+    select
+      p.*,
+      (ts_rank_cd(p.search_tsv, query.tsq)
+        + similarity(coalesce(p.correct_name, '') || ' ' || coalesce(p.name, ''), q))::real as rank
+    from public.places p, query
+    where (p.search_tsv @@ query.tsq
+           or (coalesce(p.correct_name, '') || ' ' || coalesce(p.name, '')) % q)
+      and (p_category is null or p.category = p_category)
+      and (p_location is null or p.query_location ilike p_location || '%')
+      and (p_min_rating is null or nullif(p.rating::text, '')::numeric >= p_min_rating)
+      and (not p_has_phone or coalesce(p.phone, '') <> '')
+      and (not p_has_website or coalesce(p.website, '') <> '')
+      and (p_address is null or p.address_line ilike '%' || p_address || '%')
+  )
+  select
+    h.id, h.name, h.correct_name, h.category, h.query_location, h.address_line,
+    h.phone, h.website, h.profile_url, nullif(h.rating::text, '')::numeric, h.photo_urls, h.rank
+  from hits h
+  where p_after_rank is null
+     or h.rank < p_after_rank
+     or (h.rank = p_after_rank and h.id > p_after_id)
+  order by h.rank desc, h.id
+  limit p_limit
+$$;
+
+create or replace function public.search_leads_count(
+  q text,
+  p_category text default null,
+  p_location text default null,
+  p_min_rating numeric default null,
+  p_has_phone boolean default false,
+  p_has_website boolean default false,
+  p_address text default null
+)
+returns bigint
+language sql stable
+as $$
+  select count(*)
+  from public.places p
+  where (p.search_tsv @@ websearch_to_tsquery('simple', q)
+         or (coalesce(p.correct_name, '') || ' ' || coalesce(p.name, '')) % q)
+    and (p_category is null or p.category = p_category)
+    and (p_location is null or p.query_location ilike p_location || '%')
+    and (p_min_rating is null or nullif(p.rating::text, '')::numeric >= p_min_rating)
+    and (not p_has_phone or coalesce(p.phone, '') <> '')
+    and (not p_has_website or coalesce(p.website, '') <> '')
+    and (p_address is null or p.address_line ilike '%' || p_address || '%')
+$$;
+
+grant execute on function public.search_leads(text, text, text, numeric, boolean, boolean, text, real, bigint, integer) to anon;
+grant execute on function public.search_leads_count(text, text, text, numeric, boolean, boolean, text) to anon;
@@ -0,0 +1,145 @@
+-- Typed columns for the values /search filters and sorts on, plus indexes for its access paths.
+-- Values that do not parse become null. Re-running is a no-op once a column has its type.
+
+alter table public.places add column if not exists price_text text;
+alter table public.places add column if not exists price_min_egp text;
+alter table public.places add column if not exists price_max_egp text;
+alter table public.places add column if not exists price_is_plus text;
+alter table public.places add column if not exists phone_e164 text;
+alter table public.places add column if not exists address_clean_source text;
+
+-- "2024-13-45" passes any date-shaped regex; the cast decides, and what it rejects becomes null
+create or replace function pg_temp.try_timestamptz(v text) returns timestamptz
+language plpgsql as $f$
+begin
+  return v::timestamptz;
+exception when others then
+  return null;
+end
+$f$;
+
+do $$
+declare
+  spec record;
+begin
+  for spec in
+    select * from (values
+      -- ratings are 0-5 stars; larger values are mis-parsed fields and would overflow numeric(3,2)
+      ('rating', 'numeric(3,2)',
+       $q$case when rating ~ '^\s*[0-9]{1,3}(\.[0-9]+)?\s*$'
+          then case when round(rating::numeric, 2) <= 5 then round(rating::numeric, 2) end end$q$),
+      ('reviews_count', 'integer',
+       $q$case when length(regexp_replace(reviews_count, '[^0-9]', '', 'g')) between 1 and 9
+          then regexp_replace(reviews_count, '[^0-9]', '', 'g')::integer end$q$),
+      ('price_min_egp', 'numeric',
+       $q$case when price_min_egp ~ '^\s*[0-9]+(\.[0-9]+)?\s*$' then price_min_egp::numeric end$q$),
+      ('price_max_egp', 'numeric',
+       $q$case when price_max_egp ~ '^\s*[0-9]+(\.[0-9]+)?\s*$' then price_max_egp::numeric end$q$),
+      ('price_is_plus', 'boolean',
+       $q$case lower(trim(price_is_plus)) when 'true' then true when 'false' then false end$q$),
+      -- scraper timestamps carry no zone; they are read in the session time zone (UTC on Supabase)
+      ('timestamp', 'timestamptz',
+       $q$case when "timestamp" ~ '^\d{4}-\d{2}-\d{2}' then pg_temp.try_timestamptz("timestamp") end$q$)
+    ) as t(col, typ, expr)
+  loop
+    if exists (
+      select 1 from information_schema.columns
+      where table_schema = 'public' and table_name = 'places' and column_name = spec.col and data_type = 'text'
+    ) then
+      execute format('alter table public.places alter column %I type %s using %s', spec.col, spec.typ, spec.expr);
+    end if;
+  end loop;
+end
+$$;
+
+-- category (+ location) filter, sorted by rating
+create index if not exists places_cat_loc_rating_idx on public.places (category, query_location, rating desc nulls last, id);
+create index if not exists places_cat_rating_idx on public.places (category, rating desc nulls last, id);
+-- min_rating range and has_phone / has_website, sorted by rating
+create index if not exists places_has_phone_rating_idx on public.places (rating desc nulls last, id) where phone <> '';
+create index if not exists places_has_website_rating_idx on public.places (rating desc nulls last, id) where website <> '';
+create index if not exists places_has_phone_cat_idx on public.places (category, rating desc nulls last, id) where phone <> '';
+
+-- rating is numeric now, so the text-search functions can compare it directly
+create or replace function public.search_leads(
+  q text,
+  p_category text default null,
+  p_location text default null,
+  p_min_rating numeric default null,
+  p_has_phone boolean default false,
+  p_has_website boolean default false,
+  p_address text default null,
+  p_after_rank real default null,
+  p_after_id bigint default null,
+  p_limit integer default 101
+)
+returns table (
+  id bigint,
+  name text,
+  correct_name text,
+  category text,
+  query_location text,
+  address_line text,
+  phone text,
+  website text,
+  profile_url text,
+  rating numeric,
+  photo_urls text,
+  rank real
+)
+language sql stable
+as $$
+  with query as (
+    select websearch_to_tsquery('simple', q) as tsq
+  ),
+  hits as (
+    select
+      p.*,
+      (ts_rank_cd(p.search_tsv, query.tsq)
+        + similarity(coalesce(p.correct_name, '') || ' ' || coalesce(p.name, ''), q))::real as rank
+    from public.places p, query
+    where (p.search_tsv @@ query.tsq
+           or (coalesce(p.correct_name, '') || ' ' || coalesce(p.name, '')) % q)
+      and (p_category is null or p.category = p_category)
+      and (p_location is null or p.query_location ilike p_location || '%')
+      and (p_min_rating is null or p.rating >= p_min_rating)
+      and (not p_has_phone or coalesce(p.phone, '') <> '')
+      and (not p_has_website or coalesce(p.website, '') <> '')
+      and (p_address is null or p.address_line ilike '%' || p_address || '%')
+  )
+  select
+    h.id, h.name, h.correct_name, h.category, h.query_location, h.address_line,
+    h.phone, h.website, h.profile_url, h.rating, h.photo_urls, h.rank
+  from hits h
+  where p_after_rank is null
+     or h.rank < p_after_rank
+     or (h.rank = p_after_rank and h.id > p_after_id)
+  order by h.rank desc, h.id
+  limit p_limit
+$$;
+
+create or replace function public.search_leads_count(
+  q text,
+  p_category text default null,
+  p_location text default null,
+  p_min_rating numeric default null,
+  p_has_phone boolean default false,
+  p_has_website boolean default false,
+  p_address text default null
+)
+returns bigint
+language sql stable
+as $$
+  select count(*)
+  from public.places p
+  where (p.search_tsv @@ websearch_to_tsquery('simple', q)
+         or (coalesce(p.correct_name, '') || ' ' || coalesce(p.name, '')) % q)
+    and (p_category is null or p.category = p_category)
+    and (p_location is null or p.query_location ilike p_location || '%')
+    and (p_min_rating is null or p.rating >= p_min_rating)
+    and (not p_has_phone or coalesce(p.phone, '') <> '')
+    and (not p_has_website or coalesce(p.website, '') <> '')
+    and (p_address is null or p.address_line ilike '%' || p_address || '%')
+$$;
+
+analyze public.places;
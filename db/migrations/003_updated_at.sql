@@ -0,0 +1,18 @@
+-- Change tracking for the dashboard's local read replica (db/replica.py sync):
+-- it pulls rows with (updated_at, id) past the last pair it has seen.
+
+alter table public.places add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.places_touch_updated_at() returns trigger
+language plpgsql as $$
+begin
+  new.updated_at := now();
+  return new;
+end
+$$;
+
+drop trigger if exists places_touch_updated_at on public.places;
+create trigger places_touch_updated_at before update on public.places
+for each row execute function public.places_touch_updated_at();
+
+create index if not exists places_updated_at_id_idx on public.places (updated_at, id);
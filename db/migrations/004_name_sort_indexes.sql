@@ -0,0 +1,11 @@
+-- Index paths for the name_asc sort, plus a note on the location filter.
+--
+-- /search sends location as query_location ilike 'x%' (PostgREST cannot filter on lower(...)), and a
+-- btree cannot serve a case-insensitive prefix. Those shapes walk the category/sort index and filter
+-- query_location on the way, stopping at the page limit; places_query_location_trgm_idx (001) covers
+-- the selective case. tests/test_migrations.py checks both sorts with the filters the app sends.
+
+create index if not exists places_cat_name_idx on public.places (category, name, id);
+create index if not exists places_has_phone_name_idx on public.places (name, id) where phone <> '';
+
+analyze public.places;
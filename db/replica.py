@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os, sys, csv, time, sqlite3, argparse, logging, threading
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+
+try:
+    from supabase import create_client
+except ImportError:
+    create_client = None
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import LOG_FORMAT, LOG_LEVEL, REPLICA_SYNC_BATCH, REPLICA_SYNC_OVERLAP
+from db.rows import clean_row
+from keyset import SORT_KEYS
+from payload import VIEWS
+
+COLUMNS = [
+    "id",
+    "profile_url",
+    "name",
+    "correct_name",
+    "category",
+    "query_location",
+    "category_line",
+    "address_line",
+    "plus_code",
+    "phone",
+    "phone_e164",
+    "website",
+    "rating",
+    "reviews_count",
+    "opening_hours",
+    "social_links",
+    "photo_urls",
+    "price_text",
+    "price_min_egp",
+    "price_max_egp",
+    "price_is_plus",
+    "timestamp",
+    "updated_at",
+]
+
+# Text columns are stored as '' rather than NULL so only rating can be null; SQLite sorts
+# NULL last under DESC, which matches the Postgres order "rating desc nulls last".
+SCHEMA = """
+create table if not exists places (
+  id integer primary key,
+  profile_url text not null unique,
+  name text not null default '',
+  correct_name text not null default '',
+  category text not null default '',
+  query_location text not null default '' collate nocase,
+  category_line text not null default '',
+  address_line text not null default '',
+  plus_code text not null default '',
+  phone text not null default '',
+  phone_e164 text not null default '',
+  website text not null default '',
+  rating real,
+  reviews_count integer,
+  opening_hours text not null default '',
+  social_links text not null default '',
+  photo_urls text not null default '',
+  price_text text not null default '',
+  price_min_egp real,
+  price_max_egp real,
+  price_is_plus integer,
+  timestamp text,
+  updated_at text
+);
+create index if not exists places_rating_id on places (rating desc, id);
+create index if not exists places_name_id on places (name, id);
+create index if not exists places_location on places (query_location);
+create index if not exists places_cat_loc_rating on places (category, query_location, rating desc, id);
+create index if not exists places_cat_rating on places (category, rating desc, id);
+create index if not exists places_phone_rating on places (rating desc, id) where phone <> '';
+create index if not exists places_website_rating on places (rating desc, id) where website <> '';
+create virtual table if not exists places_fts using fts5(title, address_line, tokenize = 'unicode61 remove_diacritics 2');
+create table if not exists meta (key text primary key, value text);
+"""
+
+
+def like_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def fts_query(q: str) -> str:
+    # Every word must match, as a prefix, like typing into a search box.
+    return " ".join('"' + t.replace('"', '""') + '"*' for t in q.split())
+
+
+def filter_sql(params: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    where, args = [], []
+    if params["category"]:
+        where.append("p.category = ?")
+        args.append(params["category"])
+    if params["location"]:
+        where.append("p.query_location like ? escape '\\'")
+        args.append(like_escape(params["location"]) + "%")
+    if params["min_rating"] is not None:
+        where.append("p.rating >= ?")
+        args.append(params["min_rating"])
+    if params["has_phone"]:
+        where.append("p.phone <> ''")
+    if params["has_website"]:
+        where.append("p.website <> ''")
+    if params["address_contains"]:
+        where.append("p.address_line like ? escape '\\'")
+        args.append("%" + like_escape(params["address_contains"]) + "%")
+    return where, args
+
+
+def after_sql(sort: str, value, last_id: int, prefix: str = "p.") -> Tuple[str, List[Any]]:
+    col, desc = SORT_KEYS[sort]
+    col = prefix + col
+    if value is None:
+        return f"({col} is null and {prefix}id > ?)", [last_id]
+    op = "<" if desc else ">"
+    tail = f" or {col} is null" if desc else ""
+    return f"({col} {op} ? or ({col} = ? and {prefix}id > ?){tail})", [value, value, last_id]
+
+
+def to_record(r: Dict[str, Any]) -> Dict[str, Any]:
+    rec = {c: r.get(c) for c in COLUMNS}
+    for c in COLUMNS:
+        if rec[c] is None and c not in ("id", "rating", "reviews_count", "price_min_egp", "price_max_egp", "price_is_plus", "timestamp", "updated_at"):
+            rec[c] = ""
+    return rec
+
+
+class Replica:
+    # Read side used by app.py. One connection per thread; reopened when the file is replaced by a rebuild.
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.ino = None
+
+    def conn(self) -> sqlite3.Connection:
+        try:
+            ino = os.stat(self.path).st_ino
+        except OSError:
+            ino = None
+        c = getattr(self.local, "conn", None)
+        if c is None or self.local.ino != ino:
+            if c is not None:
+                c.close()
+            c = sqlite3.connect(self.path, check_same_thread=False)
+            c.row_factory = sqlite3.Row
+            c.execute("pragma query_only = 1")
+            self.local.conn, self.local.ino = c, ino
+        return c
+
+    def version(self) -> Optional[str]:
+        row = self.conn().execute("select value from meta where key = 'version'").fetchone()
+        return row[0] if row else None
+
+    def locations(self) -> List[str]:
+        rows = self.conn().execute("select distinct query_location from places where query_location <> '' order by query_location")
+        return [r[0] for r in rows]
+
+    def search(self, params: Dict[str, Any], after, limit: int) -> List[Dict[str, Any]]:
+        cols = VIEWS[params["view"]]
+        select = "p.*" if cols == ("*",) else ", ".join("p." + c for c in cols)
+        where, args = filter_sql(params)
+        if params["q"]:
+            sql = f"""
+                select * from (
+                  select {select}, -bm25(places_fts, 10.0, 4.0) as rank
+                  from places_fts join places p on p.id = places_fts.rowid
+                  where places_fts match ? {''.join(' and ' + w for w in where)}
+                ) p"""
+            args = [fts_query(params["q"])] + args
+            if after is not None:
+                cond, extra = after_sql("relevance", *after)
+                sql += " where " + cond
+                args += extra
+            sql += " order by p.rank desc, p.id limit ?"
+        else:
+            col, desc = SORT_KEYS[params["sort"]]
+            if after is not None:
+                cond, extra = after_sql(params["sort"], *after)
+                where.append(cond)
+                args += extra
+            sql = f"select {select} from places p"
+            if where:
+                sql += " where " + " and ".join(where)
+            sql += f" order by p.{col} {'desc' if desc else 'asc'}, p.id limit ?"
+        args.append(limit)
+        return [dict(r) for r in self.conn().execute(sql, args)]
+
+    def count(self, params: Dict[str, Any]) -> int:
+        where, args = filter_sql(params)
+        if params["q"]:
+            sql = "select count(*) from places_fts join places p on p.id = places_fts.rowid where places_fts match ?"
+            args = [fts_query(params["q"])] + args
+            sql += "".join(" and " + w for w in where)
+        else:
+            sql = "select count(*) from places p" + (" where " + " and ".join(where) if where else "")
+        return self.conn().execute(sql, args).fetchone()[0]
+
+
+def open_writable(path: str) -> sqlite3.Connection:
+    c = sqlite3.connect(path)
+    c.execute("pragma journal_mode = wal")
+    c.execute("pragma synchronous = normal")
+    c.executescript(SCHEMA)
+    return c
+
+
+def upsert(c: sqlite3.Connection, records: List[Dict[str, Any]], conflict: str):
+    cols = [k for k in COLUMNS if k != "id" or conflict == "id"]
+    sets = ", ".join(f"{k} = excluded.{k}" for k in cols if k != conflict)
+    sql = f"insert into places ({', '.join(cols)}) values ({', '.join('?' * len(cols))}) on conflict({conflict}) do update set {sets}"
+    for rec in records:
+        c.execute(sql, [rec[k] for k in cols])
+        rid = rec["id"] if conflict == "id" else c.execute("select id from places where profile_url = ?", (rec["profile_url"],)).fetchone()[0]
+        c.execute("delete from places_fts where rowid = ?", (rid,))
+        title = (rec["correct_name"] + " " + rec["name"]).strip()
+        c.execute("insert into places_fts (rowid, title, address_line) values (?, ?, ?)", (rid, title, rec["address_line"]))
+
+
+def set_meta(c: sqlite3.Connection, key: str, value: str):
+    c.execute("insert into meta (key, value) values (?, ?) on conflict(key) do update set value = excluded.value", (key, value))
+
+
+def claim_feed(c: sqlite3.Connection, feed: str):
+    # CSV builds key rows by profile_url with local ids, sync by Supabase id; one file cannot take both.
+    row = c.execute("select value from meta where key = 'feed'").fetchone()
+    if row and row[0] != feed:
+        raise ValueError(f"replica is fed by {row[0]}, not {feed}; use a separate file")
+    set_meta(c, "feed", feed)
+
+
+def build_from_csv(csv_path: str, out_path: str) -> int:
+    # Upserts the CSV into a copy of the current replica (each pipeline run covers one city) and
+    # renames it into place, so a running app never sees a half-built file.
+    tmp = out_path + ".tmp"
+    for p in (tmp, tmp + "-wal", tmp + "-shm"):
+        if os.path.exists(p):
+            os.remove(p)
+    if os.path.exists(out_path):
+        src, dst = sqlite3.connect(out_path), sqlite3.connect(tmp)
+        src.backup(dst)
+        src.close()
+        dst.close()
+    c = open_writable(tmp)
+    try:
+        claim_feed(c, "csv")
+    except ValueError:
+        c.close()
+        os.remove(tmp)
+        raise
+    n = 0
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        batch = []
+        for row in csv.DictReader(f):
+            rec = clean_row(row)
+            if not rec["profile_url"]:
+                continue
+            batch.append(to_record(rec))
+            if len(batch) >= REPLICA_SYNC_BATCH:
+                upsert(c, batch, "profile_url")
+                n += len(batch)
+                batch = []
+        upsert(c, batch, "profile_url")
+        n += len(batch)
+    set_meta(c, "version", f"csv:{int(time.time())}")
+    c.commit()
+    c.execute("pragma journal_mode = delete")
+    c.execute("analyze")
+    total = c.execute("select count(*) from places").fetchone()[0]
+    c.close()
+    os.replace(tmp, out_path)
+    logging.info("Upserted %d rows from %s into replica %s (%d total)", n, csv_path, out_path, total)
+    return n
+
+
+def sync_from_supabase(client, table: str, out_path: str, batch: int = REPLICA_SYNC_BATCH) -> int:
+    # Pulls rows changed since the last sync, keyset-paged on (updated_at, id). The window restarts
+    # REPLICA_SYNC_OVERLAP seconds early so rows committed late by a concurrent push are not missed.
+    c = open_writable(out_path)
+    try:
+        claim_feed(c, "sync")
+    except ValueError:
+        c.close()
+        raise
+    row = c.execute("select value from meta where key = 'synced_until'").fetchone()
+    since = row[0] if row else None
+    if since:
+        since = c.execute("select strftime('%Y-%m-%dT%H:%M:%fZ', ?, ?)", (since, f"-{REPLICA_SYNC_OVERLAP} seconds")).fetchone()[0]
+    last = (since, 0) if since else None
+    n = 0
+    newest = since
+    while True:
+        q = client.table(table).select(",".join(COLUMNS))
+        if last is not None:
+            q = q.or_(f'updated_at.gt."{last[0]}",and(updated_at.eq."{last[0]}",id.gt.{last[1]})')
+        rows = q.order("updated_at.asc,id.asc").limit(batch).execute().data or []
+        if not rows:
+            break
+        upsert(c, [to_record(r) for r in rows], "id")
+        c.commit()
+        n += len(rows)
+        last = (rows[-1]["updated_at"], rows[-1]["id"])
+        newest = last[0]
+        if len(rows) < batch:
+            break
+    if newest:
+        set_meta(c, "synced_until", newest)
+    if n or not row:
+        set_meta(c, "version", f"sync:{newest}:{n}")
+    c.commit()
+    c.close()
+    logging.info("Synced %d changed rows from %s into %s", n, table, out_path)
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build or refresh the dashboard's local SQLite read replica")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Build from an enriched pipeline CSV")
+    b.add_argument("--csv", required=True)
+    b.add_argument("--out", required=True)
+    s = sub.add_parser("sync", help="Pull rows changed since the last sync from Supabase")
+    s.add_argument("--out", required=True)
+    s.add_argument("--table", default=os.environ.get("LEADS_TABLE", "production_maps"))
+    s.add_argument("--every", type=int, default=0, help="Keep syncing every N seconds")
+    ap.add_argument("--log", default=LOG_LEVEL)
+    args = ap.parse_args()
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+
+    if args.cmd == "build":
+        try:
+            build_from_csv(args.csv, args.out)
+        except ValueError as e:
+            logging.error("%s", e)
+            sys.exit(1)
+        return
+    url = os.environ.get("SUPABASE_URL", "").strip()
+    key = (os.environ.get("SUPABASE_SERVICE_ROLE") or os.environ.get("SUPABASE_ANON_KEY") or "").strip()
+    if create_client is None or not url or not key:
+        logging.error("Sync needs the supabase package, SUPABASE_URL and a key")
+        sys.exit(1)
+    client = create_client(url, key)
+    while True:
+        try:
+            sync_from_supabase(client, args.table, args.out)
+        except ValueError as e:
+            logging.error("%s", e)
+            sys.exit(1)
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import math
+from datetime import datetime
+from typing import Dict, Any
+
+
+def to_bool(v: str):
+    if v is None:
+        return None
+    s = str(v).strip().lower()
+    if s in {"true", "t", "1", "yes", "y"}:
+        return True
+    if s in {"false", "f", "0", "no", "n"}:
+        return False
+    return None
+
+
+def to_float(v: str):
+    if v is None or v == "":
+        return None
+    try:
+        f = float(str(v).replace(",", ""))
+    except Exception:
+        return None
+    return f if math.isfinite(f) else None
+
+
+def to_rating(v: str):
+    # Maps ratings are 1-5 stars; anything outside that is a mis-parsed field and would
+    # overflow rating numeric(3,2), failing the whole upsert batch.
+    f = to_float(v)
+    return f if f is not None and 0 <= f <= 5 else None
+
+
+def to_int(v: str):
+    if v is None or v == "":
+        return None
+    digits = "".join(ch for ch in str(v) if ch.isdigit())
+    # reviews_count is an integer column; longer digit runs are not counts
+    return int(digits) if digits and len(digits) <= 9 else None
+
+
+def to_timestamp(v: str):
+    # The scraper writes "%Y-%m-%d %H:%M:%S"; anything else is sent as null rather than rejected.
+    s = (v or "").strip()
+    try:
+        return datetime.strptime(s, "%Y-%m-%d %H:%M:%S").isoformat()
+    except ValueError:
+        return None
+
+
+def clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    r: Dict[str, Any] = {}
+    r["name"] = (row.get("name") or "").strip()
+    r["correct_name"] = (row.get("correct_name") or "").strip()
+    r["profile_url"] = (row.get("profile_url") or "").strip()
+    r["photo_urls"] = (row.get("photo_urls") or "").strip()
+    r["category"] = (row.get("category") or "").strip()
+    r["query_location"] = (row.get("query_location") or "").strip()
+    r["address_line"] = (row.get("address_line") or "").strip()
+    r["phone"] = (row.get("phone") or "").strip()
+    r["website"] = (row.get("website") or "").strip()
+    r["opening_hours"] = (row.get("opening_hours") or "").strip()
+    r["social_links"] = (row.get("social_links") or "").strip()
+    r["category_line"] = (row.get("category_line") or "").strip()
+    r["plus_code"] = (row.get("plus_code") or "").strip()
+    r["phone_e164"] = (row.get("phone_e164") or "").strip()
+    r["price_text"] = (row.get("price_text") or "").strip()
+    r["address_clean_source"] = (row.get("address_clean_source") or "").strip()
+    r["rating"] = to_rating(row.get("rating"))
+    r["reviews_count"] = to_int(row.get("reviews_count"))
+    r["price_min_egp"] = to_float(row.get("price_min_egp"))
+    r["price_max_egp"] = to_float(row.get("price_max_egp"))
+    r["price_is_plus"] = to_bool(row.get("price_is_plus"))
+    r["timestamp"] = to_timestamp(row.get("timestamp"))
+    return r
@@ -1,3 +1,4 @@
+-- Fresh install: run this file, then every db/migrations/*.sql in name order.
 create table if not exists public.places (
 id bigserial primary key,
 category text,
@@ -23,3 +24,20 @@ phone_e164 text,
 address_clean_source text
 );
 create unique index if not exists places_profile_url_uidx on public.places (lower(profile_url));
+-- keyset pagination for /search: matches keyset.order_spec()
+create index if not exists places_rating_id_idx on public.places (rating desc nulls last, id);
+create index if not exists places_name_id_idx on public.places (name, id);
+
+create table if not exists public.ingest_runs (
+id bigserial primary key,
+table_name text,
+rows_upserted integer,
+finished_at timestamptz not null default now()
+);
+
+-- filter lists for the dashboard, maintained by supabase_push.py after each run
+create table if not exists public.search_facets (
+name text primary key,
+items jsonb not null default '[]'::jsonb,
+updated_at timestamptz not null default now()
+);
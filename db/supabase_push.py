@@ -9,29 +9,13 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from config import LOG_FORMAT, LOG_LEVEL
+from config import LOG_FORMAT, LOG_LEVEL, INGEST_RUNS_TABLE, FACETS_TABLE
+from facets import merge_values
+from db.rows import clean_row
 
 TABLE_NAME = os.environ.get("LEADS_TABLE", "production_maps")
-
-
-def to_bool(v: str):
-    if v is None:
-        return None
-    s = str(v).strip().lower()
-    if s in {"true", "t", "1", "yes", "y"}:
-        return True
-    if s in {"false", "f", "0", "no", "n"}:
-        return False
-    return None
-
-
-def to_float(v: str):
-    if v is None or v == "":
-        return None
-    try:
-        return float(str(v).replace(",", ""))
-    except Exception:
-        return None
+# facet name -> (column, view listing its distinct values, used to seed an empty facet)
+FACET_SOURCES = {"locations": ("query_location", "distinct_query_locations")}
 
 
 def read_csv(path: str) -> List[Dict[str, Any]]:
@@ -43,23 +27,6 @@ def read_csv(path: str) -> List[Dict[str, Any]]:
     return rows
 
 
-def clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
-    r: Dict[str, Any] = {}
-    r["name"] = (row.get("name") or "").strip()
-    r["correct_name"] = (row.get("correct_name") or "").strip()
-    r["profile_url"] = (row.get("profile_url") or "").strip()
-    r["photo_urls"] = (row.get("photo_urls") or "").strip()
-    r["category"] = (row.get("category") or "").strip()
-    r["query_location"] = (row.get("query_location") or "").strip()
-    r["address_line"] = (row.get("address_line") or "").strip()
-    r["phone"] = (row.get("phone") or "").strip()
-    r["website"] = (row.get("website") or "").strip()
-    r["opening_hours"] = (row.get("opening_hours") or "").strip()
-    r["social_links"] = (row.get("social_links") or "").strip()
-    r["rating"] = to_float(row.get("rating"))
-    return r
-
-
 def upsert_batch(supabase, rows: List[Dict[str, Any]]):
     if not rows:
         return
@@ -75,6 +42,33 @@ def upsert_batch(supabase, rows: List[Dict[str, Any]]):
                 logging.warning("Row failed for profile_url=%s | %s", x.get("profile_url"), ee)
 
 
+def update_facets(supabase, seen: Dict[str, set]):
+    # Keeps the dashboard's filter lists current without it scanning the table on page load.
+    for name, (col, seed_view) in FACET_SOURCES.items():
+        new = seen.get(name) or set()
+        try:
+            res = supabase.table(FACETS_TABLE).select("items").eq("name", name).execute()
+            if res.data:
+                current = res.data[0].get("items") or []
+            else:
+                seed = supabase.table(seed_view).select(col).execute()
+                current = [r.get(col) or "" for r in seed.data or []]
+            merged = merge_values(current, new)
+            if merged != current:
+                supabase.table(FACETS_TABLE).upsert({"name": name, "items": merged}, on_conflict="name").execute()
+            logging.info("Facet %s: %d values (%d before)", name, len(merged), len(current))
+        except Exception as e:
+            logging.warning("Could not update facet %s in %s: %s", name, FACETS_TABLE, e)
+
+
+def record_ingest_run(supabase, sent: int):
+    # The dashboard polls the newest id here and drops its cached search results when it changes.
+    try:
+        supabase.table(INGEST_RUNS_TABLE).insert({"table_name": TABLE_NAME, "rows_upserted": sent}).execute()
+    except Exception as e:
+        logging.warning("Could not record ingest run in %s: %s", INGEST_RUNS_TABLE, e)
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("csv_path")
@@ -107,6 +101,7 @@ def main():
     rows = read_csv(args.csv_path)
 
     queue: List[Dict[str, Any]] = []
+    facet_values: Dict[str, set] = {name: set() for name in FACET_SOURCES}
     sent = 0
     skipped_empty_url = 0
     for row in rows:
@@ -119,6 +114,8 @@ def main():
             skipped_empty_url += 1
             continue
         queue.append(payload)
+        for name, (col, _) in FACET_SOURCES.items():
+            facet_values[name].add(payload.get(col) or "")
         if len(queue) >= args.batch:
             upsert_batch(supabase, queue)
             sent += len(queue)
@@ -128,6 +125,8 @@ def main():
         upsert_batch(supabase, queue)
         sent += len(queue)
         logging.info("Final batch upserted, total rows now %d", sent)
+    update_facets(supabase, facet_values)
+    record_ingest_run(supabase, sent)
 
     logging.info(
         "Supabase push done. Table=%s | total_upserted=%d | skipped_missing_url=%d",
@@ -0,0 +1,147 @@
+import csv, io, json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from config import EXPORT_BATCH
+from keyset import SORT_KEYS
+from db.replica import COLUMNS
+from payload import VIEWS, shape_row
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Parquet needs a schema fixed up front; columns not listed here are written as strings.
+PARQUET_TYPES = {
+    "id": "int64",
+    "rating": "float64",
+    "reviews_count": "int64",
+    "price_min_egp": "float64",
+    "price_max_egp": "float64",
+    "price_is_plus": "bool_",
+}
+PARQUET_CASTS = {"int64": int, "float64": float, "bool_": bool}
+
+
+def parquet_value(value, typ):
+    # Backends disagree on the Python type (SQLite gives price_is_plus as 0/1, text columns as ''),
+    # and from_pylist rejects anything but the declared one.
+    if typ == "string":
+        return value if value is None or isinstance(value, str) else str(value)
+    if value is None or value == "":
+        return None
+    if typ == "bool_" and isinstance(value, str):
+        return value.strip().lower() in ("true", "t", "1")
+    try:
+        return PARQUET_CASTS[typ](float(value) if typ == "int64" and isinstance(value, str) else value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_batches(params, fetch, batch=EXPORT_BATCH):
+    # Walks the whole filter set with the same keyset order as /search; only one batch is held at a time.
+    col, _ = SORT_KEYS[params["sort"]]
+    after = None
+    while True:
+        rows = fetch(params, after, batch)
+        if rows:
+            yield rows
+        if len(rows) < batch:
+            return
+        after = (rows[-1].get(col), rows[-1]["id"])
+
+
+def export_row(row, view):
+    out = shape_row(row, view)
+    # shape_row blanks nulls for the cards; exports keep them so numeric columns stay numeric
+    for k, v in row.items():
+        if v is None and k in out and k != "name":
+            out[k] = None
+    out.pop("rank", None)
+    if isinstance(out.get("photos"), list):
+        out["photos"] = ", ".join(out["photos"])
+    return out
+
+
+def export_columns(view):
+    # Fixed up front so an export with no matching rows is still a file with a header/schema.
+    # Shaping a sample row keeps this in step with export_row(); "*" means every public.places column.
+    cols = COLUMNS if VIEWS[view] == ("*",) else VIEWS[view]
+    sample = dict.fromkeys(cols, "")
+    if "photo_urls" in sample:
+        sample["photo_urls"] = "https://"
+    return list(export_row(sample, view))
+
+
+def csv_chunks(batches, view):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=export_columns(view), extrasaction="ignore")
+    writer.writeheader()
+    for rows in batches:
+        for row in rows:
+            writer.writerow(export_row(row, view))
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def ndjson_chunks(batches, view):
+    for rows in batches:
+        yield "".join(json.dumps(export_row(r, view), ensure_ascii=False, separators=(",", ":")) + "\n" for r in rows).encode("utf-8")
+
+
+class ChunkSink:
+    # File-like target for ParquetWriter that hands back what was written since the last drain.
+    def __init__(self):
+        self.parts = []
+        self.pos = 0
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        out = b"".join(self.parts)
+        self.parts = []
+        return out
+
+
+def parquet_chunks(batches, view):
+    # One row group per batch, flushed to the client as soon as it is encoded.
+    sink = ChunkSink()
+    types = {c: PARQUET_TYPES.get(c, "string") for c in export_columns(view)}
+    writer = pq.ParquetWriter(sink, pa.schema([(c, getattr(pa, t)()) for c, t in types.items()]))
+    for rows in batches:
+        rows = [export_row(r, view) for r in rows]
+        rows = [{c: parquet_value(r.get(c), t) for c, t in types.items()} for r in rows]
+        writer.write_table(pa.Table.from_pylist(rows, schema=writer.schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def export_chunks(fmt, batches, view):
+    if fmt == "csv":
+        return csv_chunks(batches, view)
+    if fmt == "ndjson":
+        return ndjson_chunks(batches, view)
+    return parquet_chunks(batches, view)
@@ -0,0 +1,65 @@
+import logging, threading, time
+
+from config import SEARCH_CACHE_VERSION_CHECK
+from payload import Payload
+
+
+def merge_values(current, new):
+    # Facet lists only grow: supabase_push upserts and never deletes rows.
+    seen = {v for v in current or [] if v}
+    seen.update(v.strip() for v in new if v and v.strip())
+    return sorted(seen)
+
+
+class FacetCache:
+    # In-process copy of the facet lists supabase_push writes after each run. Pages read
+    # from here; the database is only asked again when the data version moves.
+    def __init__(self, loader, static=None, retry_after=SEARCH_CACHE_VERSION_CHECK):
+        self.loader = loader
+        self.retry_after = retry_after
+        self.failed_at = None
+        self.static = static or {}
+        self.lock = threading.Lock()
+        self.values = dict(self.static)
+        self.version = None
+        self.loaded_at = None
+        self.payload = Payload(self.values)
+
+    def due(self, version, now=None):
+        # Loaded lists for an older version (or none yet) are reloaded, but a failed load is
+        # retried only after retry_after seconds so a down database isn't asked on every request.
+        if self.loaded_at is not None and self.version == version:
+            return False
+        now = time.time() if now is None else now
+        return self.failed_at is None or now - self.failed_at >= self.retry_after
+
+    def refresh(self, version=None):
+        try:
+            loaded = self.loader()
+        except Exception as e:
+            logging.warning("Could not load facets: %s", e)
+            self.failed_at = time.time()
+            return False
+        values = dict(loaded)
+        values.update(self.static)
+        payload = Payload(values)
+        with self.lock:
+            self.values = values
+            self.payload = payload
+            self.version = version
+            self.loaded_at = time.time()
+            self.failed_at = None
+        logging.info("Loaded facets (%s) for data version %s", ", ".join(f"{k}={len(v)}" for k, v in values.items()), version)
+        return True
+
+    def get(self, name):
+        return self.values.get(name, [])
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "version": self.version,
+                "loaded_at": self.loaded_at,
+                "etag": self.payload.etag,
+                "sizes": {k: len(v) for k, v in self.values.items()},
+            }
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import re
+from typing import NamedTuple
+
+from config import INFO_LINE_CACHE_SIZE
+from normalizers import cached
+
+CURRENCY_PATTERNS = [
+    r"(?:EGP|ج(?:\.\s*)م|LE|L\.E\.|E\s*P|جنيه)\s*\d+[\d\s,\.]*\+?",
+    r"\d+[\d\s,\.]*\s*(?:EGP|ج(?:\.\s*)م|LE|L\.E\.|E\s*P)\+?",
+    r"(?:min(?:imum)?|delivery|charge|service)\s*[:=]?\s*\d+[\d\s,\.]*",
+]
+PRICE_RE = re.compile("|".join(CURRENCY_PATTERNS), re.IGNORECASE)
+NUM_RE = re.compile(r"\d+(?:[\.,]\d+)?")
+EGP_NUM_RE = re.compile(r"(?:(?:EGP|LE|L\.E\.|E\s*P|ج(?:\.\s*)م)\s*)?(\d+[\d,\.]*)\s*(\+?)", re.IGNORECASE)
+ADDRESS_KEYWORDS_RE = re.compile(
+    r"\b(?:Street|St\.|Road|Rd\.|Square|Sq\.|Mohand(?:seen)?|Nasr|Heliopolis|Giza|Cairo|Alex|Maadi|Dokki|Zamalek|New Cairo|6th of October|Sheikh Zayed|العنوان|شارع|ميدان|طريق|القاهرة|الجيزة|المعادي|الدقي|مدينة نصر|مصر الجديدة)\b",
+    re.IGNORECASE,
+)
+ADDRESS_WORD_RE = re.compile(r"\b[A-Za-z\u0600-\u06FF]{3,}\b")
+HOURS_RE = re.compile(r"Open|Closed|Closes|Opens|يفتح|مفتوح|مغلق|٢٤ ساعة|24 hours", re.I)
+RATING_LINE_RE = re.compile(r"^\s*\d+(?:\.\d+)?\s*(?:\([0-9,]+\))?")
+CATEGORY_SPLIT_RE = re.compile(r"\s*[·•]\s*")
+DIGIT_RE = re.compile(r"\d")
+SEPARATORS = ("·", "•")
+DIGIT_SEPS_RE = re.compile(r"[\.,]")
+
+
+class InfoLine(NamedTuple):
+    kind: str
+    is_rating: bool
+    is_hours: bool
+    is_price: bool
+    is_address: bool
+    price_text: str
+    price_min_egp: str
+    price_max_egp: str
+    price_is_plus: bool
+    left: str
+    right: str
+
+
+EMPTY = InfoLine("", False, False, False, False, "", "", "", False, "", "")
+NO_PRICE = ("", "", "", False)
+
+
+def _egp_values(txt):
+    vals = []
+    plus = False
+    for m in EGP_NUM_RE.finditer(txt):
+        raw = m.group(1)
+        if raw:
+            try:
+                vals.append(int(DIGIT_SEPS_RE.sub("", raw)))
+            except Exception:
+                pass
+        if m.group(2):
+            plus = True
+    return vals, plus
+
+
+def parse_price(s):
+    if not s:
+        return NO_PRICE
+    txt = " ".join(s.split())
+    vals, plus = _egp_values(txt)
+    if vals:
+        return txt, str(min(vals)), str(max(vals)), plus
+    vals = []
+    for z in NUM_RE.findall(txt):
+        try:
+            vals.append(int(DIGIT_SEPS_RE.sub("", z)))
+        except Exception:
+            pass
+    if vals:
+        return txt, str(min(vals)), str(max(vals)), "+" in txt
+    return NO_PRICE
+
+
+def split_parts(s):
+    if not any(sep in s for sep in SEPARATORS):
+        return s.strip(), ""
+    parts = CATEGORY_SPLIT_RE.split(s)
+    if len(parts) >= 2:
+        return parts[0].strip(), parts[-1].strip()
+    return s.strip(), ""
+
+
+@cached("info_line", INFO_LINE_CACHE_SIZE)
+def classify(s):
+    if not s:
+        return EMPTY
+    # Every price, rating and "digit + word" address rule needs a digit, so one
+    # cheap scan decides which of the heavier patterns are worth running at all.
+    has_digit = DIGIT_RE.search(s) is not None
+    is_rating = has_digit and RATING_LINE_RE.match(s) is not None
+    is_hours = HOURS_RE.search(s) is not None
+    is_price = has_digit and PRICE_RE.search(s) is not None
+    is_address = False
+    if not is_price:
+        if ADDRESS_KEYWORDS_RE.search(s):
+            is_address = True
+        elif has_digit and ADDRESS_WORD_RE.search(s):
+            is_address = True
+    price = parse_price(s) if is_price else NO_PRICE
+    left, right = split_parts(s)
+    if is_rating:
+        kind = "rating"
+    elif is_hours:
+        kind = "hours"
+    elif is_price:
+        kind = "price"
+    elif is_address:
+        kind = "address"
+    else:
+        kind = "category"
+    return InfoLine(kind, is_rating, is_hours, is_price, is_address, *price, left, right)
@@ -0,0 +1,47 @@
+import base64, json
+
+# sort name -> (column, descending). id breaks ties so every row has exactly one position.
+# "relevance" is only used with ?q= and is paged inside the search_leads SQL function.
+SORT_KEYS = {"rating_desc": ("rating", True), "name_asc": ("name", False), "relevance": ("rank", True)}
+
+
+class CursorError(ValueError):
+    pass
+
+
+def order_spec(sort):
+    col, desc = SORT_KEYS[sort]
+    return f"{col}.{'desc' if desc else 'asc'}.nullslast,id.asc"
+
+
+def encode_cursor(sort, row):
+    col, _ = SORT_KEYS[sort]
+    raw = json.dumps([sort, row.get(col), row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(sort, cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cur_sort, value, last_id = json.loads(raw)
+        last_id = int(last_id)
+    except (ValueError, TypeError):
+        raise CursorError("malformed cursor")
+    if cur_sort != sort:
+        raise CursorError("cursor belongs to a different sort order")
+    return value, last_id
+
+
+def quote(value):
+    s = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{s}"'
+
+
+def after_filter(sort, value, last_id):
+    # PostgREST `or` filter selecting the rows that come after (value, last_id) in order_spec(sort).
+    col, desc = SORT_KEYS[sort]
+    if value is None:
+        return f"and({col}.is.null,id.gt.{last_id})"
+    v = quote(value)
+    beyond = f"{col}.{'lt' if desc else 'gt'}.{v}"
+    return f"{beyond},and({col}.eq.{v},id.gt.{last_id}),{col}.is.null"
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import logging, unicodedata
+from functools import lru_cache
+
+from config import NORMALIZE_CACHE_SIZES, NORMALIZE_CACHE_DEFAULT
+
+NBSP_REPL = {"\u00A0": " ", "\u202F": " "}
+# Columns whose values repeat heavily across rows go through the memoised nfc;
+# near-unique ones (urls, timestamps, names) would only churn the cache.
+CACHED_NFC_FIELDS = {
+    "category",
+    "query_location",
+    "category_line",
+    "address_line",
+    "opening_hours",
+    "rating",
+    "reviews_count",
+    "website",
+    "social_links",
+    "price_is_plus",
+    "address_clean_source",
+}
+
+_CACHES = {}
+
+
+def cached(name, maxsize=None):
+    if maxsize is None:
+        maxsize = NORMALIZE_CACHE_SIZES.get(name, NORMALIZE_CACHE_DEFAULT)
+
+    def deco(fn):
+        # typed=True keeps 1 and 1.0 (or "1" and 1) from sharing an entry.
+        c = lru_cache(maxsize=maxsize, typed=True)(fn)
+        _CACHES[name] = c
+        return c
+
+    return deco
+
+
+def cache_stats():
+    out = {}
+    for name, fn in sorted(_CACHES.items()):
+        info = fn.cache_info()
+        calls = info.hits + info.misses
+        out[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hit_ratio": round(info.hits / calls, 4) if calls else 0.0,
+        }
+    return out
+
+
+def log_cache_stats(level=logging.INFO):
+    for name, st in cache_stats().items():
+        if not st["hits"] and not st["misses"]:
+            continue
+        logging.log(
+            level,
+            "Cache %s: hits=%d misses=%d hit_ratio=%.2f size=%d/%d",
+            name,
+            st["hits"],
+            st["misses"],
+            st["hit_ratio"],
+            st["size"],
+            st["maxsize"],
+        )
+
+
+def clear_caches():
+    for fn in _CACHES.values():
+        fn.cache_clear()
+
+
+def nfc_uncached(s):
+    if s is None:
+        return ""
+    s = unicodedata.normalize("NFKC", str(s))
+    for k, v in NBSP_REPL.items():
+        s = s.replace(k, v)
+    return s.strip()
+
+
+nfc = cached("nfc")(nfc_uncached)
+
+
+def nfc_field(name, value):
+    return nfc(value) if name in CACHED_NFC_FIELDS else nfc_uncached(value)
@@ -0,0 +1,144 @@
+import gzip, hashlib, json, threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from config import PAYLOAD_COMPRESS_MIN_BYTES, PAYLOAD_GZIP_LEVEL, PAYLOAD_BROTLI_QUALITY
+
+# Columns each view of /search needs. "list" is what the dashboard cards and CSV preview render;
+# "full" keeps the old select("*") shape for API users.
+VIEWS = {
+    "list": (
+        "id",
+        "name",
+        "correct_name",
+        "category",
+        "category_line",
+        "query_location",
+        "address_line",
+        "phone",
+        "phone_e164",
+        "website",
+        "profile_url",
+        "rating",
+        "reviews_count",
+        "photo_urls",
+    ),
+    "full": ("*",),
+}
+
+
+def select_columns(view):
+    return ",".join(VIEWS[view])
+
+
+def first_photo(raw):
+    for part in (raw or "").split(","):
+        u = part.strip()
+        if u.startswith("http"):
+            return u
+    return ""
+
+
+def shape_row(row, view):
+    row = {k: ("" if v is None else v) for k, v in row.items()}
+    if row.get("correct_name"):
+        row["name"] = row["correct_name"]
+    if view == "list":
+        # The cards only show one photo; the full list can be several KB per row.
+        row.pop("correct_name", None)
+        raw = row.pop("photo_urls", "")
+        if not row.get("main_photo_url"):
+            row["main_photo_url"] = first_photo(raw)
+        return row
+    raw = (row.get("photo_urls") or "").strip()
+    photos = [u.strip() for u in raw.split(",") if u.strip().startswith("http")]
+    if not row.get("main_photo_url") and photos:
+        row["main_photo_url"] = photos[0]
+    row["photos"] = photos
+    return row
+
+
+class Payload:
+    # One encoded response body plus its compressed variants, built once and cached as a unit.
+    def __init__(self, obj):
+        self.identity = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = hashlib.sha256(self.identity).hexdigest()[:32]
+        self.bodies = {"identity": self.identity}
+        if len(self.identity) >= PAYLOAD_COMPRESS_MIN_BYTES:
+            self.bodies["gzip"] = gzip.compress(self.identity, compresslevel=PAYLOAD_GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(self.identity, quality=PAYLOAD_BROTLI_QUALITY)
+
+    @property
+    def size(self):
+        return sum(len(b) for b in self.bodies.values())
+
+    def variant(self, accept_encoding):
+        enc = pick_encoding(accept_encoding, self.bodies)
+        # Strong validators must differ per representation, so the encoding is part of the tag.
+        tag = self.etag if enc == "identity" else f"{self.etag}-{enc}"
+        return enc, self.bodies[enc], f'"{tag}"'
+
+
+def pick_encoding(header, available):
+    prefs = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        prefs[name] = q
+    best, best_q = "identity", 0.0
+    for enc in ("br", "gzip"):
+        q = prefs.get(enc, prefs.get("*", 0.0))
+        if enc in available and q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    base = etag.strip('"').split("-")[0]
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"').split("-")[0] == base:
+            return True
+    return False
+
+
+class PayloadStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {"responses": 0, "not_modified": 0, "identity_bytes": 0, "sent_bytes": 0}
+        self.encodings = {}
+
+    def record(self, identity_bytes, sent_bytes, encoding, not_modified=False):
+        with self.lock:
+            self.stats["responses"] += 1
+            self.stats["identity_bytes"] += identity_bytes
+            self.stats["sent_bytes"] += sent_bytes
+            if not_modified:
+                self.stats["not_modified"] += 1
+            self.encodings[encoding] = self.encodings.get(encoding, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            s = dict(self.stats)
+            s["encodings"] = dict(self.encodings)
+        s["saved_ratio"] = round(1 - s["sent_bytes"] / s["identity_bytes"], 4) if s["identity_bytes"] else 0.0
+        return s
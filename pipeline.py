@@ -6,6 +6,10 @@ from pathlib import Path
 from config import (
     DEFAULT_MAX_PLACES,
     PHONE_ENRICH_LIMIT,
+    PHONE_WORKERS,
+    PHONE_TABS,
+    DETAIL_TABS,
+    PROFILE_POOL_DIR,
     LOG_FORMAT,
     LOG_LEVEL,
 )
@@ -28,10 +32,18 @@ def main():
     ap.add_argument("--out-prefix", default="run")
     ap.add_argument("--no-headless", action="store_true")
     ap.add_argument("--phone-limit", type=int, default=PHONE_ENRICH_LIMIT)
+    ap.add_argument("--phone-workers", type=int, default=PHONE_WORKERS)
+    ap.add_argument("--phone-tabs", type=int, default=PHONE_TABS)
+    ap.add_argument("--detail-tabs", type=int, default=DETAIL_TABS)
+    ap.add_argument("--profile-pool", default=PROFILE_POOL_DIR)
     ap.add_argument("--skip-scrape", action="store_true")
     ap.add_argument("--skip-clean", action="store_true")
+    ap.add_argument("--incremental-clean", action="store_true")
+    ap.add_argument("--photo-index", default="")
+    ap.add_argument("--crawl-sites", action="store_true")
     ap.add_argument("--skip-enrich", action="store_true")
     ap.add_argument("--skip-push", action="store_true")
+    ap.add_argument("--replica", default="", help="Also upsert this run into the dashboard's SQLite read replica at this path")
     ap.add_argument("--log", default=LOG_LEVEL)
     args = ap.parse_args()
 
@@ -45,6 +57,7 @@ def main():
     base = Path(".")
     raw_csv = str(base / f"{args.out_prefix}_raw.csv")
     cleaned_csv = str(base / f"{args.out_prefix}_cleaned.csv")
+    crawled_csv = str(base / f"{args.out_prefix}_crawled.csv")
     enriched_csv = str(base / f"{args.out_prefix}_enriched.csv")
 
     if not args.skip_scrape:
@@ -59,6 +72,10 @@ def main():
             str(args.max_places),
             "--output",
             raw_csv,
+            "--detail-tabs",
+            str(args.detail_tabs),
+            "--profile-pool",
+            args.profile_pool,
         ]
         if not args.no_headless:
             cmd.append("--headless")
@@ -73,18 +90,44 @@ def main():
             "--out",
             cleaned_csv,
         ]
+        if args.incremental_clean:
+            cmd.append("--incremental")
+        if args.photo_index:
+            cmd += ["--photo-index", args.photo_index]
         run(cmd, allow_fail=False)
 
+    # the crawler writes its own file: cleaned_csv is what the incremental cleaner appends to and checkpoints
+    enrich_in = cleaned_csv
+    if args.crawl_sites:
+        Path(crawled_csv).unlink(missing_ok=True)
+        cmd = [
+            sys.executable,
+            "scraper/site_crawler.py",
+            "--in",
+            cleaned_csv,
+            "--out",
+            crawled_csv,
+        ]
+        run(cmd, allow_fail=True)
+        if Path(crawled_csv).exists():
+            enrich_in = crawled_csv
+
     if not args.skip_enrich:
         cmd = [
             sys.executable,
             "scraper/phone_enricher.py",
             "--in",
-            cleaned_csv,
+            enrich_in,
             "--out",
             enriched_csv,
             "--limit",
             str(args.phone_limit),
+            "--workers",
+            str(args.phone_workers),
+            "--tabs",
+            str(args.phone_tabs),
+            "--profile-pool",
+            args.profile_pool,
         ]
         run(cmd, allow_fail=False)
 
@@ -96,6 +139,18 @@ def main():
         ]
         run(cmd, allow_fail=False)
 
+    if args.replica:
+        cmd = [
+            sys.executable,
+            "db/replica.py",
+            "build",
+            "--csv",
+            enriched_csv,
+            "--out",
+            args.replica,
+        ]
+        run(cmd, allow_fail=True)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,159 @@
+import logging, os, shutil, tempfile, threading
+
+from config import PROFILE_POOL_SIZE, PROFILE_CACHE_MAX_MB, PROFILE_SCRUB_EVERY
+
+# Identity and site state; the HTTP and code caches next to them are what we want to keep.
+SCRUB_PATHS = [
+    "Default/Cookies",
+    "Default/Cookies-journal",
+    "Default/Network/Cookies",
+    "Default/Network/Cookies-journal",
+    "Default/Local Storage",
+    "Default/Session Storage",
+    "Default/IndexedDB",
+    "Default/Service Worker",
+    "Default/Web Data",
+    "Default/History",
+    "Default/Sessions",
+    "Default/Current Session",
+    "Default/Current Tabs",
+    "Default/Last Session",
+    "Default/Last Tabs",
+]
+CACHE_PATHS = ["Default/Cache", "Default/Code Cache"]
+# Left behind when Chrome is killed; a stale lock makes the next launch refuse the profile.
+LOCK_PATHS = ["SingletonLock", "SingletonSocket", "SingletonCookie", "DevToolsActivePort"]
+
+# Chrome keeps 250 resource timings per document by default and drops the rest; a Maps session
+# loads far more. Run on every new document (and again by each sample): grow the buffer when it fills.
+RESOURCE_BUFFER_JS = """
+if (!window.__rtGrow) {
+  window.__rtGrow = true;
+  performance.addEventListener('resourcetimingbufferfull', () => {
+    performance.setResourceTimingBufferSize(2 * performance.getEntriesByType('resource').length);
+  });
+}
+"""
+CACHE_SAVINGS_JS = RESOURCE_BUFFER_JS + """
+const out = {cached: 0, network: 0};
+let entries = performance.getEntriesByType('resource');
+if (!window.__navSampled) {
+  window.__navSampled = true;
+  entries = performance.getEntriesByType('navigation').concat(entries);
+}
+for (const e of entries) {
+  if (e.transferSize === 0 && e.decodedBodySize > 0) out.cached += e.encodedBodySize || e.decodedBodySize;
+  else out.network += e.transferSize || 0;
+}
+// the next sample of this document only counts what loaded after this one
+performance.clearResourceTimings();
+return out;
+"""
+CACHE_SAVINGS_FN = "function() {" + CACHE_SAVINGS_JS + "}"
+
+
+def remove_paths(root, rels):
+    for rel in rels:
+        p = os.path.join(root, rel)
+        if os.path.isdir(p) and not os.path.islink(p):
+            shutil.rmtree(p, ignore_errors=True)
+        elif os.path.lexists(p):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ProfilePool:
+    def __init__(self, root, size=PROFILE_POOL_SIZE, cache_max_mb=PROFILE_CACHE_MAX_MB, scrub_every=PROFILE_SCRUB_EVERY):
+        self.root = root
+        self.cache_max_bytes = cache_max_mb * 1024 * 1024
+        self.scrub_every = max(1, scrub_every)
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self.free = [os.path.join(root, f"profile_{i}") for i in range(size)]
+        self.uses = {p: 0 for p in self.free}
+        self.stats = {"leases": 0, "ephemeral": 0, "scrubs": 0, "cache_trims": 0, "cached_bytes": 0, "network_bytes": 0, "pages": 0}
+
+    def chrome_args(self):
+        return [f"--disk-cache-size={self.cache_max_bytes}"]
+
+    def lease(self):
+        with self.lock:
+            self.stats["leases"] += 1
+            if not self.free:
+                # More concurrent browsers than pooled profiles: give this one a throwaway dir.
+                self.stats["ephemeral"] += 1
+                return tempfile.mkdtemp(prefix="chrome-profile-")
+            path = self.free.pop(0)
+            uses = self.uses[path]
+            self.uses[path] = uses + 1
+        if uses % self.scrub_every == 0:
+            self.scrub(path)
+        remove_paths(path, LOCK_PATHS)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def release(self, path):
+        if path not in self.uses:
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        self.trim_cache(path)
+        with self.lock:
+            # Returned to the back so the next lease gets the least recently used profile.
+            self.free.append(path)
+
+    def scrub(self, path):
+        remove_paths(path, SCRUB_PATHS)
+        with self.lock:
+            self.stats["scrubs"] += 1
+
+    def trim_cache(self, path):
+        # --disk-cache-size bounds the HTTP cache, but not the code cache or an older profile's leftovers.
+        size = sum(dir_size(os.path.join(path, rel)) for rel in CACHE_PATHS)
+        if size > self.cache_max_bytes:
+            for rel in CACHE_PATHS:
+                shutil.rmtree(os.path.join(path, rel), ignore_errors=True)
+            with self.lock:
+                self.stats["cache_trims"] += 1
+            logging.info("Profile %s cache was %.0f MB; cleared", path, size / 1048576)
+
+    def sample(self, driver):
+        try:
+            res = driver.execute_script(CACHE_SAVINGS_JS)
+        except Exception:
+            return
+        self.record(res)
+
+    def record(self, res):
+        res = res or {}
+        with self.lock:
+            self.stats["cached_bytes"] += int(res.get("cached") or 0)
+            self.stats["network_bytes"] += int(res.get("network") or 0)
+            self.stats["pages"] += 1
+
+    def log(self):
+        s = self.stats
+        total = s["cached_bytes"] + s["network_bytes"]
+        logging.info(
+            "Profile pool: leases=%d ephemeral=%d scrubs=%d cache_trims=%d | %d page samples: %.1f MB from disk cache, %.1f MB over network (%.0f%% saved)",
+            s["leases"],
+            s["ephemeral"],
+            s["scrubs"],
+            s["cache_trims"],
+            s["pages"],
+            s["cached_bytes"] / 1048576,
+            s["network_bytes"] / 1048576,
+            100.0 * s["cached_bytes"] / total if total else 0.0,
+        )
@@ -0,0 +1,141 @@
+import logging, threading, time
+from collections import OrderedDict
+
+from config import SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_MAX_MB, SEARCH_CACHE_VERSION_CHECK
+from keyset import SORT_KEYS
+
+
+def _flag(v):
+    return str(v or "").strip() == "1"
+
+
+def _float(v):
+    try:
+        return float(v) if v not in (None, "") else None
+    except ValueError:
+        return None
+
+
+def search_params(args):
+    # Canonical form of the /search query string: equivalent requests map to the same dict,
+    # so it doubles as the cache key. Text filters are matched with ilike, hence lower().
+    sort = (args.get("sort") or "").strip()
+    q = " ".join((args.get("q") or "").split()).lower()
+    if q:
+        sort = "relevance"
+    elif sort not in SORT_KEYS or sort == "relevance":
+        sort = "rating_desc"
+    return {
+        "q": q,
+        "category": (args.get("category") or "").strip(),
+        "location": (args.get("location") or "").strip().lower(),
+        "min_rating": _float(args.get("min_rating")),
+        "has_phone": _flag(args.get("has_phone")),
+        "has_website": _flag(args.get("has_website")),
+        "address_contains": (args.get("address_contains") or "").strip().lower(),
+        "sort": sort,
+        "cursor": (args.get("cursor") or "").strip(),
+        "view": "full" if (args.get("view") or "").strip() == "full" else "list",
+    }
+
+
+def cache_key(params):
+    return tuple(sorted(params.items()))
+
+
+class QueryCache:
+    def __init__(self, ttl=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_MAX_ENTRIES, max_mb=SEARCH_CACHE_MAX_MB, version_check=SEARCH_CACHE_VERSION_CHECK):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.version_check = version_check
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.version = None
+        self.version_checked_at = None
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            hit = self.entries.get(key)
+            if hit is None:
+                self.stats["misses"] += 1
+                return None
+            stored_at, body, _, ttl = hit
+            if now - stored_at > ttl:
+                self._drop(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return body
+
+    def put(self, key, body, now=None, size=None, ttl=None):
+        # ttl overrides the cache-wide one for this entry (e.g. shorter for provisional results).
+        now = time.time() if now is None else now
+        ttl = self.ttl if ttl is None else ttl
+        size = len(body) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (now, body, size, ttl)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+                self.stats["evictions"] += 1
+
+    def _drop(self, key):
+        _, _, size, _ = self.entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def check_version(self, fetch, now=None):
+        # fetch() returns the id of the latest finished ingest run; a new one means the
+        # table changed under us. Polled at most every version_check seconds per process.
+        # Returns True when a version different from the one held (or the first one) was read.
+        now = time.time() if now is None else now
+        with self.lock:
+            if self.version_checked_at is not None and now - self.version_checked_at < self.version_check:
+                return False
+            self.version_checked_at = now
+        try:
+            version = fetch()
+        except Exception as e:
+            logging.warning("Could not read data version: %s", e)
+            return False
+        with self.lock:
+            first = self.version is None
+            changed = version != self.version
+            self.version = version
+        if changed and not first:
+            self.clear()
+            with self.lock:
+                self.stats["invalidations"] += 1
+            logging.info("Data version changed to %s; search cache cleared", version)
+        return changed
+
+    def snapshot(self):
+        with self.lock:
+            s = dict(self.stats)
+            lookups = s["hits"] + s["misses"]
+            s.update(
+                {
+                    "entries": len(self.entries),
+                    "bytes": self.bytes,
+                    "max_entries": self.max_entries,
+                    "max_bytes": self.max_bytes,
+                    "ttl": self.ttl,
+                    "hit_ratio": round(s["hits"] / lookups, 4) if lookups else 0.0,
+                    "data_version": self.version,
+                }
+            )
+        return s
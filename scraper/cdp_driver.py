@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+import asyncio, base64, itertools, json, logging, os, random, shutil, struct, subprocess, sys, tempfile, time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import USER_AGENTS, PAGELOAD_TIMEOUT, CDP_LAUNCH_TIMEOUT
+from scraper.tab_pool import BACKGROUND_TAB_FLAGS
+from browser_utils import find_chrome_binary, lease_profile, release_profile
+from profile_pool import RESOURCE_BUFFER_JS
+
+OP_TEXT, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x8, 0x9, 0xA
+
+ELEMENTS_JS = """function(xp) {
+  const r = document.evaluate(xp, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const out = [];
+  for (let i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+  return out;
+}"""
+VALUES_JS = """function(xp, attrs) {
+  const r = document.evaluate(xp, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const out = [];
+  for (let i = 0; i < r.snapshotLength; i++) {
+    const el = r.snapshotItem(i);
+    out.push(attrs.map(a => a === "text" ? (el.innerText || el.textContent || "") : el.getAttribute(a)));
+  }
+  return out;
+}"""
+
+
+class CDPError(Exception):
+    pass
+
+
+class NoSuchElement(CDPError):
+    pass
+
+
+def encode_frame(payload: bytes, opcode: int = OP_TEXT, mask: bool = True) -> bytes:
+    head = bytes([0x80 | opcode])
+    n = len(payload)
+    bit = 0x80 if mask else 0
+    if n < 126:
+        head += bytes([bit | n])
+    elif n < 65536:
+        head += bytes([bit | 126]) + struct.pack(">H", n)
+    else:
+        head += bytes([bit | 127]) + struct.pack(">Q", n)
+    if not mask:
+        return head + payload
+    key = os.urandom(4)
+    return head + key + bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, bool, bytes]:
+    b0, b1 = await reader.readexactly(2)
+    n = b1 & 0x7F
+    if n == 126:
+        n = struct.unpack(">H", await reader.readexactly(2))[0]
+    elif n == 127:
+        n = struct.unpack(">Q", await reader.readexactly(8))[0]
+    key = await reader.readexactly(4) if b1 & 0x80 else None
+    data = await reader.readexactly(n)
+    if key:
+        data = bytes(b ^ key[i % 4] for i, b in enumerate(data))
+    return b0 & 0x0F, bool(b0 & 0x80), data
+
+
+class WebSocket:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url: str) -> "WebSocket":
+        rest = url.split("://", 1)[1]
+        hostport, _, path = rest.partition("/")
+        host, _, port = hostport.partition(":")
+        reader, writer = await asyncio.open_connection(host, int(port or 80), limit=2 ** 26)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write(
+            (
+                f"GET /{path} HTTP/1.1\r\nHost: {hostport}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+            ).encode()
+        )
+        await writer.drain()
+        status = await reader.readline()
+        if b" 101 " not in status:
+            raise CDPError(f"websocket handshake failed: {status!r}")
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        return cls(reader, writer)
+
+    async def send(self, text: str) -> None:
+        self.writer.write(encode_frame(text.encode("utf-8")))
+        await self.writer.drain()
+
+    async def recv(self) -> Optional[str]:
+        parts: List[bytes] = []
+        while True:
+            op, fin, data = await read_frame(self.reader)
+            if op == OP_PING:
+                self.writer.write(encode_frame(data, OP_PONG))
+                continue
+            if op == OP_CLOSE:
+                return None
+            if op == OP_PONG:
+                continue
+            parts.append(data)
+            if fin:
+                return b"".join(parts).decode("utf-8")
+
+    def close(self) -> None:
+        try:
+            self.writer.write(encode_frame(b"", OP_CLOSE))
+        except Exception:
+            pass
+        self.writer.close()
+
+
+class CDPConnection:
+    # One websocket to the browser; pages talk through flattened sessions on it.
+    def __init__(self, ws: WebSocket):
+        self.ws = ws
+        self.ids = itertools.count(1)
+        self.pending: Dict[int, "asyncio.Future"] = {}
+        self.listeners: Dict[Tuple[Optional[str], str], List["asyncio.Future"]] = {}
+        self.commands = 0
+        self.reader_task = asyncio.ensure_future(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                text = await self.ws.recv()
+                if text is None:
+                    break
+                msg = json.loads(text)
+                if "id" in msg:
+                    fut = self.pending.pop(msg["id"], None)
+                    if fut is None or fut.done():
+                        continue
+                    if "error" in msg:
+                        fut.set_exception(CDPError(msg["error"].get("message", str(msg["error"]))))
+                    else:
+                        fut.set_result(msg.get("result", {}))
+                else:
+                    for fut in self.listeners.pop((msg.get("sessionId"), msg.get("method")), []):
+                        if not fut.done():
+                            fut.set_result(msg.get("params", {}))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            logging.debug("CDP connection closed: %s", e)
+        finally:
+            for fut in self.pending.values():
+                if not fut.done():
+                    fut.set_exception(CDPError("browser connection closed"))
+            self.pending.clear()
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None, session: Optional[str] = None, timeout: float = PAGELOAD_TIMEOUT) -> Dict[str, Any]:
+        msg_id = next(self.ids)
+        msg: Dict[str, Any] = {"id": msg_id, "method": method, "params": params or {}}
+        if session:
+            msg["sessionId"] = session
+        fut = asyncio.get_running_loop().create_future()
+        self.pending[msg_id] = fut
+        self.commands += 1
+        await self.ws.send(json.dumps(msg))
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self.pending.pop(msg_id, None)
+
+    def expect(self, method: str, session: Optional[str] = None) -> "asyncio.Future":
+        fut = asyncio.get_running_loop().create_future()
+        self.listeners.setdefault((session, method), []).append(fut)
+        return fut
+
+    async def close(self) -> None:
+        self.ws.close()
+        self.reader_task.cancel()
+        try:
+            await self.reader_task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+class CDPElement:
+    def __init__(self, page: "CDPPage", object_id: str):
+        self.page = page
+        self.object_id = object_id
+
+    async def _call(self, fn: str, *args) -> Any:
+        res = await self.page.send(
+            "Runtime.callFunctionOn",
+            {
+                "objectId": self.object_id,
+                "functionDeclaration": fn,
+                "arguments": [{"value": a} for a in args],
+                "returnByValue": True,
+            },
+        )
+        if "exceptionDetails" in res:
+            raise CDPError(res["exceptionDetails"].get("text", "script error"))
+        return res.get("result", {}).get("value")
+
+    async def get_attribute(self, name: str) -> Optional[str]:
+        return await self._call("function(n) { return this.getAttribute(n); }", name)
+
+    async def text(self) -> str:
+        return await self._call("function() { return this.innerText || this.textContent || ''; }") or ""
+
+    async def click(self) -> None:
+        await self._call("function() { this.scrollIntoView({block: 'center'}); this.click(); }")
+
+
+class CDPPage:
+    def __init__(self, conn: CDPConnection, target_id: str, session: str):
+        self.conn = conn
+        self.target_id = target_id
+        self.session = session
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: float = PAGELOAD_TIMEOUT) -> Dict[str, Any]:
+        return await self.conn.send(method, params, self.session, timeout)
+
+    async def get(self, url: str, timeout: float = PAGELOAD_TIMEOUT, wait_load: bool = True) -> None:
+        # Page.navigate answers once the new document commits; the load event can come much later.
+        loaded = self.conn.expect("Page.loadEventFired", self.session)
+        res = await self.send("Page.navigate", {"url": url}, timeout)
+        if res.get("errorText") or not wait_load:
+            loaded.cancel()
+        if res.get("errorText"):
+            raise CDPError(f"navigation to {url} failed: {res['errorText']}")
+        if not wait_load:
+            return
+        try:
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            raise CDPError(f"page load timed out for {url}")
+
+    async def execute_script(self, fn: str, *args) -> Any:
+        # fn is a JS function declaration; args must be JSON-serialisable.
+        expr = f"({fn}).apply(null, {json.dumps(list(args))})"
+        res = await self.send("Runtime.evaluate", {"expression": expr, "returnByValue": True, "awaitPromise": True})
+        if "exceptionDetails" in res:
+            raise CDPError(res["exceptionDetails"].get("text", "script error"))
+        return res.get("result", {}).get("value")
+
+    async def find_elements(self, xpath: str) -> List[CDPElement]:
+        res = await self.send(
+            "Runtime.evaluate",
+            {"expression": f"({ELEMENTS_JS})({json.dumps(xpath)})", "returnByValue": False},
+        )
+        array_id = res.get("result", {}).get("objectId")
+        if not array_id:
+            return []
+        props = await self.send("Runtime.getProperties", {"objectId": array_id, "ownProperties": True})
+        found = sorted(
+            (int(p["name"]), p["value"]["objectId"])
+            for p in props.get("result", [])
+            if p.get("name", "").isdigit() and p.get("value", {}).get("objectId")
+        )
+        return [CDPElement(self, oid) for _, oid in found]
+
+    async def find_element(self, xpath: str) -> CDPElement:
+        els = await self.find_elements(xpath)
+        if not els:
+            raise NoSuchElement(xpath)
+        return els[0]
+
+    async def query_values(self, xpath: str, attrs: List[str]) -> List[List[Optional[str]]]:
+        # One round trip for what would be find_elements plus a get_attribute per element.
+        return await self.execute_script(VALUES_JS, xpath, attrs) or []
+
+    async def wait_for(self, fn: str, *args, timeout: float = 10, poll: float = 0.1) -> Any:
+        deadline = time.monotonic() + timeout
+        while True:
+            res = await self.execute_script(fn, *args)
+            if res:
+                return res
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(poll)
+
+    async def current_url(self) -> str:
+        return await self.execute_script("function() { return location.href; }")
+
+    async def close(self) -> None:
+        try:
+            await self.conn.send("Target.closeTarget", {"targetId": self.target_id})
+        except Exception:
+            pass
+
+
+class CDPBrowser:
+    def __init__(self, proc: Optional[subprocess.Popen], conn: CDPConnection, profile_dir: Optional[str], leased: bool = False):
+        self.proc = proc
+        self.conn = conn
+        self.profile_dir = profile_dir
+        self.leased = leased
+
+    @classmethod
+    async def launch(cls, headless: bool = True, binary: Optional[str] = None, extra_args: Optional[List[str]] = None) -> "CDPBrowser":
+        binary = binary or find_chrome_binary()
+        if not binary:
+            raise CDPError("Chrome binary not found; set CHROME_BINARY")
+        leased = lease_profile()
+        profile_dir = leased or tempfile.mkdtemp(prefix="cdp-profile-")
+        ua = random.choice(USER_AGENTS)
+        args = [
+            binary,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-gpu",
+            "--disable-blink-features=AutomationControlled",
+            "--window-size=1280,900",
+            "--user-agent=" + ua,
+        ] + BACKGROUND_TAB_FLAGS + (extra_args or [])
+        if headless:
+            args.append("--headless=new")
+        args.append("about:blank")
+        logging.info("Launching CDP browser: UA=%s | headless=%s", ua, headless)
+        proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # Chrome writes the port it picked (and the browser endpoint path) to this file.
+        port_file = os.path.join(profile_dir, "DevToolsActivePort")
+        deadline = time.monotonic() + CDP_LAUNCH_TIMEOUT
+        while True:
+            if os.path.exists(port_file):
+                lines = open(port_file, encoding="utf-8").read().split()
+                if len(lines) >= 2:
+                    break
+            if proc.poll() is not None or time.monotonic() >= deadline:
+                proc.kill()
+                cls.discard_profile(profile_dir, leased)
+                raise CDPError("Chrome did not expose a DevTools port")
+            await asyncio.sleep(0.05)
+        ws = await WebSocket.connect(f"ws://127.0.0.1:{lines[0]}{lines[1]}")
+        return cls(proc, CDPConnection(ws), profile_dir, bool(leased))
+
+    @staticmethod
+    def discard_profile(profile_dir: Optional[str], leased) -> None:
+        if leased:
+            release_profile(profile_dir)
+        elif profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    @property
+    def alive(self) -> bool:
+        # The read loop ends when the websocket drops, i.e. when Chrome crashed or was killed.
+        return not self.conn.reader_task.done()
+
+    @classmethod
+    async def connect(cls, ws_url: str) -> "CDPBrowser":
+        return cls(None, CDPConnection(await WebSocket.connect(ws_url)), None)
+
+    async def new_page(self) -> CDPPage:
+        target = await self.conn.send("Target.createTarget", {"url": "about:blank"})
+        attached = await self.conn.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        page = CDPPage(self.conn, target["targetId"], attached["sessionId"])
+        await page.send("Page.enable")
+        await page.send("Page.addScriptToEvaluateOnNewDocument", {"source": RESOURCE_BUFFER_JS})
+        return page
+
+    async def close(self) -> None:
+        try:
+            await asyncio.wait_for(self.conn.send("Browser.close"), 5)
+        except Exception:
+            pass
+        await self.conn.close()
+        if self.proc is not None:
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.discard_profile(self.profile_dir, self.leased)
+
+
+async def _aiter(items):
+    for it in items:
+        yield it
+
+
+async def map_pages(
+    browser: CDPBrowser,
+    items,
+    visit: Callable[[CDPPage, Any], Any],
+    pages: int,
+):
+    # Runs `visit` with `pages` tabs at once and yields (item, result, error) as each finishes.
+    # `items` may be a plain or an async iterable; it is consumed lazily.
+    source = items if hasattr(items, "__anext__") else _aiter(items)
+    lock = asyncio.Lock()
+    done: "asyncio.Queue" = asyncio.Queue()
+
+    async def take():
+        async with lock:
+            try:
+                return await source.__anext__()
+            except StopAsyncIteration:
+                return None
+
+    async def worker():
+        page = None
+        try:
+            try:
+                page = await browser.new_page()
+            except Exception as e:
+                logging.warning("CDP: could not open a page: %s", e)
+            while True:
+                it = await take()
+                if it is None:
+                    return
+                if page is None:
+                    await done.put((it, None, CDPError("no page available")))
+                    continue
+                try:
+                    await done.put((it, await visit(page, it), None))
+                except Exception as e:
+                    await done.put((it, None, e))
+        finally:
+            if page is not None:
+                await page.close()
+            await done.put(None)
+
+    tasks = [asyncio.ensure_future(worker()) for _ in range(max(1, pages))]
+    running = len(tasks)
+    while running:
+        res = await done.get()
+        if res is None:
+            running -= 1
+            continue
+        yield res
+    await asyncio.gather(*tasks, return_exceptions=True)
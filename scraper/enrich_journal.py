@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import json, logging, os, time
+from typing import Dict, Any
+
+DONE_STATUSES = {"found", "no_phone"}
+
+
+def journal_path_for(output_csv: str) -> str:
+    return output_csv + ".journal"
+
+
+def read_journal(path: str) -> Dict[str, Dict[str, Any]]:
+    done: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return done
+    bad = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                # A crash mid-write leaves at most one torn line at the end.
+                bad += 1
+                continue
+            url = rec.get("profile_url")
+            if url:
+                done[url] = rec
+    if bad:
+        logging.warning("Journal %s: skipped %d unreadable line(s)", path, bad)
+    return done
+
+
+class Journal:
+    def __init__(self, path: str):
+        self.path = path
+        self.f = open(path, "a", encoding="utf-8")
+
+    def record(self, profile_url: str, phone: str, phone_e164: str, status: str) -> None:
+        rec = {
+            "profile_url": profile_url,
+            "phone": phone,
+            "phone_e164": phone_e164,
+            "status": status,
+            "ts": time.time(),
+        }
+        self.f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def close(self) -> None:
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def has_phone(row: Dict[str, Any]) -> bool:
+    return bool((row.get("phone") or "").strip() or (row.get("phone_e164") or "").strip())
+
+
+def _num(v, cast):
+    try:
+        return cast(str(v).replace(",", "").strip())
+    except Exception:
+        return cast(0)
+
+
+def value_score(row: Dict[str, Any]) -> Tuple[float, int]:
+    return _num(row.get("rating"), float), _num(row.get("reviews_count"), int)
+
+
+def plan_rows(
+    rows: List[Dict[str, Any]],
+    known_no_phone: Optional[Callable[[str], bool]] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[int], Dict[str, int]]:
+    stats = {"total": len(rows), "no_url": 0, "has_phone": 0, "known_no_phone": 0, "planned": 0}
+    picked = []
+    for idx, row in enumerate(rows):
+        url = (row.get("profile_url") or "").strip()
+        if not url:
+            stats["no_url"] += 1
+            continue
+        if has_phone(row):
+            stats["has_phone"] += 1
+            continue
+        if known_no_phone is not None and known_no_phone(url):
+            stats["known_no_phone"] += 1
+            continue
+        picked.append(idx)
+    picked.sort(key=lambda i: value_score(rows[i]), reverse=True)
+    if limit is not None:
+        picked = picked[:limit]
+    stats["planned"] = len(picked)
+    return picked, stats
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import gzip, html, http.client, logging, random, re, sys, threading, zlib
+from typing import Dict, Tuple
+from urllib.parse import urljoin, urlsplit
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import USER_AGENTS, ACCEPT_LANG, PHONE_HTTP_TIMEOUT, PHONE_HTTP_MAX_BYTES
+
+# Ordered from most to least specific; the first hit wins.
+PHONE_PATTERNS = [
+    re.compile(r"""data-item-id=["']phone:tel:([^"']+)["']""", re.I),
+    re.compile(r"""href=["']tel:([^"']+)["']""", re.I),
+    re.compile(r'''"telephone"\s*:\s*"([^"]+)"''', re.I),
+    re.compile(r"""aria-label=["'](?:Phone|الهاتف)\s*:\s*([^"']+)["']""", re.I),
+    re.compile(r"tel:(\+?[\d\s\-().]{7,})"),
+]
+MAX_REDIRECTS = 5
+# Skips Google's EU consent interstitial, which otherwise replaces the place page.
+CONSENT_COOKIE = "CONSENT=YES+cb; SOCS=CAI"
+
+
+def extract_phone_from_html(doc: str) -> str:
+    if not doc:
+        return ""
+    for rx in PHONE_PATTERNS:
+        m = rx.search(doc)
+        if m:
+            return html.unescape(m.group(1)).strip()
+    return ""
+
+
+class PathStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def hit(self, path: str, status: str) -> None:
+        key = f"{path}_{status}"
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def get(self, path: str, status: str) -> int:
+        return self.counts.get(f"{path}_{status}", 0)
+
+    def success_rate(self, path: str) -> float:
+        found = self.get(path, "found")
+        total = found + self.get(path, "no_phone") + self.get(path, "error")
+        return found / total if total else 0.0
+
+    def log(self) -> None:
+        for path in ("http", "browser"):
+            found = self.get(path, "found")
+            miss = self.get(path, "no_phone")
+            err = self.get(path, "error")
+            if not (found or miss or err):
+                continue
+            logging.info(
+                "Phone path %s: found=%d no_phone=%d error=%d success=%.1f%%",
+                path,
+                found,
+                miss,
+                err,
+                100.0 * self.success_rate(path),
+            )
+
+
+class HttpPhoneFetcher:
+    def __init__(self, timeout: float = PHONE_HTTP_TIMEOUT, max_bytes: int = PHONE_HTTP_MAX_BYTES):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.local = threading.local()
+        self.ua = random.choice(USER_AGENTS)
+        self.lang = random.choice(ACCEPT_LANG)
+        self.connections_opened = 0
+
+    def _pool(self) -> Dict[Tuple[str, str], http.client.HTTPConnection]:
+        pool = getattr(self.local, "pool", None)
+        if pool is None:
+            pool = self.local.pool = {}
+        return pool
+
+    def _conn(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        pool = self._pool()
+        conn = pool.get((scheme, netloc))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = cls(netloc, timeout=self.timeout)
+            pool[(scheme, netloc)] = conn
+            self.connections_opened += 1
+        return conn
+
+    def _drop(self, scheme: str, netloc: str) -> None:
+        conn = self._pool().pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def _request(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "https"
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = {
+            "User-Agent": self.ua,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": self.lang,
+            "Accept-Encoding": "gzip, deflate",
+            "Cookie": CONSENT_COOKIE,
+            "Connection": "keep-alive",
+        }
+        # A pooled connection may have been closed by the server since its last use;
+        # retry once on a fresh one before treating it as a failure.
+        for attempt in range(2):
+            conn = self._conn(scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read(self.max_bytes + 1)
+                hdrs = {k.lower(): v for k, v in resp.getheaders()}
+                if len(body) > self.max_bytes or resp.will_close:
+                    self._drop(scheme, parts.netloc)
+                break
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest, BrokenPipeError, ConnectionResetError):
+                self._drop(scheme, parts.netloc)
+                if attempt:
+                    raise
+            except Exception:
+                self._drop(scheme, parts.netloc)
+                raise
+        enc = hdrs.get("content-encoding", "")
+        if enc == "gzip":
+            body = gzip.decompress(body)
+        elif enc == "deflate":
+            body = zlib.decompress(body)
+        return resp.status, hdrs, body
+
+    def fetch(self, url: str) -> Tuple[int, str]:
+        for _ in range(MAX_REDIRECTS + 1):
+            status, hdrs, body = self._request(url)
+            if status in (301, 302, 303, 307, 308) and hdrs.get("location"):
+                url = urljoin(url, hdrs["location"])
+                continue
+            charset = "utf-8"
+            m = re.search(r"charset=([\w-]+)", hdrs.get("content-type", ""))
+            if m:
+                charset = m.group(1)
+            return status, body.decode(charset, errors="replace")
+        return 0, ""
+
+    def get_phone(self, url: str) -> Tuple[str, str]:
+        try:
+            status, doc = self.fetch(url)
+        except Exception as e:
+            logging.debug("HTTP fetch failed for %s: %s", url, e)
+            return "", "error"
+        if status != 200:
+            logging.debug("HTTP fetch for %s returned %s", url, status)
+            return "", "error"
+        phone = extract_phone_from_html(doc)
+        return phone, ("found" if phone else "no_phone")
+
+    def close(self) -> None:
+        for conn in self._pool().values():
+            conn.close()
+        self._pool().clear()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import logging, sqlite3, sys, threading, time
+from typing import Any, Dict, Optional
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import PHONE_CACHE_POSITIVE_TTL_DAYS, PHONE_CACHE_NEGATIVE_TTL_DAYS
+from cleaner.csv_cleaner import find_place_id, normalize_gmaps
+
+CACHEABLE = {"found", "no_phone"}
+
+
+def place_key(url: str) -> str:
+    url = (url or "").strip()
+    if not url:
+        return ""
+    pid = find_place_id(url)
+    if pid:
+        return pid
+    return normalize_gmaps(url).lower()
+
+
+class PhoneCache:
+    def __init__(
+        self,
+        path: str,
+        positive_ttl_days: float = PHONE_CACHE_POSITIVE_TTL_DAYS,
+        negative_ttl_days: float = PHONE_CACHE_NEGATIVE_TTL_DAYS,
+    ):
+        self.path = path
+        self.ttl = {"found": positive_ttl_days * 86400, "no_phone": negative_ttl_days * 86400}
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS phone_results ("
+            "place_key TEXT PRIMARY KEY, phone TEXT, phone_e164 TEXT, status TEXT, checked_at REAL)"
+        )
+        self.db.commit()
+        self.hits = {"found": 0, "no_phone": 0}
+        self.misses = 0
+
+    def get(self, url: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        key = place_key(url)
+        if not key:
+            return None
+        with self.lock:
+            row = self.db.execute(
+                "SELECT phone, phone_e164, status, checked_at FROM phone_results WHERE place_key = ?",
+                (key,),
+            ).fetchone()
+        now = time.time() if now is None else now
+        if row is None or row[2] not in self.ttl or now - row[3] > self.ttl[row[2]]:
+            self.misses += 1
+            return None
+        self.hits[row[2]] += 1
+        return {"phone": row[0], "phone_e164": row[1], "status": row[2], "checked_at": row[3]}
+
+    def put(self, url: str, phone: str, phone_e164: str, status: str, now: Optional[float] = None) -> None:
+        key = place_key(url)
+        if not key or status not in CACHEABLE:
+            return
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO phone_results (place_key, phone, phone_e164, status, checked_at) VALUES (?, ?, ?, ?, ?)",
+                (key, phone, phone_e164, status, time.time() if now is None else now),
+            )
+            self.db.commit()
+
+    def prune(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        removed = 0
+        with self.lock:
+            for status, ttl in self.ttl.items():
+                cur = self.db.execute(
+                    "DELETE FROM phone_results WHERE status = ? AND checked_at < ?",
+                    (status, now - ttl),
+                )
+                removed += cur.rowcount
+            self.db.commit()
+        return removed
+
+    def close(self) -> None:
+        removed = self.prune()
+        logging.info(
+            "Phone cache %s: hits_found=%d hits_no_phone=%d misses=%d pruned=%d",
+            self.path,
+            self.hits["found"],
+            self.hits["no_phone"],
+            self.misses,
+            removed,
+        )
+        self.db.close()
@@ -1,19 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import csv, sys, os, time, random, unicodedata, re, argparse, platform, logging
-from typing import Dict, Any, List, Optional
+import asyncio, csv, sys, os, time, random, re, argparse, logging, queue, threading, itertools
+from typing import Dict, Any, List, Optional, Tuple
 
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
-try:
-    import winreg
-except Exception:
-    winreg = None
-
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -21,31 +14,41 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from config import (
-    USER_AGENTS,
-    CHROME_VERSION_FALLBACK,
-    PAGELOAD_TIMEOUT,
-    SCRIPT_TIMEOUT,
     ENRICH_JITTER_MIN,
     ENRICH_JITTER_MAX,
     PHONE_RESTART_EVERY,
     PHONE_ENRICH_LIMIT,
+    PHONE_WORKERS,
+    PHONE_TABS,
+    PHONE_DRIVER,
+    PHONE_CACHE_FILE,
+    PHONE_RENDER_SETTLE,
+    PHONE_SETTLE_TRIES,
+    PHONE_HTTP_FAST_PATH,
+    PROFILE_POOL_DIR,
     LOG_FORMAT,
     LOG_LEVEL,
 )
+from normalizers import nfc, log_cache_stats
+from scraper.enrich_planner import plan_rows, has_phone
+from scraper.enrich_journal import Journal, DONE_STATUSES, journal_path_for, read_journal
+from scraper.http_phone import HttpPhoneFetcher, PathStats
+from scraper.phone_cache import PhoneCache
+from scraper.tab_pool import TabPool, BACKGROUND_TAB_FLAGS
+from scraper.cdp_driver import CDPBrowser, map_pages
+from browser_utils import new_chrome, quit_chrome, sample_page, sample_page_cdp, set_profile_pool, log_launch_stats
+from profile_pool import ProfilePool
 
 DETAIL_PHONE_XP = "//button[.//div[contains(text(),'Phone') or contains(text(),'الهاتف') or contains(text(),'اتصال')]] | //a[contains(@href,'tel:')]"
+DETAIL_NAME_XP = "//h1[contains(@class,'fontHeadline') or contains(@class,'DUwDvf') or @role='heading']"
+# Address/website/plus-code rows; they render in the same pass as the phone row.
+DETAIL_INFO_ROW_XP = "//button[@data-item-id] | //a[@data-item-id]"
 
 PHONE_RE = re.compile(r"(?:\+?20)?0?\d{8,11}")
-NBSP_REPL = {"\u00A0": " ", "\u202F": " "}
 
 
-def nfc(s: str) -> str:
-    if s is None:
-        return ""
-    s = unicodedata.normalize("NFKC", str(s))
-    for k, v in NBSP_REPL.items():
-        s = s.replace(k, v)
-    return s.strip()
+class WorkerError(RuntimeError):
+    pass
 
 
 def strong_phone_extract(s: str) -> str:
@@ -77,46 +80,21 @@ def jitter(a=ENRICH_JITTER_MIN, b=ENRICH_JITTER_MAX):
     time.sleep(random.uniform(a, b))
 
 
-def get_installed_chrome_major() -> Optional[int]:
-    try:
-        if platform.system().lower() != "windows" or winreg is None:
-            return None
-        for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
-            try:
-                k = winreg.OpenKey(root, r"Software\\Google\\Chrome\\BLBeacon")
-                v, _ = winreg.QueryValueEx(k, "version")
-                return int(str(v).split(".")[0])
-            except OSError:
-                pass
-    except Exception:
-        return None
-    return None
+def new_driver(headless: bool):
+    return new_chrome(headless, window_size="1280,900", extra_args=BACKGROUND_TAB_FLAGS, label="phone-enricher browser")
 
 
-def new_driver(headless: bool):
-    ua = random.choice(USER_AGENTS)
-    logging.info("Launching phone-enricher browser: UA=%s | headless=%s", ua, headless)
-    opts = uc.ChromeOptions()
-    if headless:
-        opts.add_argument("--headless=new")
-    opts.add_argument("--disable-blink-features=AutomationControlled")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--user-agent=" + ua)
-    opts.add_argument("--window-size=1280,900")
-    opts.add_argument("--blink-settings=imagesEnabled=true")
-    major = get_installed_chrome_major() or CHROME_VERSION_FALLBACK
-    d = uc.Chrome(options=opts, version_main=major)
-    try:
-        d.set_page_load_timeout(PAGELOAD_TIMEOUT)
-        d.set_script_timeout(SCRIPT_TIMEOUT)
-    except Exception:
-        pass
-    return d
+def phone_or_rendered(driver):
+    els = driver.find_elements(By.XPATH, DETAIL_PHONE_XP)
+    if els:
+        return els[0]
+    if driver.find_elements(By.XPATH, DETAIL_NAME_XP) and driver.find_elements(By.XPATH, DETAIL_INFO_ROW_XP):
+        return "rendered"
+    return False
 
 
-def get_phone_from_page(driver, url: str, timeout: int = 8) -> str:
+def get_phone_from_page(driver, url: str, timeout: int = 8) -> Optional[str]:
+    # "" means the panel rendered without a phone; None means we could not tell.
     if not url:
         return ""
     try:
@@ -124,16 +102,74 @@ def get_phone_from_page(driver, url: str, timeout: int = 8) -> str:
         driver.get(url)
     except WebDriverException as e:
         logging.warning("Navigation failed for %s: %s", url, e)
-        return ""
+        return None
+    return read_phone(driver, url, timeout)
+
+
+def read_phone(driver, url: str, timeout: int = 8) -> Optional[str]:
     try:
-        el = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.XPATH, DETAIL_PHONE_XP))
-        )
+        el = WebDriverWait(driver, timeout).until(phone_or_rendered)
     except TimeoutException:
-        logging.debug("No phone element found for %s within timeout", url)
-        return ""
-    raw = el.get_attribute("href") or el.text or ""
-    raw = raw.strip()
+        logging.debug("Detail panel for %s did not render within timeout", url)
+        return None
+    if el == "rendered":
+        # A miss is cached for weeks, so only report one once the panel has stopped changing:
+        # the name is there and no info row appeared during the last settle interval.
+        rows = len(driver.find_elements(By.XPATH, DETAIL_INFO_ROW_XP))
+        for _ in range(PHONE_SETTLE_TRIES):
+            time.sleep(PHONE_RENDER_SETTLE)
+            els = driver.find_elements(By.XPATH, DETAIL_PHONE_XP)
+            if els:
+                el = els[0]
+                break
+            n = len(driver.find_elements(By.XPATH, DETAIL_INFO_ROW_XP))
+            if n == rows and driver.find_elements(By.XPATH, DETAIL_NAME_XP):
+                logging.debug("Detail panel for %s rendered without a phone", url)
+                return ""
+            rows = n
+        else:
+            logging.debug("Detail panel for %s was still rendering, not treating it as a miss", url)
+            return None
+    return clean_phone_text(el.get_attribute("href") or el.text or "")
+
+
+PHONE_STATE_JS = """function(phoneXp, nameXp, rowXp) {
+  const one = xp => document.evaluate(xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  const el = one(phoneXp);
+  if (el) return {phone: el.getAttribute("href") || el.innerText || ""};
+  if (one(nameXp) && one(rowXp)) {
+    return {rendered: true, rows: document.evaluate(rowXp, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength};
+  }
+  return null;
+}"""
+
+
+async def read_phone_cdp(page, url: str, timeout: int = 8) -> Optional[str]:
+    # Same contract as get_phone_from_page, in one evaluate per poll instead of several HTTP hops.
+    await page.get(url, wait_load=False)
+    xps = (DETAIL_PHONE_XP, DETAIL_NAME_XP, DETAIL_INFO_ROW_XP)
+    state = await page.wait_for(PHONE_STATE_JS, *xps, timeout=timeout)
+    if not state:
+        logging.debug("Detail panel for %s did not render within timeout", url)
+        return None
+    rows = state.get("rows")
+    for _ in range(PHONE_SETTLE_TRIES if "phone" not in state else 0):
+        await asyncio.sleep(PHONE_RENDER_SETTLE)
+        state = await page.execute_script(PHONE_STATE_JS, *xps) or {}
+        if "phone" in state:
+            break
+        if state.get("rendered") and state.get("rows") == rows:
+            logging.debug("Detail panel for %s rendered without a phone", url)
+            return ""
+        rows = state.get("rows")
+    if "phone" not in state:
+        logging.debug("Detail panel for %s was still rendering, not treating it as a miss", url)
+        return None
+    return clean_phone_text(state["phone"])
+
+
+def clean_phone_text(raw: str) -> str:
+    raw = (raw or "").strip()
     if raw.startswith("tel:"):
         raw = raw[4:]
     ph = strong_phone_extract(raw) or raw
@@ -148,15 +184,278 @@ def read_csv(path: str) -> (List[str], List[Dict[str, Any]]):
 
 
 def write_csv(path: str, fieldnames: List[str], rows: List[Dict[str, Any]]):
-    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
         w = csv.DictWriter(f, fieldnames=fieldnames)
         w.writeheader()
         for row in rows:
             w.writerow(row)
+    os.replace(tmp, path)
+
+
+LAUNCH_LOCK = threading.Lock()
+
+
+def launch_driver(headless: bool):
+    # Launches stay serialised so parallel workers don't all hit the first-run patch at once.
+    with LAUNCH_LOCK:
+        return new_driver(headless=headless)
+
+
+def browser_tasks(
+    tasks: "queue.Queue",
+    results: "queue.Queue",
+    fetcher: Optional[HttpPhoneFetcher] = None,
+    stats: Optional[PathStats] = None,
+):
+    # Pulls work off the queue and only yields the profiles the HTTP fast path could not settle.
+    while True:
+        item = tasks.get()
+        if item is None:
+            return
+        idx, url = item
+        if fetcher is not None:
+            raw, status = fetcher.get_phone(url)
+            phone = clean_phone_text(raw) if raw else ""
+            if stats is not None:
+                stats.hit("http", "found" if phone else status)
+            if phone:
+                results.put((idx, phone, "found"))
+                jitter()
+                continue
+        yield idx, url
+
 
+def quit_driver(driver) -> None:
+    quit_chrome(driver)
 
-def process(input_csv: str, output_csv: str, limit: Optional[int] = None, headless: bool = True):
-    logging.info("Starting phone enrichment: in=%s out=%s limit=%s", input_csv, output_csv, limit)
+
+def read_phone_sampled(driver, url: str) -> Optional[str]:
+    phone = read_phone(driver, url)
+    sample_page(driver)
+    return phone
+
+
+def enrich_worker(
+    worker_id: int,
+    tasks: "queue.Queue",
+    results: "queue.Queue",
+    headless: bool,
+    fetcher: Optional[HttpPhoneFetcher] = None,
+    stats: Optional[PathStats] = None,
+    tabs: int = 1,
+    backend: str = "selenium",
+):
+    driver = None
+    visited = 0
+    try:
+        items = browser_tasks(tasks, results, fetcher, stats)
+        if backend == "cdp":
+            asyncio.run(enrich_cdp(worker_id, items, results, headless, tabs, stats))
+            return
+        if tabs > 1:
+            enrich_tabs(worker_id, items, results, headless, tabs, stats)
+            return
+        for idx, url in items:
+            # The browser is only launched once a profile actually needs it.
+            if driver is None or (PHONE_RESTART_EVERY and visited and visited % PHONE_RESTART_EVERY == 0):
+                if driver is not None:
+                    logging.info("[worker %d] Restarting browser after %d visits to stay fresh", worker_id, visited)
+                    quit_driver(driver)
+                try:
+                    driver = launch_driver(headless)
+                except Exception:
+                    results.put((idx, "", "error"))
+                    raise
+            phone = ""
+            status = "no_phone"
+            try:
+                phone = get_phone_from_page(driver, url)
+                sample_page(driver)
+                if phone is None:
+                    phone, status = "", "error"
+            except Exception as e:
+                status = "error"
+                logging.warning("[worker %d] Phone lookup failed for %s: %s", worker_id, url, e)
+                quit_driver(driver)
+                driver = None
+            visited += 1
+            if phone:
+                status = "found"
+            if stats is not None:
+                stats.hit("browser", status)
+            results.put((idx, phone, status))
+            jitter()
+    except Exception as e:
+        # process() must see this: the queue it was draining may now never finish
+        logging.error("[worker %d] Worker stopped: %s", worker_id, e)
+        results.put(e)
+    finally:
+        if fetcher is not None:
+            fetcher.close()
+        if driver is not None:
+            quit_driver(driver)
+        results.put(None)
+
+
+def enrich_tabs(worker_id: int, items, results: "queue.Queue", headless: bool, tabs: int, stats: Optional[PathStats] = None):
+    # One browser, several tabs: each tab's navigation runs while the others are read.
+    while True:
+        first = next(items, None)
+        if first is None:
+            return
+        rest = PHONE_RESTART_EVERY - 1 if PHONE_RESTART_EVERY else None
+        chunk = itertools.chain([first], itertools.islice(items, rest))
+        try:
+            driver = launch_driver(headless)
+        except Exception:
+            results.put((first[0], "", "error"))
+            raise
+        pool = TabPool(driver, tabs)
+        try:
+            for (idx, url), phone, err in pool.map(((t, t[1]) for t in chunk), read_phone_sampled):
+                status = "error" if err is not None or phone is None else ("found" if phone else "no_phone")
+                if err is not None:
+                    logging.warning("[worker %d] Phone lookup failed for %s: %s", worker_id, url, err)
+                if stats is not None:
+                    stats.hit("browser", status)
+                results.put((idx, phone or "", status))
+                jitter()
+        except Exception as e:
+            logging.warning("[worker %d] Browser failed with %d tab(s) in flight: %s", worker_id, len(pool.in_flight), e)
+            for idx, url in pool.drain():
+                results.put((idx, "", "error"))
+        finally:
+            quit_driver(driver)
+
+
+async def enrich_cdp(worker_id: int, items, results: "queue.Queue", headless: bool, pages: int, stats: Optional[PathStats] = None):
+    loop = asyncio.get_running_loop()
+
+    async def pull():
+        # browser_tasks blocks on the shared queue and the HTTP fast path, so keep it off the loop.
+        while True:
+            item = await loop.run_in_executor(None, next, items, None)
+            if item is None:
+                return
+            yield item
+
+    async def visit(page, item):
+        phone = await read_phone_cdp(page, item[1])
+        await sample_page_cdp(page)
+        await asyncio.sleep(random.uniform(ENRICH_JITTER_MIN, ENRICH_JITTER_MAX))
+        return phone
+
+    # Like the Selenium worker: a fresh browser every PHONE_RESTART_EVERY visits, and right away
+    # when the connection drops, so one dead Chrome cannot turn the rest of the queue into errors.
+    source = pull()
+    last = None
+    while True:
+        first = await anext(source, None)
+        if first is None:
+            return
+        if last is not None and last[0]:
+            logging.info("[worker %d] Restarting browser after %d visits to stay fresh", worker_id, last[1])
+        elif last is not None:
+            logging.warning("[worker %d] Browser connection lost after %d visits, relaunching", worker_id, last[1])
+        try:
+            browser = await CDPBrowser.launch(headless=headless)
+        except Exception:
+            results.put((first[0], "", "error"))
+            raise
+
+        async def chunk(first=first, browser=browser):
+            yield first
+            n = 1
+            while (not PHONE_RESTART_EVERY or n < PHONE_RESTART_EVERY) and browser.alive:
+                item = await anext(source, None)
+                if item is None:
+                    return
+                n += 1
+                yield item
+
+        visited = 0
+        try:
+            async for (idx, url), phone, err in map_pages(browser, chunk(), visit, pages):
+                visited += 1
+                status = "error" if err is not None or phone is None else ("found" if phone else "no_phone")
+                if err is not None:
+                    logging.warning("[worker %d] Phone lookup failed for %s: %s", worker_id, url, err)
+                if stats is not None:
+                    stats.hit("browser", status)
+                results.put((idx, phone or "", status))
+        finally:
+            logging.info("[worker %d] CDP commands sent: %d", worker_id, browser.conn.commands)
+            last = (browser.alive, visited)
+            await browser.close()
+
+
+def run_workers(
+    tasks: List[Tuple[int, str]],
+    headless: bool,
+    workers: int,
+    fetcher: Optional[HttpPhoneFetcher] = None,
+    stats: Optional[PathStats] = None,
+    tabs: int = 1,
+    backend: str = "selenium",
+):
+    task_q: "queue.Queue" = queue.Queue()
+    result_q: "queue.Queue" = queue.Queue()
+    for t in tasks:
+        task_q.put(t)
+    workers = max(1, min(workers, len(tasks) or 1))
+    for _ in range(workers):
+        task_q.put(None)
+    threads = [
+        threading.Thread(
+            target=enrich_worker,
+            args=(i + 1, task_q, result_q, headless, fetcher, stats, tabs, backend),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for t in threads:
+        t.start()
+    running = workers
+    failures = []
+    while running:
+        res = result_q.get()
+        if res is None:
+            running -= 1
+            continue
+        if isinstance(res, Exception):
+            failures.append(res)
+            continue
+        yield res
+    for t in threads:
+        t.join()
+    if failures:
+        raise WorkerError(f"{len(failures)} of {workers} workers stopped: {failures[0]}") from failures[0]
+
+
+def process(
+    input_csv: str,
+    output_csv: str,
+    limit: Optional[int] = None,
+    headless: bool = True,
+    workers: int = 1,
+    plan: bool = True,
+    cache_path: Optional[str] = PHONE_CACHE_FILE,
+    journal_path: Optional[str] = None,
+    http_fast_path: bool = PHONE_HTTP_FAST_PATH,
+    tabs: int = PHONE_TABS,
+    backend: str = PHONE_DRIVER,
+):
+    logging.info(
+        "Starting phone enrichment: in=%s out=%s limit=%s workers=%d tabs=%d driver=%s plan=%s",
+        input_csv,
+        output_csv,
+        limit,
+        workers,
+        tabs,
+        backend,
+        plan,
+    )
     fieldnames, rows = read_csv(input_csv)
     logging.info("Loaded %d rows from input", len(rows))
 
@@ -165,48 +464,103 @@ def process(input_csv: str, output_csv: str, limit: Optional[int] = None, headle
     if "phone_e164" not in fieldnames:
         fieldnames.append("phone_e164")
 
-    driver = new_driver(headless=headless)
-    updated = 0
-    try:
-        total = len(rows)
-        if limit is not None:
-            total = min(total, limit)
+    journal_path = journal_path or journal_path_for(output_csv)
+    done = read_journal(journal_path)
+    resumed = 0
+    for row in rows:
+        rec = done.get((row.get("profile_url") or "").strip())
+        if rec is None:
+            continue
+        if rec.get("phone"):
+            row["phone"] = rec["phone"]
+            row["phone_e164"] = rec.get("phone_e164") or normalize_phone_e164(rec["phone"])
+            resumed += 1
+    if done:
+        logging.info("Resuming from %s: %d journaled profiles, %d phones restored", journal_path, len(done), resumed)
+
+    def finished(url: str) -> bool:
+        return url in done and done[url].get("status") in DONE_STATUSES
+
+    cache = PhoneCache(cache_path) if cache_path else None
+    known_misses = set()
+    cached = 0
+    if cache is not None and plan:
+        for row in rows:
+            url = (row.get("profile_url") or "").strip()
+            if not url or has_phone(row) or finished(url):
+                continue
+            hit = cache.get(url)
+            if hit is None:
+                continue
+            if hit["status"] == "no_phone":
+                known_misses.add(url)
+            elif hit["phone"]:
+                row["phone"] = hit["phone"]
+                row["phone_e164"] = hit["phone_e164"] or normalize_phone_e164(hit["phone"])
+                cached += 1
+        logging.info("Phone cache: %d phones reused, %d known misses skipped", cached, len(known_misses))
+
+    tasks = []
+    if plan:
+        picked, plan_stats = plan_rows(rows, known_no_phone=known_misses.__contains__, limit=limit)
+        logging.info(
+            "Planned %d of %d rows (already_have_phone=%d known_no_phone=%d no_url=%d)",
+            plan_stats["planned"],
+            plan_stats["total"],
+            plan_stats["has_phone"],
+            plan_stats["known_no_phone"],
+            plan_stats["no_url"],
+        )
+        tasks = [(idx, rows[idx]["profile_url"].strip()) for idx in picked]
+    else:
         for idx, row in enumerate(rows):
             if limit is not None and idx >= limit:
                 break
-
-            if PHONE_RESTART_EVERY and idx > 0 and idx % PHONE_RESTART_EVERY == 0:
-                logging.info("Restarting browser after %d rows to stay fresh", idx)
-                try:
-                    driver.quit()
-                except Exception:
-                    pass
-                driver = new_driver(headless=headless)
-
             url = (row.get("profile_url") or "").strip()
-            if not url:
-                continue
-
-            phone = get_phone_from_page(driver, url)
-            jitter()
-            if not phone:
-                continue
-
-            row["phone"] = phone
-            row["phone_e164"] = normalize_phone_e164(phone)
-            updated += 1
+            if url:
+                tasks.append((idx, url))
+    tasks = [t for t in tasks if not finished(t[1])]
 
-            if updated % 20 == 0:
-                logging.info("Progress: updated_phones=%d / processed_rows=%d", updated, idx + 1)
-                write_csv(output_csv, fieldnames, rows)
-
-        write_csv(output_csv, fieldnames, rows)
-        logging.info("Phone enrichment finished. Total updated rows: %d", updated)
-    finally:
+    updated = 0
+    processed = 0
+    # Workers only fetch; this loop is the single writer. Each result is appended to the
+    # journal, and the output CSV is written once at the end from rows + journal.
+    fetcher = HttpPhoneFetcher() if http_fast_path else None
+    path_stats = PathStats()
+    failure = None
+    with Journal(journal_path) as journal:
         try:
-            driver.quit()
-        except Exception:
-            pass
+            for idx, phone, status in run_workers(tasks, headless, workers, fetcher, path_stats, tabs, backend):
+                processed += 1
+                row = rows[idx]
+                url = row["profile_url"].strip()
+                e164 = normalize_phone_e164(phone) if phone else ""
+                journal.record(url, phone, e164, status)
+                if cache is not None:
+                    cache.put(url, phone, e164, status)
+                if not phone:
+                    continue
+                row["phone"] = phone
+                row["phone_e164"] = e164
+                updated += 1
+
+                if updated % 20 == 0:
+                    logging.info("Progress: updated_phones=%d / processed_rows=%d of %d", updated, processed, len(tasks))
+        except WorkerError as e:
+            failure = e
+    if cache is not None:
+        cache.close()
+    if failure is not None or processed < len(tasks):
+        # the journal is the only record of this run's lookups; the next run resumes from it
+        logging.error("Phone enrichment stopped with %d of %d profiles processed; keeping %s", processed, len(tasks), journal_path)
+        raise failure or WorkerError(f"{len(tasks) - processed} profiles were not processed")
+
+    write_csv(output_csv, fieldnames, rows)
+    os.remove(journal_path)
+    logging.info("Phone enrichment finished. Total updated rows: %d (+%d resumed, +%d cached)", updated, resumed, cached)
+    path_stats.log()
+    log_cache_stats()
+    log_launch_stats()
 
 
 def main():
@@ -215,6 +569,13 @@ def main():
     ap.add_argument("--out", dest="out", required=True)
     ap.add_argument("--limit", type=int, default=PHONE_ENRICH_LIMIT)
     ap.add_argument("--no-headless", action="store_true")
+    ap.add_argument("--workers", type=int, default=PHONE_WORKERS, help="Parallel browsers pulling from one work queue")
+    ap.add_argument("--tabs", type=int, default=PHONE_TABS, help="Tabs per browser; navigations overlap across tabs")
+    ap.add_argument("--driver", choices=["selenium", "cdp"], default=PHONE_DRIVER, help="cdp talks to Chrome's DevTools socket directly; --tabs sets its page count")
+    ap.add_argument("--all-rows", action="store_true", help="Visit every row in file order instead of the planned subset")
+    ap.add_argument("--phone-cache", default=PHONE_CACHE_FILE, help="SQLite cache of past phone lookups keyed by place id")
+    ap.add_argument("--no-http", action="store_true", help="Skip the browserless fetch and always use Selenium")
+    ap.add_argument("--profile-pool", default=PROFILE_POOL_DIR, help="Reuse Chrome profiles from this dir so restarts keep a warm cache; empty to disable")
     ap.add_argument("--log", dest="log", default=LOG_LEVEL)
     args = ap.parse_args()
 
@@ -229,15 +590,34 @@ def main():
     )
 
     logging.info(
-        "CLI args: in=%s out=%s limit=%s no_headless=%s log=%s",
+        "CLI args: in=%s out=%s limit=%s no_headless=%s workers=%d all_rows=%s log=%s",
         args.inp,
         args.out,
         args.limit,
         args.no_headless,
+        args.workers,
+        args.all_rows,
         args.log,
     )
 
-    process(args.inp, args.out, limit=args.limit, headless=not args.no_headless)
+    if args.profile_pool:
+        set_profile_pool(ProfilePool(args.profile_pool))
+    try:
+        process(
+            args.inp,
+            args.out,
+            limit=args.limit,
+            headless=not args.no_headless,
+            workers=args.workers,
+            plan=not args.all_rows,
+            cache_path=args.phone_cache,
+            http_fast_path=not args.no_http,
+            tabs=args.tabs,
+            backend=args.driver,
+        )
+    except WorkerError as e:
+        logging.error("%s", e)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
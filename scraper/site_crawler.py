@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, asyncio, csv, html, logging, os, random, re, ssl, sys, time, zlib
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import (
+    USER_AGENTS,
+    SITE_CONCURRENCY,
+    SITE_PER_HOST,
+    SITE_TIMEOUT,
+    SITE_MAX_BYTES,
+    SITE_RESPECT_ROBOTS,
+    LOG_FORMAT,
+    LOG_LEVEL,
+)
+from cleaner.csv_cleaner import (
+    SOCIAL_HOSTS,
+    load_rows,
+    normalize_phone,
+    normalize_social_links,
+    normalize_website,
+)
+from scraper.enrich_planner import has_phone
+
+MAX_REDIRECTS = 5
+HREF_RE = re.compile(r"""<a\b[^>]*?href\s*=\s*["']([^"'#][^"']*)["'][^>]*>(.*?)</a>""", re.I | re.S)
+TAG_RE = re.compile(r"<[^>]+>")
+SCRIPT_RE = re.compile(r"<(script|style|noscript)\b.*?</\1>", re.I | re.S)
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w-]+)""", re.I)
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# Phone-shaped text only: a country/trunk prefix followed by digit groups.
+TEXT_PHONE_RE = re.compile(r"(?<![\d.])(?:\+?20[\s-]?|00\s?20[\s-]?|0)(?:1[0125]|[2-9]\d?)(?:[\s-]?\d){7,8}(?![\d.])")
+CONTACT_RE = re.compile(r"contact|kontakt|contacto|contato|اتصل|تواصل|اتصال", re.I)
+SOCIAL_SKIP_RE = re.compile(r"/sharer|/share\?|intent/tweet|/plugins/|/dialog/", re.I)
+EMAIL_SKIP_EXT = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg")
+
+
+def strip_www(host: str) -> str:
+    host = (host or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def page_text(doc: str) -> str:
+    return html.unescape(TAG_RE.sub(" ", SCRIPT_RE.sub(" ", doc)))
+
+
+def extract_contacts(doc: str, base_url: str) -> Dict[str, Any]:
+    phones: Dict[str, str] = {}
+    emails: List[str] = []
+    social: List[str] = []
+    contact_url = ""
+    base_host = strip_www(urlsplit(base_url).hostname or "")
+
+    def add_phone(raw: str) -> None:
+        e164 = normalize_phone(raw)
+        if e164 and e164 not in phones:
+            phones[e164] = " ".join(raw.split())
+
+    def add_email(raw: str) -> None:
+        e = raw.strip().lower()
+        if EMAIL_RE.fullmatch(e) and not e.endswith(EMAIL_SKIP_EXT) and e not in emails:
+            emails.append(e)
+
+    for m in HREF_RE.finditer(doc):
+        href = html.unescape(m.group(1)).strip()
+        low = href.lower()
+        if low.startswith("tel:"):
+            add_phone(href[4:])
+        elif low.startswith("mailto:"):
+            add_email(href[7:].split("?")[0])
+        elif any(h in low for h in SOCIAL_HOSTS):
+            if not SOCIAL_SKIP_RE.search(href):
+                social.append(href)
+        elif not contact_url and (CONTACT_RE.search(href) or CONTACT_RE.search(TAG_RE.sub("", m.group(2)))):
+            url = urljoin(base_url, href)
+            if url.startswith("http") and strip_www(urlsplit(url).hostname or "") == base_host:
+                contact_url = url.split("#")[0]
+    text = page_text(doc)
+    for m in TEXT_PHONE_RE.finditer(text):
+        add_phone(m.group(0))
+    for m in EMAIL_RE.finditer(text):
+        add_email(m.group(0))
+    return {
+        "phones": list(phones.items()),
+        "emails": emails,
+        "social_links": normalize_social_links(" ".join(social)),
+        "contact_url": contact_url,
+    }
+
+
+def merge_contacts(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    seen = {e for e, _ in a["phones"]}
+    phones = a["phones"] + [p for p in b["phones"] if p[0] not in seen]
+    emails = a["emails"] + [e for e in b["emails"] if e not in a["emails"]]
+    social = normalize_social_links(" ".join(x for x in (a["social_links"], b["social_links"]) if x))
+    return {"phones": phones, "emails": emails, "social_links": social, "contact_url": a["contact_url"]}
+
+
+class AsyncFetcher:
+    def __init__(
+        self,
+        per_host: int = SITE_PER_HOST,
+        timeout: float = SITE_TIMEOUT,
+        max_bytes: int = SITE_MAX_BYTES,
+        respect_robots: bool = SITE_RESPECT_ROBOTS,
+    ):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.respect_robots = respect_robots
+        self.ua = random.choice(USER_AGENTS)
+        self.ssl_ctx = ssl.create_default_context()
+        self.host_sems: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self.idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self.robots: Dict[str, "asyncio.Future"] = {}
+        self.stats = {"requests": 0, "connections": 0, "reused": 0, "robots_blocked": 0, "truncated": 0}
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        conns = self.idle.get(key)
+        while conns:
+            reader, writer = conns.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.stats["reused"] += 1
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self.ssl_ctx if scheme == "https" else None, limit=2 ** 20
+        )
+        self.stats["connections"] += 1
+        return reader, writer, False
+
+    def _release(self, key, reader, writer) -> None:
+        conns = self.idle.setdefault(key, [])
+        if len(conns) < self.per_host:
+            conns.append((reader, writer))
+        else:
+            writer.close()
+
+    async def _read_body(self, reader, headers) -> Tuple[bytes, bool]:
+        # Returns (body, framed); an unframed or truncated body leaves the connection unusable.
+        cap = self.max_bytes
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            parts, size = [], 0
+            while True:
+                line = await reader.readline()
+                n = int(line.split(b";")[0].strip() or b"0", 16)
+                if n == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(parts), True
+                if size + n > cap:
+                    parts.append(await reader.readexactly(cap - size))
+                    return b"".join(parts), False
+                parts.append(await reader.readexactly(n))
+                size += n
+                await reader.readline()
+        if "content-length" in headers:
+            n = int(headers["content-length"])
+            if n > cap:
+                return await reader.readexactly(cap), False
+            return await reader.readexactly(n), True
+        parts, size = [], 0
+        while size < cap:
+            chunk = await reader.read(min(65536, cap - size))
+            if not chunk:
+                break
+            parts.append(chunk)
+            size += len(chunk)
+        return b"".join(parts), False
+
+    async def _request(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = (parts.hostname or "").encode("idna").decode("ascii")
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        path = quote(parts.path or "/", safe="/%:@!$&'()*+,;=~-._")
+        if parts.query:
+            path += "?" + quote(parts.query, safe="/%:@!$&'()*+,;=~-._?")
+        host_header = host if parts.port is None else f"{host}:{port}"
+        req = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host_header}\r\n"
+            f"User-Agent: {self.ua}\r\n"
+            "Accept: text/html,application/xhtml+xml,*/*;q=0.8\r\n"
+            "Accept-Encoding: gzip, deflate\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("ascii")
+        sem = self.host_sems.setdefault(key, asyncio.Semaphore(self.per_host))
+        async with sem:
+            # An idle pooled connection may have been closed by the server; retry once fresh.
+            for attempt in range(2):
+                reader, writer, reused = await self._connect(key)
+                try:
+                    writer.write(req)
+                    await writer.drain()
+                    status_line = await reader.readline()
+                    if not status_line:
+                        raise ConnectionResetError("connection closed before response")
+                    version, status = status_line.decode("latin-1").split(None, 2)[:2]
+                    headers: Dict[str, str] = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        k, _, v = line.decode("latin-1").partition(":")
+                        headers[k.strip().lower()] = v.strip()
+                    body, framed = await self._read_body(reader, headers)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused and not attempt:
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                break
+        self.stats["requests"] += 1
+        if not framed:
+            self.stats["truncated"] += 1
+        if framed and version == "HTTP/1.1" and headers.get("connection", "").lower() != "close":
+            self._release(key, reader, writer)
+        else:
+            writer.close()
+        enc = headers.get("content-encoding", "")
+        if enc in ("gzip", "deflate"):
+            # A decompressobj also copes with bodies cut off at max_bytes.
+            d = zlib.decompressobj(16 + zlib.MAX_WBITS if enc == "gzip" else zlib.MAX_WBITS)
+            try:
+                body = d.decompress(body)
+            except zlib.error:
+                body = b""
+        return int(status), headers, body
+
+    async def _load_robots(self, origin: str) -> Optional[RobotFileParser]:
+        try:
+            status, _, body = await asyncio.wait_for(self._request(origin + "/robots.txt"), self.timeout)
+        except Exception:
+            return None
+        if status >= 400:
+            return None
+        rp = RobotFileParser()
+        rp.parse(body.decode("utf-8", errors="replace").splitlines())
+        return rp
+
+    async def allowed(self, url: str) -> bool:
+        if not self.respect_robots:
+            return True
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        fut = self.robots.get(origin)
+        if fut is None:
+            fut = self.robots[origin] = asyncio.ensure_future(self._load_robots(origin))
+        rp = await fut
+        if rp is None or rp.can_fetch(self.ua, url):
+            return True
+        self.stats["robots_blocked"] += 1
+        return False
+
+    async def fetch(self, url: str) -> Tuple[int, str, str]:
+        for _ in range(MAX_REDIRECTS + 1):
+            if not await self.allowed(url):
+                return 0, url, ""
+            status, headers, body = await asyncio.wait_for(self._request(url), self.timeout)
+            if status in (301, 302, 303, 307, 308) and headers.get("location"):
+                url = urljoin(url, headers["location"])
+                continue
+            charset = "utf-8"
+            m = re.search(r"charset=([\w-]+)", headers.get("content-type", "")) or META_CHARSET_RE.search(body[:2048])
+            if m:
+                charset = m.group(1).decode() if isinstance(m.group(1), bytes) else m.group(1)
+            try:
+                return status, url, body.decode(charset, errors="replace")
+            except LookupError:
+                return status, url, body.decode("utf-8", errors="replace")
+        return 0, url, ""
+
+    def close(self) -> None:
+        for conns in self.idle.values():
+            for _, writer in conns:
+                writer.close()
+        self.idle.clear()
+
+
+async def crawl_site(fetcher: AsyncFetcher, website: str) -> Optional[Dict[str, Any]]:
+    status, final_url, doc = await fetcher.fetch(website)
+    if status != 200:
+        return None
+    found = extract_contacts(doc, final_url)
+    contact = found["contact_url"]
+    if contact and contact != final_url:
+        try:
+            status, url, doc = await fetcher.fetch(contact)
+            if status == 200:
+                found = merge_contacts(found, extract_contacts(doc, url))
+        except Exception as e:
+            logging.debug("Contact page failed for %s: %s", contact, e)
+    return found
+
+
+async def crawl_sites(
+    websites: List[str],
+    concurrency: int = SITE_CONCURRENCY,
+    fetcher: Optional[AsyncFetcher] = None,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    fetcher = fetcher or AsyncFetcher()
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    todo: "asyncio.Queue" = asyncio.Queue()
+    for w in websites:
+        todo.put_nowait(w)
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                site = todo.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results[site] = await crawl_site(fetcher, site)
+            except Exception as e:
+                errors += 1
+                results[site] = None
+                logging.debug("Site crawl failed for %s: %s", site, e)
+
+    started = time.time()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(websites))))))
+    fetcher.close()
+    elapsed = max(time.time() - started, 1e-9)
+    logging.info(
+        "Crawled %d sites in %.1fs (%.0f/min): errors=%d requests=%d connections=%d reused=%d robots_blocked=%d truncated=%d",
+        len(websites),
+        elapsed,
+        60 * len(websites) / elapsed,
+        errors,
+        fetcher.stats["requests"],
+        fetcher.stats["connections"],
+        fetcher.stats["reused"],
+        fetcher.stats["robots_blocked"],
+        fetcher.stats["truncated"],
+    )
+    return results
+
+
+def apply_contacts(row: Dict[str, Any], found: Dict[str, Any]) -> bool:
+    changed = False
+    if found["phones"] and not has_phone(row):
+        e164, raw = found["phones"][0]
+        row["phone"] = raw
+        row["phone_e164"] = e164
+        changed = True
+    if found["emails"] and not (row.get("email") or "").strip():
+        row["email"] = ", ".join(found["emails"][:3])
+        changed = True
+    if found["social_links"]:
+        merged = normalize_social_links(" ".join(x for x in (row.get("social_links") or "", found["social_links"]) if x))
+        if merged != (row.get("social_links") or ""):
+            row["social_links"] = merged
+            changed = True
+    return changed
+
+
+def write_csv(path: str, fieldnames: List[str], rows: List[Dict[str, Any]]):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fieldnames)
+        w.writeheader()
+        for row in rows:
+            w.writerow(row)
+    os.replace(tmp, path)
+
+
+def process(
+    input_csv: str,
+    output_csv: str,
+    concurrency: int = SITE_CONCURRENCY,
+    per_host: int = SITE_PER_HOST,
+    timeout: float = SITE_TIMEOUT,
+    respect_robots: bool = SITE_RESPECT_ROBOTS,
+):
+    fieldnames, rows = load_rows(input_csv)
+    fieldnames = list(fieldnames or [])
+    for f in ("phone", "phone_e164", "email", "social_links"):
+        if f not in fieldnames:
+            fieldnames.append(f)
+    # Chains share one website; crawl each distinct site once.
+    by_site: Dict[str, List[int]] = {}
+    for idx, row in enumerate(rows):
+        site = normalize_website((row.get("website") or "").strip())
+        if site:
+            by_site.setdefault(site, []).append(idx)
+    logging.info("Site crawl: %d rows, %d distinct websites", len(rows), len(by_site))
+    fetcher = AsyncFetcher(per_host=per_host, timeout=timeout, respect_robots=respect_robots)
+    results = asyncio.run(crawl_sites(list(by_site), concurrency, fetcher))
+    updated = phones = 0
+    for site, idxs in by_site.items():
+        found = results.get(site)
+        if not found:
+            continue
+        for idx in idxs:
+            had = has_phone(rows[idx])
+            if apply_contacts(rows[idx], found):
+                updated += 1
+                phones += int(not had and has_phone(rows[idx]))
+    write_csv(output_csv, fieldnames, rows)
+    logging.info("Site crawl finished: updated_rows=%d new_phones=%d", updated, phones)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="inp", required=True)
+    ap.add_argument("--out", dest="out", required=True)
+    ap.add_argument("--concurrency", type=int, default=SITE_CONCURRENCY, help="Sites crawled at once")
+    ap.add_argument("--per-host", type=int, default=SITE_PER_HOST, help="Concurrent requests per host")
+    ap.add_argument("--timeout", type=float, default=SITE_TIMEOUT)
+    ap.add_argument("--ignore-robots", action="store_true")
+    ap.add_argument("--log", dest="log", default=LOG_LEVEL)
+    args = ap.parse_args()
+
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(
+        level=level,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.FileHandler("site_crawler.log", encoding="utf-8"),
+            logging.StreamHandler(stream=sys.stdout),
+        ],
+    )
+
+    process(
+        args.inp,
+        args.out,
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        timeout=args.timeout,
+        respect_robots=not args.ignore_robots,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import logging, time
+from collections import deque
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+# The flag lives on the old document's window, so it disappears once the new page commits.
+NAVIGATE_JS = "window.__tabPoolPending = true; window.location.href = arguments[0];"
+COMMITTED_JS = "return !window.__tabPoolPending && document.readyState !== 'loading';"
+BACKGROUND_TAB_FLAGS = [
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+]
+
+
+def wait_until(fn: Callable[[], Any], timeout: float, poll: float = 0.1) -> Any:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            res = fn()
+        except Exception:
+            res = None
+        if res:
+            return res
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll)
+
+
+class TabPool:
+    def __init__(self, driver, tabs: int, commit_timeout: float = 20):
+        self.driver = driver
+        self.commit_timeout = commit_timeout
+        self.home = driver.current_window_handle
+        self.handles: List[str] = [self.home]
+        for _ in range(max(1, tabs) - 1):
+            before = set(driver.window_handles)
+            driver.execute_script("window.open('about:blank', '_blank');")
+            new = [h for h in driver.window_handles if h not in before]
+            if not new:
+                break
+            self.handles.append(new[0])
+        self.in_flight: Deque[Tuple[str, Any, str]] = deque()
+        logging.info("Tab pool ready with %d tab(s)", len(self.handles))
+
+    def _start(self, handle: str, item: Any, url: str) -> None:
+        # Tracked before navigating so a dead browser still reports it through drain().
+        self.in_flight.append((handle, item, url))
+        self.driver.switch_to.window(handle)
+        self.driver.execute_script(NAVIGATE_JS, url)
+
+    def map(
+        self,
+        items: Iterable[Tuple[Any, str]],
+        extract: Callable[[Any, str], Any],
+    ) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        # Yields (item, result, error) in completion order, which is submission order.
+        source = iter(items)
+        for handle in self.handles:
+            nxt = next(source, None)
+            if nxt is None:
+                break
+            self._start(handle, *nxt)
+        while self.in_flight:
+            handle, item, url = self.in_flight[0]
+            self.driver.switch_to.window(handle)
+            result, error = None, None
+            if wait_until(lambda: self.driver.execute_script(COMMITTED_JS), self.commit_timeout):
+                try:
+                    result = extract(self.driver, url)
+                except Exception as e:
+                    error = e
+            else:
+                error = TimeoutError(f"navigation to {url} did not commit")
+            self.in_flight.popleft()
+            nxt = next(source, None)
+            failed = None
+            if nxt is not None:
+                try:
+                    self._start(handle, *nxt)
+                except Exception as e:
+                    failed = e
+            yield item, result, error
+            if failed is not None:
+                raise failed
+
+    def drain(self) -> List[Any]:
+        items = [item for _, item, _ in self.in_flight]
+        self.in_flight.clear()
+        return items
+
+    def close(self) -> None:
+        self.in_flight.clear()
+        for handle in self.handles[1:]:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.handles = [self.home]
+        try:
+            self.driver.switch_to.window(self.home)
+        except Exception:
+            pass
@@ -0,0 +1,72 @@
+import pytest
+
+
+class FakeElement:
+    def __init__(self, href="", text=""):
+        self.href = href
+        self.text = text
+
+    def get_attribute(self, name):
+        return self.href
+
+
+class FakeDriver:
+    # Selenium driver stand-in: tabs, navigation and the place panel XPaths phone_enricher reads.
+    # panel(url) returns the phone shown on that page ("" for none, None for a panel that never renders).
+    def __init__(self, dead_after=None, panel=None):
+        self.handles = ["t0"]
+        self.current = "t0"
+        self.pages = {}
+        self.log = []
+        self.dead_after = dead_after
+        self.panel = panel
+        outer = self
+
+        class SwitchTo:
+            def window(self, handle):
+                if outer.dead_after is not None and len(outer.log) >= outer.dead_after:
+                    raise RuntimeError("browser gone")
+                outer.current = handle
+
+        self.switch_to = SwitchTo()
+
+    @property
+    def current_window_handle(self):
+        return self.current
+
+    @property
+    def window_handles(self):
+        return list(self.handles)
+
+    def get(self, url):
+        self.pages[self.current] = url
+        self.log.append(("get", self.current, url))
+
+    def execute_script(self, js, *args):
+        if "window.open" in js:
+            self.handles.append(f"t{len(self.handles)}")
+        elif "location.href" in js:
+            self.pages[self.current] = args[0]
+            self.log.append(("nav", self.current, args[0]))
+        else:
+            return True
+
+    def find_elements(self, by, xp):
+        url = self.pages.get(self.current)
+        phone = self.panel(url) if self.panel is not None and url else None
+        if phone is None:
+            return []
+        if "tel:" in xp:
+            return [FakeElement("tel:" + phone)] if phone else []
+        return [FakeElement()]
+
+    def close(self):
+        self.handles.remove(self.current)
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def fake_driver():
+    return FakeDriver
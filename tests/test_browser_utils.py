@@ -0,0 +1,35 @@
+import os
+
+import browser_utils
+
+
+def test_chrome_version_is_probed_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(browser_utils, "_probe_chrome_major", lambda: calls.append(1) or 131)
+    browser_utils.get_installed_chrome_major.cache_clear()
+    try:
+        assert [browser_utils.get_installed_chrome_major() for _ in range(5)] == [131] * 5
+        assert len(calls) == 1
+    finally:
+        browser_utils.get_installed_chrome_major.cache_clear()
+
+
+def test_patched_driver_is_reused_per_major(tmp_path, monkeypatch):
+    patched = []
+
+    class FakePatcher:
+        def __init__(self, version_main):
+            self.executable_path = str(tmp_path / f"downloaded_{version_main}")
+
+        def auto(self):
+            patched.append(self.executable_path)
+            with open(self.executable_path, "wb") as f:
+                f.write(b"patched")
+
+    monkeypatch.setattr(browser_utils, "Patcher", FakePatcher)
+    monkeypatch.setattr(browser_utils, "CHROMEDRIVER_CACHE_DIR", str(tmp_path / "cache"))
+    first = browser_utils.patched_driver_path(131)
+    assert browser_utils.patched_driver_path(131) == first
+    other = browser_utils.patched_driver_path(132)
+    assert len(patched) == 2 and first != other
+    assert open(first, "rb").read() == b"patched" and os.path.dirname(first) == str(tmp_path / "cache")
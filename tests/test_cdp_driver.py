@@ -0,0 +1,86 @@
+import asyncio
+import base64
+import hashlib
+import json
+
+from scraper.cdp_driver import CDPBrowser, CDPError, encode_frame, map_pages, read_frame
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class FakeChrome:
+    def __init__(self):
+        self.targets = 0
+        self.urls = {}
+        self.methods = []
+
+    async def handle(self, reader, writer):
+        key = ""
+        while True:
+            line = (await reader.readline()).decode()
+            if line in ("\r\n", ""):
+                break
+            if line.lower().startswith("sec-websocket-key:"):
+                key = line.split(":", 1)[1].strip()
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+        try:
+            while True:
+                op, _, data = await read_frame(reader)
+                if op == 0x8:
+                    break
+                msg = json.loads(data)
+                self.methods.append(msg["method"])
+                for out in self.answer(msg):
+                    writer.write(encode_frame(json.dumps(out).encode(), mask=False))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        writer.close()
+
+    def answer(self, msg):
+        method, params, sid = msg["method"], msg["params"], msg.get("sessionId")
+        reply = {"id": msg["id"], "result": {}}
+        if method == "Target.createTarget":
+            self.targets += 1
+            reply["result"] = {"targetId": f"T{self.targets}"}
+        elif method == "Target.attachToTarget":
+            reply["result"] = {"sessionId": "S" + params["targetId"]}
+        elif method == "Page.navigate":
+            self.urls[sid] = params["url"]
+            return [reply, {"method": "Page.loadEventFired", "sessionId": sid, "params": {}}]
+        elif method == "Runtime.evaluate":
+            if "throw" in params["expression"]:
+                return [{"id": msg["id"], "error": {"message": "boom"}}]
+            reply["result"] = {"result": {"value": self.urls.get(sid, "about:blank") + "|" + "x" * 70000}}
+        return [reply]
+
+
+def test_pages_run_concurrently_over_one_socket():
+    chrome = FakeChrome()
+
+    async def run():
+        srv = await asyncio.start_server(chrome.handle, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        browser = await CDPBrowser.connect(f"ws://127.0.0.1:{port}/devtools/browser/x")
+
+        async def visit(page, url):
+            await page.get(url)
+            value = await page.execute_script("function() { return location.href; }")
+            return value.split("|")[0]
+
+        out = [r async for r in map_pages(browser, [f"https://maps/{i}" for i in range(6)], visit, 3)]
+        page = await browser.new_page()
+        try:
+            await page.execute_script("function() { throw 1; }")
+            raised = False
+        except CDPError:
+            raised = True
+        await browser.close()
+        srv.close()
+        return out, raised
+
+    out, raised = asyncio.run(run())
+    assert sorted((item, res) for item, res, err in out) == [(f"https://maps/{i}", f"https://maps/{i}") for i in range(6)]
+    assert chrome.targets == 4 and raised
+    assert chrome.methods.count("Target.closeTarget") == 3
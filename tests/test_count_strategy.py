@@ -0,0 +1,73 @@
+from count_strategy import CountStrategy, count_key
+from query_cache import search_params
+
+
+def counter(n):
+    calls = []
+
+    def exact():
+        calls.append(1)
+        return n
+
+    return exact, calls
+
+
+def test_count_key_ignores_sort_and_cursor():
+    a = search_params({"category": "Cafe", "sort": "name_asc", "cursor": "abc"})
+    b = search_params({"category": "Cafe"})
+    assert count_key(a) == count_key(b)
+
+
+def test_last_page_is_counted_for_free():
+    counts = CountStrategy(background=False)
+    exact, calls = counter(999)
+    assert counts.total(search_params({}), 37, False, 40, exact) == (37, "exact")
+    assert not calls
+
+
+def test_small_results_get_an_exact_count_once():
+    counts = CountStrategy(exact_threshold=1000, background=False)
+    exact, calls = counter(812)
+    params = search_params({"category": "Cafe"})
+    assert counts.total(params, 100, True, 700, exact) == (812, "exact")
+    assert counts.total(params, 100, True, 700, exact) == (812, "exact")
+    assert len(calls) == 1
+
+
+def test_wide_results_are_estimated_then_cached():
+    counts = CountStrategy(exact_threshold=1000, background=False)
+    exact, calls = counter(12431)
+    params = search_params({})
+    assert counts.total(params, 100, True, 12000, exact) == (12000, "estimated")
+    assert counts.total(params, 100, True, 12000, exact) == (12431, "exact")
+    assert len(calls) == 1
+    s = counts.snapshot()
+    assert s["estimated"] == 1 and s["cached"] == 1 and s["refreshes"] == 1 and s["pending"] == 0
+
+
+def test_estimate_never_undercounts_the_visible_page():
+    counts = CountStrategy(exact_threshold=10, background=False)
+
+    def failing():
+        raise RuntimeError("timeout")
+
+    assert counts.total(search_params({}), 100, True, None, failing) == (101, "estimated")
+    assert counts.total(search_params({}), 100, True, 50, failing) == (101, "estimated")
+
+
+def test_small_count_failure_falls_back_to_the_estimate():
+    counts = CountStrategy(exact_threshold=1000, background=False)
+
+    def failing():
+        raise RuntimeError("statement timeout")
+
+    assert counts.total(search_params({"category": "Cafe"}), 100, True, 700, failing) == (700, "estimated")
+    assert counts.snapshot()["small"] == 0
+
+
+def test_no_planner_estimate_counts_right_away():
+    # search_leads and the replica return no estimate; a wide match must not read as "~101"
+    counts = CountStrategy(exact_threshold=1000, background=False)
+    exact, calls = counter(4200)
+    assert counts.total(search_params({"q": "cafe"}), 100, True, None, exact) == (4200, "exact")
+    assert len(calls) == 1
@@ -1,2 +1,142 @@
+import csv, io, json
+
+from cleaner import csv_cleaner
+from config import CSV_FIELDS as FIELDS
+
+
+def _write_raw(path, rows, header=True):
+    with open(path, "a", encoding="utf-8-sig" if header else "utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS, restval="")
+        if header:
+            w.writeheader()
+        for r in rows:
+            w.writerow(r)
+
+
+def _row(i, url=None, photo="https://lh3.googleusercontent.com/p/shared=w80"):
+    return {
+        "category": "dentist",
+        "query_location": "Cairo, Egypt",
+        "name": f"Clinic {i}",
+        "category_line": "Dentist · 12 Tahrir Street",
+        "address_line": "",
+        "phone": "0100 123 456%d" % (i % 10),
+        "profile_url": url or f"https://www.google.com/maps/place/Clinic+{i}/data=!4m7!3m6!1s0x0:0x{i}!19sChIJabc{i}?hl=en",
+        "photo_urls": photo,
+    }
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
 def test_placeholder_csv_cleaner():
     assert True
+
+
+def test_incremental_matches_full_run(tmp_path):
+    raw = tmp_path / "raw.csv"
+    _write_raw(raw, [_row(1), _row(2), _row(1)])
+    inc = tmp_path / "inc.csv"
+    csv_cleaner.process_incremental(str(raw), str(inc))
+    _write_raw(raw, [_row(3), _row(2), _row(4, photo="https://lh3.googleusercontent.com/p/other")], header=False)
+    csv_cleaner.process_incremental(str(raw), str(inc))
+
+    full = tmp_path / "full.csv"
+    csv_cleaner.process(str(raw), str(full))
+    assert _read(inc) == _read(full)
+    assert len(_read(inc)) == 4
+
+
+def test_incremental_no_new_rows_is_noop(tmp_path):
+    raw = tmp_path / "raw.csv"
+    _write_raw(raw, [_row(1)])
+    out = tmp_path / "out.csv"
+    csv_cleaner.process_incremental(str(raw), str(out))
+    before = out.read_bytes()
+    csv_cleaner.process_incremental(str(raw), str(out))
+    assert out.read_bytes() == before
+
+
+def test_incremental_never_cuts_a_quoted_multiline_record(tmp_path):
+    raw = tmp_path / "raw.csv"
+    _write_raw(raw, [_row(1)])
+    buf = io.StringIO(newline="")
+    csv.DictWriter(buf, fieldnames=FIELDS, restval="").writerow(dict(_row(2), address_line="12 Tahrir St\nDowntown"))
+    record = buf.getvalue().encode("utf-8")
+    split = record.index(b"\n") + 1
+    with open(raw, "ab") as f:
+        f.write(record[:split])
+    out = tmp_path / "out.csv"
+    csv_cleaner.process_incremental(str(raw), str(out))
+    assert [r["name"] for r in _read(out)] == ["Clinic 1"]
+    with open(raw, "ab") as f:
+        f.write(record[split:])
+    csv_cleaner.process_incremental(str(raw), str(out))
+    rows = _read(out)
+    assert [r["name"] for r in rows] == ["Clinic 1", "Clinic 2"]
+    assert "Downtown" in rows[1]["address_line"]
+    with open(str(out) + ".state.json", encoding="utf-8") as f:
+        assert "seen" not in json.load(f)
+
+
+def test_photo_index_dedupes_across_runs(tmp_path):
+    shared = "https://lh3.googleusercontent.com/p/stock=w80"
+    index = str(tmp_path / "photos.sqlite")
+    raw1, raw2 = tmp_path / "a.csv", tmp_path / "b.csv"
+    _write_raw(raw1, [_row(1, photo=shared)])
+    _write_raw(raw2, [_row(2, photo=shared + ", https://lh3.googleusercontent.com/p/own2")])
+    csv_cleaner.process(str(raw1), str(tmp_path / "a_out.csv"), photo_index=index)
+    csv_cleaner.process(str(raw2), str(tmp_path / "b_out.csv"), photo_index=index)
+    assert _read(tmp_path / "a_out.csv")[0]["photo_urls"] == "https://lh3.googleusercontent.com/p/stock"
+    assert _read(tmp_path / "b_out.csv")[0]["photo_urls"] == "https://lh3.googleusercontent.com/p/own2"
+
+
+def test_photo_index_bloom_survives_reopen(tmp_path):
+    from cleaner.photo_index import PhotoIndex
+
+    path = str(tmp_path / "idx.sqlite")
+    with PhotoIndex(path, expected_keys=1000) as idx:
+        for i in range(500):
+            idx.add(f"https://x/p/{i}")
+    with PhotoIndex(path, expected_keys=1000) as idx:
+        assert all(f"https://x/p/{i}" in idx for i in range(500))
+        misses = sum(f"https://x/q/{i}" in idx for i in range(2000))
+        assert misses == 0
+        assert idx.stats()["bloom_rejects"] > 1900
+
+
+def test_photo_index_rerun_is_idempotent(tmp_path):
+    index = str(tmp_path / "photos.sqlite")
+    raw = tmp_path / "raw.csv"
+    _write_raw(raw, [_row(1, photo="https://lh3.googleusercontent.com/p/own1, https://lh3.googleusercontent.com/p/alt1"), _row(2)])
+    csv_cleaner.process(str(raw), str(tmp_path / "first.csv"), photo_index=index)
+    csv_cleaner.process(str(raw), str(tmp_path / "second.csv"), photo_index=index)
+    first = _read(tmp_path / "first.csv")
+    assert _read(tmp_path / "second.csv") == first
+    assert first[0]["photo_urls"] == "https://lh3.googleusercontent.com/p/own1"
+    # a different place still cannot take a claimed photo
+    other = tmp_path / "other.csv"
+    _write_raw(other, [_row(3, photo="https://lh3.googleusercontent.com/p/own1, https://lh3.googleusercontent.com/p/own3")])
+    csv_cleaner.process(str(other), str(tmp_path / "other_out.csv"), photo_index=index)
+    assert _read(tmp_path / "other_out.csv")[0]["photo_urls"] == "https://lh3.googleusercontent.com/p/own3"
+
+
+def test_photo_index_bloom_grows_past_capacity(tmp_path):
+    from cleaner.photo_index import PhotoIndex
+
+    path = str(tmp_path / "idx.sqlite")
+    with PhotoIndex(path, expected_keys=100) as idx:
+        for i in range(50):
+            idx.add(f"https://x/p/{i}")
+    with PhotoIndex(path, expected_keys=100) as idx:
+        small = idx.bloom.capacity
+        for i in range(50, 1000):
+            idx.add(f"https://x/p/{i}")
+        idx.flush()
+        assert idx.bloom.capacity >= 1000 > small
+        assert all(f"https://x/p/{i}" in idx for i in range(1000))
+    with PhotoIndex(path, expected_keys=100) as idx:
+        assert idx.bloom.capacity >= 1000
+        assert sum(f"https://x/q/{i}" in idx for i in range(2000)) < 60
@@ -0,0 +1,15 @@
+from scraper.enrich_planner import plan_rows
+
+
+def test_planner_skips_rows_with_phones_and_known_misses():
+    rows = [
+        {"profile_url": "u0", "phone": "0100", "rating": "4.9", "reviews_count": "900"},
+        {"profile_url": "u1", "phone": "", "rating": "3.1", "reviews_count": "5"},
+        {"profile_url": "u2", "phone": "", "rating": "4.8", "reviews_count": "120"},
+        {"profile_url": "u3", "phone": "", "rating": "4.8", "reviews_count": "10"},
+        {"profile_url": "", "phone": ""},
+        {"profile_url": "u5", "phone": "", "phone_e164": "", "rating": "5"},
+    ]
+    picked, stats = plan_rows(rows, known_no_phone=lambda url: url == "u5")
+    assert picked == [2, 3, 1]
+    assert stats == {"total": 6, "no_url": 1, "has_phone": 1, "known_no_phone": 1, "planned": 3}
@@ -0,0 +1,85 @@
+import csv, io, json
+
+import pytest
+
+from db.replica import Replica, build_from_csv
+from export import csv_chunks, export_row, iter_batches, ndjson_chunks, parquet_chunks
+from query_cache import search_params
+
+
+def fake_fetch(rows):
+    # rows already in (rating desc, id) order; mimics fetch_page's keyset contract
+    calls = []
+
+    def fetch(params, after, limit):
+        calls.append(after)
+        start = 0
+        if after is not None:
+            start = next(i for i, r in enumerate(rows) if (r["rating"], r["id"]) == after) + 1
+        return rows[start : start + limit]
+
+    return fetch, calls
+
+
+ROWS = [{"id": i, "name": f"Place {i}", "correct_name": "", "rating": 5.0 - i / 10, "photo_urls": ""} for i in range(1, 8)]
+
+
+def test_batches_follow_the_keyset():
+    fetch, calls = fake_fetch(ROWS)
+    batches = list(iter_batches(search_params({}), fetch, batch=3))
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert calls == [None, (4.7, 3), (4.4, 6)]
+    fetch, calls = fake_fetch(ROWS[:6])
+    assert [len(b) for b in iter_batches(search_params({}), fetch, batch=3)] == [3, 3]
+    assert len(calls) == 3
+
+
+def test_export_row_keeps_nulls():
+    row = export_row({"id": 1, "name": "x", "correct_name": "Y", "rating": None, "photo_urls": "https://a/1, https://a/2", "rank": 0.3}, "full")
+    assert row["name"] == "Y" and row["rating"] is None and row["photos"] == "https://a/1, https://a/2"
+    assert "rank" not in row
+
+
+def test_csv_and_ndjson_stream_one_chunk_per_batch():
+    batches = [ROWS[:3], ROWS[3:]]
+    chunks = list(csv_chunks(iter(batches), "list"))
+    assert len(chunks) == 2 and chunks[1].count(b"\n") == 4
+    got = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert [r["name"] for r in got] == [r["name"] for r in ROWS] and got[0]["rating"] == "4.9"
+    lines = b"".join(ndjson_chunks(iter(batches), "list")).decode("utf-8").splitlines()
+    assert [json.loads(l)["id"] for l in lines] == list(range(1, 8))
+
+
+def test_parquet_stream():
+    pq = pytest.importorskip("pyarrow.parquet")
+    body = b"".join(parquet_chunks(iter([ROWS[:3], ROWS[3:]]), "list"))
+    table = pq.read_table(io.BytesIO(body))
+    assert table.num_rows == 7 and pq.ParquetFile(io.BytesIO(body)).metadata.num_row_groups == 2
+    assert table.column("rating").to_pylist()[0] == 4.9
+
+
+def test_parquet_from_replica_rows(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    src = tmp_path / "enriched.csv"
+    with open(src, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["profile_url", "name", "rating", "reviews_count", "price_min_egp", "price_is_plus"])
+        w.writerow(["https://maps/1", "Nile Cafe", "4.5", "120", "100", "true"])
+        w.writerow(["https://maps/2", "Zooba", "", "", "", ""])
+        w.writerow(["https://maps/3", "Cairo Bakery", "3.9", "7", "50", "false"])
+    build_from_csv(str(src), str(tmp_path / "replica.sqlite"))
+    replica = Replica(str(tmp_path / "replica.sqlite"))
+    params = search_params({"view": "full"})
+    body = b"".join(parquet_chunks(iter_batches(params, replica.search, batch=2), "full"))
+    table = pq.read_table(io.BytesIO(body))
+    assert table.column("price_is_plus").to_pylist() == [True, False, None]
+    assert table.column("reviews_count").to_pylist() == [120, 7, None]
+    assert str(table.schema.field("price_is_plus").type) == "bool"
+
+
+def test_empty_export_is_still_a_valid_file():
+    header = b"".join(csv_chunks(iter([]), "list")).decode("utf-8")
+    assert header.strip().split(",")[:3] == ["id", "name", "category"]
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(io.BytesIO(b"".join(parquet_chunks(iter([]), "full"))))
+    assert table.num_rows == 0 and "price_is_plus" in table.column_names
@@ -0,0 +1,46 @@
+from facets import FacetCache, merge_values
+
+
+def test_merge_values_unions_and_sorts():
+    assert merge_values(["Giza", "Cairo"], {" Alexandria ", "", "Cairo"}) == ["Alexandria", "Cairo", "Giza"]
+    assert merge_values(None, set()) == []
+
+
+def test_refresh_swaps_lists_and_payload():
+    loads = [{"locations": ["Cairo"]}, {"locations": ["Cairo", "Giza"], "categories": ["ignored"]}]
+    facets = FacetCache(lambda: loads.pop(0), static={"categories": ["cafes"]})
+    assert facets.get("locations") == [] and facets.loaded_at is None
+    first = facets.payload.etag
+    assert facets.refresh(version=1)
+    assert facets.get("locations") == ["Cairo"] and facets.get("categories") == ["cafes"]
+    assert facets.payload.etag != first
+    etag = facets.payload.etag
+    assert facets.refresh(version=2)
+    assert facets.get("locations") == ["Cairo", "Giza"] and facets.get("categories") == ["cafes"]
+    assert facets.payload.etag != etag and facets.snapshot()["version"] == 2
+
+
+def test_failed_refresh_keeps_previous_lists():
+    facets = FacetCache(lambda: {"locations": ["Cairo"]})
+    facets.refresh(version=1)
+    facets.loader = lambda: 1 / 0
+    assert not facets.refresh(version=2)
+    assert facets.get("locations") == ["Cairo"] and facets.version == 1
+
+
+def test_failed_first_load_backs_off():
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise RuntimeError("connection refused")
+
+    facets = FacetCache(down, retry_after=15)
+    assert facets.due(None)
+    assert not facets.refresh(None)
+    assert not facets.due(None, now=facets.failed_at + 5)
+    assert facets.due(None, now=facets.failed_at + 15)
+    facets.loader = lambda: {"locations": ["Cairo"]}
+    assert facets.refresh(None) and facets.failed_at is None
+    assert not facets.due(None) and facets.due(2)
+    assert len(calls) == 1
@@ -0,0 +1,64 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper.http_phone import HttpPhoneFetcher, extract_phone_from_html
+
+PAGES = {
+    "/tel": b'<a data-item-id="phone:tel:0223456789" href="tel:0223456789">Call</a>',
+    "/ld": b'<script type="application/ld+json">{"@type":"Dentist","telephone":"+20 100 123 4567"}</script>',
+    "/none": b"<html><body>No phone here</body></html>",
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/tel")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_fetcher_extracts_phones_over_one_connection(server):
+    f = HttpPhoneFetcher(timeout=5)
+    assert f.get_phone(server + "/tel") == ("0223456789", "found")
+    assert f.get_phone(server + "/ld") == ("+20 100 123 4567", "found")
+    assert f.get_phone(server + "/moved") == ("0223456789", "found")
+    assert f.get_phone(server + "/none") == ("", "no_phone")
+    assert f.get_phone(server + "/missing") == ("", "error")
+    assert f.connections_opened == 1
+    f.close()
+
+
+def test_extract_phone_prefers_specific_markup():
+    doc = 'x tel:+20 2 1111 2222 y <a href="tel:01001234567">'
+    assert extract_phone_from_html(doc) == "01001234567"
@@ -0,0 +1,27 @@
+from info_lines import classify
+
+
+def test_classify_price_line():
+    c = classify("EGP 200–400+")
+    assert c.kind == "price"
+    assert (c.price_min_egp, c.price_max_egp, c.price_is_plus) == ("200", "400", True)
+    assert not c.is_address
+
+
+def test_classify_category_and_address_parts():
+    c = classify("Dentist · 12 Tahrir Street")
+    assert (c.left, c.right) == ("Dentist", "12 Tahrir Street")
+    assert classify(c.right).is_address
+    assert classify(c.left).kind == "category"
+
+
+def test_classify_rating_and_hours():
+    assert classify("4.6(1,234)").is_rating
+    assert classify("Open · Closes 11 PM").kind == "hours"
+
+
+def test_classify_is_memoised():
+    classify.cache_clear()
+    classify("Cafe · Zamalek")
+    classify("Cafe · Zamalek")
+    assert classify.cache_info().hits == 1
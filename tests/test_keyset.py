@@ -0,0 +1,27 @@
+import pytest
+
+from keyset import CursorError, order_spec, encode_cursor, decode_cursor, after_filter
+
+
+def test_cursor_round_trip():
+    c = encode_cursor("rating_desc", {"id": 42, "rating": 4.5, "name": "x"})
+    assert "=" not in c
+    assert decode_cursor("rating_desc", c) == (4.5, 42)
+    c = encode_cursor("name_asc", {"id": 7, "name": "مطعم, \"Cafe\""})
+    assert decode_cursor("name_asc", c) == ("مطعم, \"Cafe\"", 7)
+
+
+def test_bad_cursors_are_rejected():
+    c = encode_cursor("rating_desc", {"id": 1, "rating": 4.0})
+    with pytest.raises(CursorError):
+        decode_cursor("name_asc", c)
+    with pytest.raises(CursorError):
+        decode_cursor("rating_desc", "not-a-cursor")
+
+
+def test_order_and_after_filter():
+    assert order_spec("rating_desc") == "rating.desc.nullslast,id.asc"
+    assert order_spec("name_asc") == "name.asc.nullslast,id.asc"
+    assert after_filter("rating_desc", 4.5, 10) == 'rating.lt."4.5",and(rating.eq."4.5",id.gt.10),rating.is.null'
+    assert after_filter("name_asc", 'A, "B"', 3) == 'name.gt."A, \\"B\\"",and(name.eq."A, \\"B\\"",id.gt.3),name.is.null'
+    assert after_filter("rating_desc", None, 99) == "and(rating.is.null,id.gt.99)"
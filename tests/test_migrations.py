@@ -0,0 +1,118 @@
+import os
+from pathlib import Path
+
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+DSN = os.environ.get("PG_TEST_DSN")
+DB_DIR = Path(__file__).resolve().parent.parent / "db"
+
+pytestmark = pytest.mark.skipif(not DSN, reason="set PG_TEST_DSN to run against a local Postgres")
+
+ROWS = [
+    ("dentists", "Cairo, Egypt", "Smile Dental Clinic", "12 Tahrir Street, Downtown", "0100", "4.8"),
+    ("dentists", "Cairo, Egypt", "Nile Dental Center", "5 Road 9, Maadi", "", "4.1"),
+    ("dentists", "Giza, Egypt", "Dental Care Dokki", "Dokki, Giza", "0111", "3.9"),
+    ("cafes", "Cairo, Egypt", "Zamalek Coffee", "26th of July St, Zamalek", "", "4.5"),
+]
+
+
+@pytest.fixture
+def cur():
+    with psycopg.connect(DSN) as conn:
+        with conn.cursor() as c:
+            c.execute((DB_DIR / "schema.sql").read_text(encoding="utf-8"))
+            for path in sorted((DB_DIR / "migrations").glob("*.sql")):
+                c.execute(path.read_text(encoding="utf-8"))
+            c.execute("truncate public.places")
+            for cat, loc, name, addr, phone, rating in ROWS:
+                c.execute(
+                    "insert into public.places (category, query_location, name, address_line, phone, rating, profile_url)"
+                    " values (%s, %s, %s, %s, %s, %s, %s)",
+                    (cat, loc, name, addr, phone, rating, f"https://maps/{name}"),
+                )
+            yield c
+        conn.rollback()
+
+
+def test_search_leads_ranks_and_filters(cur):
+    cur.execute("select name from public.search_leads('dental')")
+    assert {r[0] for r in cur.fetchall()} == {"Smile Dental Clinic", "Nile Dental Center", "Dental Care Dokki"}
+    cur.execute("select name from public.search_leads('dental', p_location => 'cairo', p_has_phone => true)")
+    assert [r[0] for r in cur.fetchall()] == ["Smile Dental Clinic"]
+    cur.execute("select name from public.search_leads('zamalek')")
+    assert [r[0] for r in cur.fetchall()] == ["Zamalek Coffee"]
+    cur.execute("select public.search_leads_count('dental', p_min_rating => 4.0)")
+    assert cur.fetchone()[0] == 2
+
+
+def test_search_leads_pages_without_gaps(cur):
+    cur.execute("select id, rank from public.search_leads('dental', p_limit => 3)")
+    everything = cur.fetchall()
+    cur.execute("select id, rank from public.search_leads('dental', p_limit => 1)")
+    first = cur.fetchall()
+    cur.execute("select id, rank from public.search_leads('dental', p_after_rank => %s, p_after_id => %s)", (first[0][1], first[0][0]))
+    assert first + cur.fetchall() == everything
+
+
+def test_text_filters_can_use_indexes(cur):
+    cur.execute("set local enable_seqscan = off")
+    for where in (
+        "search_tsv @@ websearch_to_tsquery('simple', 'dental')",
+        "address_line ilike '%maadi%'",
+        "query_location ilike 'cairo%'",
+    ):
+        cur.execute(f"explain select id from public.places where {where}")
+        plan = "\n".join(r[0] for r in cur.fetchall())
+        assert "Bitmap Index Scan" in plan or "Index Scan" in plan, plan
+
+
+def test_typed_columns_null_out_of_range_text(cur):
+    cur.execute("drop table public.places cascade")
+    cur.execute((DB_DIR / "schema.sql").read_text(encoding="utf-8"))
+    cur.execute(
+        "insert into public.places (profile_url, rating, \"timestamp\") values"
+        " ('https://maps/a', '45', '2024-13-45 10:00:00'), ('https://maps/b', '4.96', '2024-05-01 13:45:00')"
+    )
+    for path in sorted((DB_DIR / "migrations").glob("*.sql")):
+        cur.execute(path.read_text(encoding="utf-8"))
+    cur.execute("select rating, \"timestamp\" is null from public.places order by profile_url")
+    assert [(r[0] if r[0] is None else float(r[0]), r[1]) for r in cur.fetchall()] == [(None, True), (4.96, False)]
+
+
+def test_typed_columns(cur):
+    cur.execute(
+        "select data_type from information_schema.columns where table_schema = 'public' and table_name = 'places'"
+        " and column_name in ('rating', 'reviews_count', 'timestamp') order by column_name"
+    )
+    assert [r[0] for r in cur.fetchall()] == ["numeric", "integer", "timestamp with time zone"]
+
+
+# WHERE clauses as apply_filters() and keyset.after_filter() send them through PostgREST
+FILTER_SHAPES = (
+    "true",
+    "category = 'dentists'",
+    "category = 'dentists' and query_location ilike 'cairo%'",
+    "query_location ilike 'cairo%'",
+    "phone is not null and phone <> ''",
+    "website is not null and website <> ''",
+    "category = 'dentists' and phone is not null and phone <> ''",
+    "rating >= 4.0",
+)
+SORT_SHAPES = {
+    "rating_desc": ("order by rating desc nulls last, id limit 101", "(rating < 4.5 or (rating = 4.5 and id > 2) or rating is null)"),
+    "name_asc": ("order by name asc nulls last, id limit 101", "(name > 'M' or (name = 'M' and id > 2) or name is null)"),
+}
+
+
+@pytest.mark.parametrize("sort", sorted(SORT_SHAPES))
+def test_search_shapes_use_index_paths(cur, sort):
+    cur.execute("set local enable_seqscan = off")
+    cur.execute("set local enable_sort = off")
+    order, after = SORT_SHAPES[sort]
+    for where in FILTER_SHAPES:
+        for page in (where, f"{where} and {after}"):
+            cur.execute(f"explain select id from public.places where {page} {order}")
+            plan = "\n".join(r[0] for r in cur.fetchall())
+            assert "Index" in plan and "Sort" not in plan, plan
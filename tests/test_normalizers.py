@@ -0,0 +1,25 @@
+from normalizers import cache_stats, clear_caches, nfc, nfc_field, nfc_uncached
+
+
+def test_nfc_matches_uncached():
+    for s in [None, "", "  Cairo Egypt ", "ﬁne", 4.5]:
+        assert nfc(s) == nfc_uncached(s)
+
+
+def test_cache_stats_counts_hits():
+    clear_caches()
+    nfc("Giza, Egypt")
+    nfc("Giza, Egypt")
+    nfc("Alexandria, Egypt")
+    st = cache_stats()["nfc"]
+    assert (st["hits"], st["misses"]) == (1, 2)
+    assert st["hit_ratio"] == round(1 / 3, 4)
+
+
+def test_unique_fields_skip_the_cache():
+    clear_caches()
+    nfc_field("profile_url", "https://maps/1")
+    nfc_field("timestamp", "2024-05-01 13:45:00")
+    assert nfc_field("category", " Dentist ") == "Dentist"
+    st = cache_stats()["nfc"]
+    assert st["hits"] + st["misses"] == 1
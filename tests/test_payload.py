@@ -0,0 +1,62 @@
+import gzip, json, re
+from pathlib import Path
+
+from payload import Payload, PayloadStats, etag_matches, first_photo, pick_encoding, select_columns, shape_row
+
+ROW = {
+    "id": 3,
+    "name": "Nile Cafe",
+    "correct_name": "Nile Caf\u00e9",
+    "rating": None,
+    "photo_urls": "x, https://a/1.jpg, https://a/2.jpg",
+}
+
+
+def test_list_view_keeps_one_photo():
+    row = shape_row(dict(ROW), "list")
+    assert row == {"id": 3, "name": "Nile Caf\u00e9", "rating": "", "main_photo_url": "https://a/1.jpg"}
+    full = shape_row(dict(ROW), "full")
+    assert full["photos"] == ["https://a/1.jpg", "https://a/2.jpg"] and full["photo_urls"]
+    assert first_photo("") == ""
+    assert select_columns("full") == "*" and "photo_urls" in select_columns("list")
+
+
+def test_list_view_has_every_column_the_dashboard_reads():
+    root = Path(__file__).resolve().parent.parent
+    html = (root / "templates" / "index.html").read_text(encoding="utf-8")
+    schema = (root / "db" / "schema.sql").read_text(encoding="utf-8")
+    table = schema.split("create table if not exists public.places (", 1)[1].split(");", 1)[0]
+    columns = {ln.split()[0] for ln in table.splitlines() if ln.strip()}
+    read = set(re.findall(r"\b(?:item|r)\.([a-z_0-9]+)", html)) & columns
+    assert {"reviews_count", "category_line", "phone_e164"} <= read
+    assert read <= set(select_columns("list").split(","))
+
+
+def test_encoding_negotiation():
+    available = {"identity": b"", "gzip": b"", "br": b""}
+    assert pick_encoding("gzip, deflate, br", available) == "br"
+    assert pick_encoding("gzip, br;q=0.5", available) == "gzip"
+    assert pick_encoding("br;q=0, gzip;q=0", available) == "identity"
+    assert pick_encoding("", available) == "identity"
+    assert pick_encoding("br", {"identity": b"", "gzip": b""}) == "identity"
+
+
+def test_payload_variants_and_etags():
+    p = Payload({"items": [{"name": "x" * 50}] * 100})
+    enc, body, etag = p.variant("gzip")
+    assert enc == "gzip" and json.loads(gzip.decompress(body)) == json.loads(p.identity)
+    assert etag.endswith('-gzip"')
+    _, _, plain = p.variant("")
+    assert etag_matches(plain, etag) and etag_matches(f'W/{etag}, "other"', plain)
+    assert not etag_matches('"other"', etag) and not etag_matches(None, etag)
+    assert Payload({"items": [{"name": "x" * 50}] * 100}).etag == p.etag
+    small = Payload({"items": []})
+    assert list(small.bodies) == ["identity"]
+
+
+def test_payload_stats():
+    stats = PayloadStats()
+    stats.record(1000, 200, "gzip")
+    stats.record(1000, 0, "gzip", not_modified=True)
+    s = stats.snapshot()
+    assert s["saved_ratio"] == 0.9 and s["not_modified"] == 1 and s["encodings"] == {"gzip": 2}
@@ -0,0 +1,29 @@
+import time
+
+from scraper.phone_cache import PhoneCache, place_key
+
+URL = "https://www.google.com/maps/place/Cafe/data=!4m7!3m6!1s0x14583fa60b21beeb:0x79dfb296e8423bba!8m2"
+
+
+def test_place_key_ignores_url_noise():
+    assert place_key(URL) == place_key(URL + "?hl=ar&entry=ttu")
+    assert place_key("") == ""
+
+
+def test_positive_and_negative_ttls(tmp_path):
+    cache = PhoneCache(str(tmp_path / "c.sqlite"), positive_ttl_days=30, negative_ttl_days=7)
+    day = 86400
+    t0 = time.time() - 10 * day
+    cache.put(URL, "0100", "+20100", "found", now=t0)
+    cache.put("https://maps/x", "", "", "no_phone", now=t0)
+    cache.put("https://maps/y", "", "", "error", now=t0)
+    assert cache.get(URL, now=t0 + 10 * day)["phone_e164"] == "+20100"
+    assert cache.get("https://maps/x", now=t0 + 5 * day)["status"] == "no_phone"
+    assert cache.get("https://maps/x", now=t0 + 8 * day) is None
+    assert cache.get("https://maps/y", now=t0) is None
+    assert cache.get(URL, now=t0 + 31 * day) is None
+    assert cache.prune(now=t0 + 8 * day) == 1
+    cache.close()
+    reopened = PhoneCache(str(tmp_path / "c.sqlite"), positive_ttl_days=30, negative_ttl_days=7)
+    assert reopened.get(URL)["phone"] == "0100"
+    reopened.close()
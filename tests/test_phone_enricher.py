@@ -1,2 +1,218 @@
+import csv
+
+import pytest
+
+pytest.importorskip("undetected_chromedriver")
+
+from scraper import phone_enricher
+
+
 def test_placeholder_phone_enricher():
     assert True
+
+
+def _fake_browser(monkeypatch):
+    monkeypatch.setattr(phone_enricher, "new_driver", lambda headless: object())
+    monkeypatch.setattr(phone_enricher, "jitter", lambda *a: None)
+    monkeypatch.setattr(
+        phone_enricher,
+        "get_phone_from_page",
+        lambda driver, url: "" if url.endswith("7") else "0100000" + url[-4:],
+    )
+
+
+def _write_input(path, n):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["name", "profile_url", "phone"])
+        w.writeheader()
+        for i in range(n):
+            w.writerow({"name": f"p{i}", "profile_url": f"https://maps/{i:04d}" if i % 5 else "", "phone": ""})
+
+
+def test_workers_output_matches_sequential(tmp_path, monkeypatch):
+    _fake_browser(monkeypatch)
+    src = tmp_path / "in.csv"
+    _write_input(src, 60)
+    phone_enricher.process(str(src), str(tmp_path / "seq.csv"), workers=1, cache_path=str(tmp_path / "c1.sqlite"), http_fast_path=False)
+    phone_enricher.process(str(src), str(tmp_path / "par.csv"), workers=4, cache_path=str(tmp_path / "c2.sqlite"), http_fast_path=False)
+    assert (tmp_path / "seq.csv").read_bytes() == (tmp_path / "par.csv").read_bytes()
+
+
+def test_resume_skips_journaled_profiles(tmp_path, monkeypatch):
+    from scraper.enrich_journal import Journal
+
+    _fake_browser(monkeypatch)
+    visited = []
+    lookup = phone_enricher.get_phone_from_page
+    monkeypatch.setattr(phone_enricher, "get_phone_from_page", lambda d, url: visited.append(url) or lookup(d, url))
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    _write_input(src, 10)
+    with Journal(str(out) + ".journal") as j:
+        j.record("https://maps/0001", "0123", "+20123", "found")
+        j.record("https://maps/0002", "", "", "no_phone")
+        j.record("https://maps/0003", "", "", "error")
+    phone_enricher.process(str(src), str(out), cache_path=str(tmp_path / "c.sqlite"), http_fast_path=False)
+    assert "https://maps/0001" not in visited and "https://maps/0002" not in visited
+    assert "https://maps/0003" in visited
+    with open(out, encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]["phone_e164"] == "+20123"
+    assert not (tmp_path / "out.csv.journal").exists()
+
+
+def test_http_fast_path_falls_back_to_browser(tmp_path, monkeypatch):
+    from scraper.http_phone import PathStats
+
+    _fake_browser(monkeypatch)
+
+    class Fetcher:
+        def get_phone(self, url):
+            return ("tel:0221234567", "found") if url.endswith("1") else ("", "no_phone")
+
+        def close(self):
+            pass
+
+    stats = PathStats()
+    results = dict((i, p) for i, p, _ in phone_enricher.run_workers([(1, "u1"), (2, "u0002")], True, 1, Fetcher(), stats))
+    assert results == {1: "0221234567", 2: "01000000002"}
+    assert (stats.get("http", "found"), stats.get("http", "no_phone"), stats.get("browser", "found")) == (1, 1, 1)
+
+
+def test_second_run_reuses_phone_cache(tmp_path, monkeypatch):
+    _fake_browser(monkeypatch)
+    visited = []
+    lookup = phone_enricher.get_phone_from_page
+    monkeypatch.setattr(phone_enricher, "get_phone_from_page", lambda d, url: visited.append(url) or lookup(d, url))
+    src, cache = tmp_path / "in.csv", str(tmp_path / "c.sqlite")
+    _write_input(src, 20)
+    phone_enricher.process(str(src), str(tmp_path / "a.csv"), cache_path=cache, http_fast_path=False)
+    first = len(visited)
+    phone_enricher.process(str(src), str(tmp_path / "b.csv"), cache_path=cache, http_fast_path=False)
+    assert first == 16 and len(visited) == first
+    assert (tmp_path / "a.csv").read_bytes() == (tmp_path / "b.csv").read_bytes()
+
+
+@pytest.mark.parametrize("tabs", [1, 4])
+def test_browser_failure_keeps_the_journal(tmp_path, monkeypatch, tabs):
+    _fake_browser(monkeypatch)
+
+    def broken(headless):
+        raise RuntimeError("chrome not found")
+
+    monkeypatch.setattr(phone_enricher, "new_driver", broken)
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    _write_input(src, 10)
+    with pytest.raises(phone_enricher.WorkerError):
+        phone_enricher.process(str(src), str(out), cache_path=None, http_fast_path=False, tabs=tabs)
+    assert not out.exists()
+    with open(str(out) + ".journal", encoding="utf-8") as f:
+        assert '"error"' in f.read()
+
+
+def test_tabs_output_matches_sequential(tmp_path, monkeypatch, fake_driver):
+    # both paths run the real read_phone against the fake place panel
+    drivers = []
+    panel = lambda url: "" if url.endswith("7") else "0100000" + url[-4:]
+    monkeypatch.setattr(phone_enricher, "new_driver", lambda headless: drivers.append(fake_driver(panel=panel)) or drivers[-1])
+    monkeypatch.setattr(phone_enricher, "jitter", lambda *a: None)
+    monkeypatch.setattr(phone_enricher, "PHONE_RENDER_SETTLE", 0)
+    src = tmp_path / "in.csv"
+    _write_input(src, 30)
+    phone_enricher.process(str(src), str(tmp_path / "seq.csv"), cache_path=None, http_fast_path=False)
+    drivers.clear()
+    phone_enricher.process(str(src), str(tmp_path / "tabs.csv"), cache_path=None, http_fast_path=False, tabs=4)
+    seq = (tmp_path / "seq.csv").read_bytes()
+    assert seq == (tmp_path / "tabs.csv").read_bytes() and b"+201000000012" in seq
+    assert len(drivers) == 1 and len(drivers[0].handles) == 4
+    assert all(kind == "nav" for kind, _, _ in drivers[0].log)
+
+
+class PanelDriver:
+    # A place panel whose info rows keep appearing for `growing` polls; the phone row shows up after `phone_after` polls.
+    def __init__(self, phone="", growing=0, phone_after=0):
+        self.phone = phone
+        self.growing = growing
+        self.phone_after = phone_after
+        self.polls = 0
+
+    def find_elements(self, by, xp):
+        if "tel:" in xp:
+            self.polls += 1
+            return [Elem("tel:" + self.phone)] if self.phone and self.polls > self.phone_after else []
+        if "data-item-id" in xp:
+            return [Elem("")] * (3 + min(self.polls, self.growing))
+        return [Elem("")]
+
+
+class Elem:
+    def __init__(self, href):
+        self.href = href
+        self.text = ""
+
+    def get_attribute(self, name):
+        return self.href
+
+
+def test_misses_wait_for_the_panel_to_settle(monkeypatch):
+    monkeypatch.setattr(phone_enricher, "PHONE_RENDER_SETTLE", 0)
+    assert phone_enricher.read_phone(PanelDriver(), "u") == ""
+    # rows still arriving after every settle interval: not a confirmed miss
+    assert phone_enricher.read_phone(PanelDriver(growing=10), "u") is None
+    assert phone_enricher.read_phone(PanelDriver(phone="0221234567", growing=2, phone_after=2), "u") == "0221234567"
+
+
+class FakeCDPBrowser:
+    launched = []
+
+    def __init__(self, die_after):
+        self.visits = 0
+        self.die_after = die_after
+        self.alive = True
+        self.conn = type("Conn", (), {"commands": 0})()
+
+    @classmethod
+    async def launch(cls, headless=True):
+        cls.launched.append(cls(die_after=5 if not cls.launched else None))
+        return cls.launched[-1]
+
+    async def new_page(self):
+        return FakeCDPPage(self)
+
+    async def close(self):
+        self.alive = False
+
+
+class FakeCDPPage:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def close(self):
+        pass
+
+
+def test_cdp_worker_restarts_on_schedule_and_after_a_crash(monkeypatch):
+    import asyncio, queue
+    from scraper.cdp_driver import CDPError
+
+    async def read(page, url):
+        b = page.browser
+        b.visits += 1
+        if b.die_after is not None and b.visits > b.die_after:
+            b.alive = False
+            raise CDPError("browser connection closed")
+        return "0100000" + url[-4:]
+
+    FakeCDPBrowser.launched = []
+    monkeypatch.setattr(phone_enricher, "CDPBrowser", FakeCDPBrowser)
+    monkeypatch.setattr(phone_enricher, "read_phone_cdp", read)
+    monkeypatch.setattr(phone_enricher, "PHONE_RESTART_EVERY", 8)
+    monkeypatch.setattr(phone_enricher, "ENRICH_JITTER_MIN", 0)
+    monkeypatch.setattr(phone_enricher, "ENRICH_JITTER_MAX", 0)
+    results = queue.Queue()
+    items = iter([(i, f"https://maps/{i:04d}") for i in range(20)])
+    asyncio.run(phone_enricher.enrich_cdp(1, items, results, True, 1))
+    out = [results.get() for _ in range(results.qsize())]
+    assert sorted(i for i, _, _ in out) == list(range(20))
+    # the first browser dies on its 6th visit; later ones restart every 8 visits
+    assert [i for i, _, s in out if s == "error"] == [5]
+    assert [b.visits for b in FakeCDPBrowser.launched] == [6, 8, 6]
@@ -0,0 +1,33 @@
+from urllib.parse import urlencode
+
+from bench.postgrest_stub import after_value, rpc_params, table_params
+from keyset import after_filter
+
+
+def test_table_query_maps_back_to_search_params():
+    query = urlencode(
+        [
+            ("select", "id,name,rating"),
+            ("category", "eq.dentists"),
+            ("query_location", "ilike.new cairo%"),
+            ("rating", "gte.4.5"),
+            ("phone", "not.is.null"),
+            ("phone", "neq."),
+            ("address_line", "ilike.%tahrir%"),
+            ("or", "(" + after_filter("name_asc", 'A, "B"', 3) + ")"),
+            ("order", "name.asc.nullslast,id.asc"),
+            ("limit", "101"),
+        ]
+    )
+    params, after, limit = table_params(query)
+    assert (params["category"], params["location"], params["min_rating"]) == ("dentists", "new cairo", 4.5)
+    assert params["has_phone"] and not params["has_website"] and params["address_contains"] == "tahrir"
+    assert params["sort"] == "name_asc" and params["view"] == "list" and limit == 101
+    assert after == ('A, "B"', 3)
+
+
+def test_keyset_filters_round_trip():
+    assert after_value(after_filter("rating_desc", 4.5, 10), "rating_desc") == (4.5, 10)
+    assert after_value(after_filter("rating_desc", None, 99), "rating_desc") == (None, 99)
+    params, after, limit = rpc_params({"q": "nile", "p_category": "cafes", "p_after_rank": 0.4, "p_after_id": 7, "p_limit": 11})
+    assert params["sort"] == "relevance" and params["category"] == "cafes" and after == (0.4, 7) and limit == 11
@@ -0,0 +1,75 @@
+import os
+
+from profile_pool import ProfilePool
+
+
+def touch(path, size=1):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+def test_leases_rotate_least_recently_used(tmp_path):
+    pool = ProfilePool(str(tmp_path), size=2)
+    a = pool.lease()
+    b = pool.lease()
+    assert a != b and os.path.isdir(a) and os.path.isdir(b)
+    pool.release(b)
+    pool.release(a)
+    assert pool.lease() == b
+    assert pool.lease() == a
+
+
+def test_scrub_drops_identity_and_keeps_cache(tmp_path):
+    pool = ProfilePool(str(tmp_path), size=1, scrub_every=1)
+    path = pool.lease()
+    touch(os.path.join(path, "Default", "Cookies"))
+    touch(os.path.join(path, "Default", "Local Storage", "leveldb", "000003.log"))
+    touch(os.path.join(path, "Default", "Cache", "Cache_Data", "f_000001"))
+    touch(os.path.join(path, "SingletonCookie"))
+    pool.release(path)
+    assert pool.lease() == path
+    assert not os.path.exists(os.path.join(path, "Default", "Cookies"))
+    assert not os.path.exists(os.path.join(path, "Default", "Local Storage"))
+    assert not os.path.exists(os.path.join(path, "SingletonCookie"))
+    assert os.path.exists(os.path.join(path, "Default", "Cache", "Cache_Data", "f_000001"))
+
+
+def test_cache_over_cap_is_cleared_on_release(tmp_path):
+    pool = ProfilePool(str(tmp_path), size=1, cache_max_mb=1)
+    path = pool.lease()
+    touch(os.path.join(path, "Default", "Cache", "Cache_Data", "big"), 2 * 1024 * 1024)
+    pool.release(path)
+    assert not os.path.exists(os.path.join(path, "Default", "Cache"))
+    assert pool.stats["cache_trims"] == 1
+    assert pool.chrome_args() == ["--disk-cache-size=1048576"]
+
+
+def test_empty_pool_hands_out_throwaway_profiles(tmp_path):
+    pool = ProfilePool(str(tmp_path / "pool"), size=1)
+    kept = pool.lease()
+    extra = pool.lease()
+    assert not extra.startswith(str(tmp_path / "pool")) and os.path.isdir(extra)
+    pool.release(extra)
+    assert not os.path.exists(extra)
+    pool.release(kept)
+    assert pool.stats["ephemeral"] == 1 and pool.lease() == kept
+
+
+def test_sample_counts_cached_and_network_bytes(tmp_path):
+    class FakeDriver:
+        def __init__(self, res):
+            self.res = res
+
+        def execute_script(self, script):
+            if isinstance(self.res, Exception):
+                raise self.res
+            return self.res
+
+    pool = ProfilePool(str(tmp_path), size=1)
+    pool.sample(FakeDriver({"cached": 3000, "network": 1000}))
+    pool.sample(FakeDriver({"cached": 1000, "network": 0}))
+    pool.sample(FakeDriver(RuntimeError("gone")))
+    assert pool.stats["cached_bytes"] == 4000
+    assert pool.stats["network_bytes"] == 1000
+    assert pool.stats["pages"] == 2
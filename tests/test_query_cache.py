@@ -0,0 +1,62 @@
+from query_cache import QueryCache, search_params, cache_key
+
+
+def test_equivalent_queries_share_a_key():
+    a = search_params({"category": " Cafe ", "location": "Cairo", "has_phone": "1", "cursor": "", "sort": ""})
+    b = search_params({"location": "cairo ", "category": "Cafe", "has_phone": "1", "sort": "rating_desc"})
+    assert cache_key(a) == cache_key(b)
+    assert search_params({"min_rating": "x"})["min_rating"] is None
+    assert search_params({"min_rating": "4.5"})["min_rating"] == 4.5
+    assert cache_key(search_params({"cursor": "abc"})) != cache_key(search_params({}))
+    assert search_params({"q": "  Dental   Clinic ", "sort": "name_asc"})["sort"] == "relevance"
+    assert search_params({"q": "  Dental   Clinic "})["q"] == "dental clinic"
+    assert search_params({"sort": "relevance"})["sort"] == "rating_desc"
+
+
+def test_ttl_and_lru_eviction():
+    cache = QueryCache(ttl=60, max_entries=2, max_mb=1)
+    cache.put("a", b"1", now=0)
+    cache.put("b", b"2", now=0)
+    assert cache.get("a", now=1) == b"1"
+    cache.put("c", b"3", now=1)
+    assert cache.get("b", now=1) is None
+    assert cache.get("a", now=1) == b"1"
+    assert cache.get("a", now=100) is None
+    s = cache.snapshot()
+    assert s["evictions"] == 1 and s["expired"] == 1 and s["hits"] == 2 and s["misses"] == 2
+    assert s["hit_ratio"] == 0.5
+
+
+def test_memory_cap_evicts_oldest():
+    cache = QueryCache(ttl=60, max_entries=100, max_mb=1)
+    big = b"x" * (400 * 1024)
+    for key in "abc":
+        cache.put(key, big, now=0)
+    assert cache.get("a", now=0) is None
+    assert cache.get("c", now=0) == big
+    assert cache.bytes <= cache.max_bytes
+    cache.put("huge", b"x" * (2 * 1024 * 1024), now=0)
+    assert cache.get("huge", now=0) is None
+
+
+def test_new_ingest_run_clears_cache():
+    cache = QueryCache(ttl=600, version_check=10)
+    versions = [1]
+    assert cache.check_version(lambda: versions[-1], now=0)
+    cache.put("k", b"body", now=0)
+    versions.append(2)
+    assert not cache.check_version(lambda: versions[-1], now=5)
+    assert cache.get("k", now=5) == b"body"
+    assert cache.check_version(lambda: versions[-1], now=11)
+    assert cache.get("k", now=11) is None
+    cache.check_version(lambda: 1 / 0, now=30)
+    assert cache.snapshot()["invalidations"] == 1 and cache.version == 2
+
+
+def test_entry_ttl_overrides_the_cache_ttl():
+    cache = QueryCache(ttl=300, max_entries=10, max_mb=1)
+    cache.put("estimated", b"1", now=0, ttl=15)
+    cache.put("exact", b"2", now=0)
+    assert cache.get("estimated", now=10) == b"1"
+    assert cache.get("estimated", now=20) is None
+    assert cache.get("exact", now=20) == b"2"
@@ -0,0 +1,98 @@
+import csv
+
+import pytest
+
+from db.replica import Replica, build_from_csv, fts_query, open_writable, set_meta
+from keyset import decode_cursor, encode_cursor
+from query_cache import search_params
+
+FIELDS = ["profile_url", "name", "category", "query_location", "address_line", "phone", "website", "rating"]
+ROWS = [
+    ["https://maps/1", "Nile Cafe", "Cafe", "Zamalek, Cairo", "26 July St", "0100", "", "4.5"],
+    ["https://maps/2", "Caf\u00e9 Riche", "Cafe", "Downtown, Cairo", "Talaat Harb St", "", "https://riche", "4.5"],
+    ["https://maps/3", "Koshary Abou Tarek", "Restaurant", "Downtown, Cairo", "Champollion St", "0122", "", "4.8"],
+    ["https://maps/4", "Zooba", "Restaurant", "Zamalek, Cairo", "26 July St", "", "", ""],
+    ["https://maps/5", "Cairo Bakery", "Bakery", "Maadi, Cairo", "Road 9", "0111", "https://bakery", "3.9"],
+    ["https://maps/1", "Nile Cafe", "Cafe", "Zamalek, Cairo", "26 July Street", "0100", "", "4.6"],
+]
+
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(FIELDS)
+        w.writerows(rows)
+    return str(path)
+
+
+def make_replica(tmp_path):
+    out = str(tmp_path / "replica.sqlite")
+    assert build_from_csv(write_csv(tmp_path / "enriched.csv", ROWS), out) == 6
+    return Replica(out)
+
+
+def params(**kw):
+    return search_params(kw)
+
+
+def test_filters_counts_and_facets(tmp_path):
+    r = make_replica(tmp_path)
+    assert r.version().startswith("csv:")
+    assert r.locations() == ["Downtown, Cairo", "Maadi, Cairo", "Zamalek, Cairo"]
+    assert r.count(params()) == 5
+    assert r.count(params(category="Cafe")) == 2
+    assert r.count(params(location="zamalek")) == 2
+    assert r.count(params(has_phone="1", has_website="1")) == 1
+    assert r.count(params(address_contains="26 july")) == 2
+    rows = r.search(params(min_rating="4.5"), None, 10)
+    assert [x["name"] for x in rows] == ["Koshary Abou Tarek", "Nile Cafe", "Caf\u00e9 Riche"]
+    assert rows[1]["rating"] == 4.6 and "photo_urls" in rows[0] and "plus_code" not in rows[0]
+
+
+def test_builds_merge_into_the_existing_replica(tmp_path):
+    r = make_replica(tmp_path)
+    giza = [["https://maps/9", "Pyramids Cafe", "Cafe", "Haram, Giza", "Pyramids Rd", "", "", "4.2"], ROWS[0]]
+    assert build_from_csv(write_csv(tmp_path / "giza.csv", giza), r.path) == 2
+    r = Replica(r.path)
+    assert r.count(params()) == 6
+    assert r.locations() == ["Downtown, Cairo", "Haram, Giza", "Maadi, Cairo", "Zamalek, Cairo"]
+    assert [x["name"] for x in r.search(params(q="pyramids"), None, 10)] == ["Pyramids Cafe"]
+
+
+def test_synced_replica_refuses_csv_builds(tmp_path):
+    out = str(tmp_path / "synced.sqlite")
+    c = open_writable(out)
+    set_meta(c, "feed", "sync")
+    c.commit()
+    c.close()
+    with pytest.raises(ValueError):
+        build_from_csv(write_csv(tmp_path / "enriched.csv", ROWS), out)
+
+
+def test_keyset_pages_match_one_scan(tmp_path):
+    r = make_replica(tmp_path)
+    for sort in ("rating_desc", "name_asc"):
+        p = params(sort=sort)
+        everything = [x["id"] for x in r.search(p, None, 100)]
+        seen, after = [], None
+        while True:
+            page = r.search(p, after, 2)
+            seen += [x["id"] for x in page]
+            if len(page) < 2:
+                break
+            after = decode_cursor(sort, encode_cursor(sort, page[-1]))
+        assert seen == everything and len(seen) == 5
+    # unrated places sort last
+    assert r.search(params(), None, 100)[-1]["name"] == "Zooba"
+
+
+def test_text_search(tmp_path):
+    r = make_replica(tmp_path)
+    assert fts_query('cafe "x') == '"cafe"* """x"*'
+    assert {x["name"] for x in r.search(params(q="cafe"), None, 10)} == {"Nile Cafe", "Caf\u00e9 Riche"}
+    assert [x["name"] for x in r.search(params(q="caf", category="Restaurant"), None, 10)] == []
+    assert r.count(params(q="cairo")) == 1
+    rows = r.search(params(q="st"), None, 2)
+    assert len(rows) == 2 and rows[0]["rank"] >= rows[1]["rank"]
+    rest = r.search(params(q="st"), (rows[-1]["rank"], rows[-1]["id"]), 10)
+    assert not {x["id"] for x in rows} & {x["id"] for x in rest} and len(rows) + len(rest) == 4
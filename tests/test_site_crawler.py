@@ -0,0 +1,103 @@
+import csv
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper import site_crawler
+from scraper.site_crawler import AsyncFetcher, extract_contacts
+
+HOME = """<html><body><h1>Cafe</h1>
+<a href="/contact-us">Contact</a>
+<a href="https://www.facebook.com/cafe.cairo">fb</a>
+<a href="https://www.facebook.com/sharer/sharer.php?u=x">share</a>
+<p>Since 1998, open 9-5. Call 012 2345 6789</p>
+<script>var price = 01234567891;</script>
+</body></html>"""
+CONTACT = """<a href="tel:+20 2 2345 6789">Landline</a>
+<a href="mailto:Hello@Cafe.example?subject=hi">mail</a>
+<img src="logo@2x.png"> <a href="https://instagram.com/cafe">ig</a>"""
+PAGES = {
+    "/": HOME.encode(),
+    "/contact-us": CONTACT.encode(),
+    "/private/": b'<a href="tel:0100000000">x</a>',
+    "/robots.txt": b"User-agent: *\nDisallow: /private/\n",
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.path == "/contact-us":
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_extract_contacts_skips_non_phone_numbers():
+    found = extract_contacts(HOME, "http://www.cafe.example/")
+    assert found["phones"] == [("+201223456789", "012 2345 6789")]
+    assert found["social_links"] == "https://www.facebook.com/cafe.cairo"
+    assert found["contact_url"] == "http://www.cafe.example/contact-us"
+    assert extract_contacts(CONTACT, "http://cafe.example/")["emails"] == ["hello@cafe.example"]
+
+
+def test_process_fills_rows_from_homepage_and_contact_page(server, tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    rows = [
+        {"name": "a", "website": server + "/?utm_source=maps", "phone": "", "social_links": ""},
+        {"name": "b", "website": server + "/", "phone": "0225550000", "social_links": ""},
+        {"name": "c", "website": server + "/private/", "phone": "", "social_links": ""},
+        {"name": "d", "website": "", "phone": "", "social_links": ""},
+    ]
+    with open(src, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0]))
+        w.writeheader()
+        w.writerows(rows)
+    site_crawler.process(str(src), str(out), concurrency=4, timeout=5)
+    got = list(csv.DictReader(open(out, encoding="utf-8-sig")))
+    assert got[0]["phone_e164"] == "+201223456789"
+    assert got[0]["email"] == "hello@cafe.example"
+    assert got[0]["social_links"] == "https://www.facebook.com/cafe.cairo, https://instagram.com/cafe"
+    assert got[1]["phone"] == "0225550000" and got[1]["email"] == "hello@cafe.example"
+    assert got[2]["phone"] == "" and got[3]["email"] == ""
+
+
+def test_fetcher_reuses_connections(server):
+    import asyncio
+
+    async def run():
+        f = AsyncFetcher(per_host=1, timeout=5, respect_robots=False)
+        for _ in range(5):
+            status, _, doc = await f.fetch(server + "/contact-us")
+            assert status == 200 and "mailto:" in doc
+        f.close()
+        return f.stats
+
+    stats = asyncio.run(run())
+    assert stats["connections"] == 1 and stats["reused"] == 4
@@ -1,2 +1,32 @@
+import pytest
+
+
 def test_placeholder_supabase_push():
     assert True
+
+
+def test_clean_row_sends_typed_values():
+    supabase_push = pytest.importorskip("db.supabase_push")
+    row = supabase_push.clean_row(
+        {
+            "profile_url": " https://maps/x ",
+            "rating": "4.6",
+            "reviews_count": "(1,234)",
+            "price_min_egp": "100",
+            "price_max_egp": "",
+            "price_is_plus": "TRUE",
+            "timestamp": "2024-05-01 13:45:00",
+        }
+    )
+    assert row["profile_url"] == "https://maps/x"
+    assert row["rating"] == 4.6 and row["reviews_count"] == 1234
+    assert row["price_min_egp"] == 100.0 and row["price_max_egp"] is None and row["price_is_plus"] is True
+    assert row["timestamp"] == "2024-05-01T13:45:00"
+    assert supabase_push.clean_row({"timestamp": "yesterday"})["timestamp"] is None
+
+
+def test_clean_row_drops_values_the_columns_cannot_hold():
+    supabase_push = pytest.importorskip("db.supabase_push")
+    row = supabase_push.clean_row({"rating": "45", "reviews_count": "12345678901", "price_min_egp": "inf"})
+    assert row["rating"] is None and row["reviews_count"] is None and row["price_min_egp"] is None
+    assert supabase_push.clean_row({"rating": "5"})["rating"] == 5.0
@@ -0,0 +1,33 @@
+from scraper.tab_pool import TabPool
+
+
+def test_navigations_are_issued_on_every_tab_before_reading(fake_driver):
+    d = fake_driver()
+    pool = TabPool(d, 3)
+    items = [(i, f"https://maps/{i}") for i in range(5)]
+    seen = []
+
+    def extract(driver, url):
+        seen.append(url)
+        assert d.pages[d.current] == url
+        return url.upper()
+
+    out = list(pool.map(items, extract))
+    assert [i for i, _, _ in out] == [0, 1, 2, 3, 4]
+    assert all(r == f"HTTPS://MAPS/{i}" and e is None for i, r, e in out)
+    assert [tab for _, tab, _ in d.log[:3]] == ["t0", "t1", "t2"]
+    assert len(seen) == 5
+    pool.close()
+    assert d.handles == ["t0"] and d.current == "t0"
+
+
+def test_drain_returns_in_flight_items_when_browser_dies(fake_driver):
+    d = fake_driver(dead_after=3)
+    pool = TabPool(d, 3)
+    got = []
+    try:
+        for item, _, _ in pool.map([(i, f"u{i}") for i in range(6)], lambda drv, url: url):
+            got.append(item)
+    except RuntimeError:
+        pass
+    assert got == [] and pool.drain() == [0, 1, 2]